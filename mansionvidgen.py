@@ -16,15 +16,22 @@
 # ═══════════════════════════════════════════════════════════════════════════════
 # BAGIAN 1 — IMPORTS
 # ═══════════════════════════════════════════════════════════════════════════════
-import os, sys, gc, glob, time, uuid, random, shutil, subprocess
+import os, re, sys, gc, glob, json, math, time, uuid, queue, random, shutil, struct
+import bisect, pickle, hashlib, logging, threading, weakref, subprocess
+from collections import OrderedDict
 from pathlib import Path
 
+# Proses worker render (python mansionvidgen.py --worker job.pkl, lihat
+# run_worker_procs): hanya mesin render yang dipakai — tanpa UI & cleanup.
+_WORKER = __name__ == "__main__" and sys.argv[1:2] == ["--worker"]
+
 import numpy as np
 from PIL import Image, ImageDraw, ImageFilter, ImageFont, ImageEnhance
 
 # ── NLTK: unduh data bahasa sebelum semua hal lain ───────────────────────────
 import nltk
-for _nltk_pkg in ["punkt", "punkt_tab", "averaged_perceptron_tagger", "stopwords"]:
+for _nltk_pkg in ([] if _WORKER else
+                  ["punkt", "punkt_tab", "averaged_perceptron_tagger", "stopwords"]):
     try:
         nltk.download(_nltk_pkg, quiet=True)
     except Exception:
@@ -35,7 +42,7 @@ from moviepy import (
     VideoFileClip, AudioFileClip,
     VideoClip, concatenate_videoclips, CompositeAudioClip,
 )
-from moviepy.video.fx import Crop, FadeIn, FadeOut
+from moviepy.video.fx import FadeIn, FadeOut
 from moviepy.audio.fx import AudioFadeIn, AudioFadeOut, MultiplyVolume
 
 # ── [Linux] ImageMagick binary untuk MoviePy TextClip ────────────────────────
@@ -47,6 +54,8 @@ except Exception:
 
 # ── Streamlit (import setelah semua dependency) ───────────────────────────────
 import streamlit as st
+if _WORKER:
+    logging.disable(logging.WARNING)   # bisukan log bare mode di stderr worker
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -95,6 +104,7 @@ def auto_cleanup(tmp_dir: str = TMP_DIR, output_dir: str = "output",
     patterns = [
         os.path.join(tmp_dir,    "tmp_*"),
         os.path.join(output_dir, "out_*.mp4"),
+        os.path.join(output_dir, "out_*.vtt"),   # sidecar soft subtitle
     ]
 
     for pattern in patterns:
@@ -138,6 +148,7 @@ def cleanup_session(sid: str, tmp_dir: str = TMP_DIR,
     for pattern in [
         os.path.join(tmp_dir,    f"tmp_{sid}_*"),
         os.path.join(output_dir, f"out_{sid}*.mp4"),
+        os.path.join(output_dir, f"out_{sid}*.vtt"),
     ]:
         for fp in glob.glob(pattern):
             _safe_remove(fp)
@@ -152,7 +163,7 @@ Path("output").mkdir(exist_ok=True)
 # ── Jalankan cleanup SEBELUM set_page_config ─────────────────────────────────
 # Ini memastikan server bersih setiap kali user baru buka/refresh halaman.
 # File sesi aktif TIDAK tersentuh. File terkunci di-skip.
-_STARTUP_CLEANUP = auto_cleanup()
+_STARTUP_CLEANUP = auto_cleanup() if not _WORKER else None
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -229,6 +240,23 @@ VERT_LINE_COLOR = (255, 215, 0)
 CAPTION_Y       = 0.52  # posisi vertikal caption (fraksi dari tinggi frame)
 CTA_Y           = 0.66  # posisi vertikal CTA
 SAFE_BOTTOM     = 0.78  # batas bawah aman (safe zone TikTok/Reels)
+# Karakter yang langsung di-raster saat atlas glyph dibuat (copy properti
+# ditulis kapital); karakter lain masuk atlas saat pertama dipakai.
+ATLAS_CHARSET   = ("ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+                   " .,:;!?-+/&@#%()'\"·•")
+
+# Efek teks (lihat _stroke_text). Semua efek diturunkan dari SATU mask glyph.
+#   stroke : tebal outline (px, kotak ±stroke seperti outline lama)
+#   soft   : blur tepi outline (px) → outline lebih lembut
+#   shadow : (dx, dy, blur, alpha) — dx/dy/blur dalam fraksi ukuran font
+#   glow   : (radius, alpha)        — radius dalam fraksi ukuran font,
+#            warna = warna teks
+TEXT_EFFECTS = {
+    "Outline"         : {"stroke": STROKE_W},
+    "Outline Tebal"   : {"stroke": STROKE_W + 2, "soft": 1.5},
+    "Outline + Shadow": {"stroke": STROKE_W, "shadow": (0.05, 0.07, 0.04, 170)},
+    "Glow"            : {"stroke": STROKE_W, "glow": (0.15, 200)},
+}
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -264,45 +292,342 @@ _SYSTEM_FONTS = [
 ]
 
 
-def scan_fonts() -> list[dict]:
+_FONT_DIRS            = ("fonts", "assets")
+FONT_LRU_SIZE         = 128   # objek FreeTypeFont (path, size) yang disimpan
+FONT_RESCAN_INTERVAL  = 2.0   # detik — jeda minimal antar cek mtime folder font
+
+
+FONT_INDEX_PATH       = os.path.join("fonts", "font_index.json")     # di-commit · hanya font repo
+FONT_INDEX_CACHE      = os.path.join(TMP_DIR, "mvg_font_index.json")  # runtime · font sistem / baru
+FONT_INDEX_VERSION    = 2
+
+
+def _font_label(path: str, prefix: str = "") -> str:
+    fname = os.path.basename(path)
+    return prefix + _FONT_LABELS.get(
+        fname,
+        os.path.splitext(fname)[0].replace("_", " ").replace("-", " ").title()
+        if prefix else os.path.splitext(fname)[0],
+    )
+
+
+def _font_candidates() -> list[tuple[str, str]]:
     """
-    Kembalikan list font yang tersedia.
+    (path, label) semua file font yang ada di disk — glob + stat saja.
     Prioritas: fonts/ (repo GitHub) > assets/ > sistem Linux.
     """
     found, seen = [], set()
-
-    def _add(path: str, label: str):
-        p = os.path.normpath(path)
+    paths = [(fp, "📁 ") for d in _FONT_DIRS
+             for ext in ("*.ttf", "*.TTF", "*.otf", "*.OTF")
+             for fp in sorted(glob.glob(os.path.join(d, ext)))]
+    paths += [(fp, "") for fp in _SYSTEM_FONTS]
+    for fp, prefix in paths:
+        p = os.path.normpath(fp)
         if p not in seen and os.path.exists(p):
             seen.add(p)
-            found.append({"label": label, "path": p})
-
-    for folder, prefix in [("fonts", "📁 "), ("assets", "📁 ")]:
-        for ext in ("*.ttf", "*.TTF", "*.otf", "*.OTF"):
-            for fp in sorted(glob.glob(os.path.join(folder, ext))):
-                fname = os.path.basename(fp)
-                lbl   = _FONT_LABELS.get(
-                    fname,
-                    os.path.splitext(fname)[0].replace("_", " ").replace("-", " ").title()
-                )
-                _add(fp, f"{prefix}{lbl}")
+            found.append((p, _font_label(p, prefix)))
+    return found
 
-    for fp in _SYSTEM_FONTS:
-        fname = os.path.basename(fp)
-        _add(fp, _FONT_LABELS.get(fname, os.path.splitext(fname)[0]))
 
-    return found
+def _sfnt_names(d: bytes, off: int) -> dict:
+    """name ID → string (platform 3 / Windows, UTF-16BE) dari tabel name."""
+    cnt, so = struct.unpack(">HH", d[off + 2:off + 6])
+    names   = {}
+    for i in range(cnt):
+        pid, _, _, nid, ln, o = struct.unpack(">HHHHHH", d[off + 6 + 12 * i:off + 18 + 12 * i])
+        if pid == 3 and nid in (1, 2, 4, 16, 17) and nid not in names:
+            names[nid] = d[off + so + o:off + so + o + ln].decode("utf-16-be", "replace")
+    return names
+
+
+def _cmap_ranges(d: bytes, off: int) -> list[list[int]]:
+    """
+    Cakupan glyph dari tabel cmap → [[awal, akhir], …] codepoint (inklusif,
+    terurut) — bitmap cakupan dalam bentuk run-length. Subtabel Unicode
+    format 12 (termasuk emoji / di luar BMP) diutamakan, lalu format 4.
+    """
+    n    = struct.unpack(">H", d[off + 2:off + 4])[0]
+    subs = {}
+    for i in range(n):
+        pid, eid, o = struct.unpack(">HHI", d[off + 4 + 8 * i:off + 12 + 8 * i])
+        fmt = struct.unpack(">H", d[off + o:off + o + 2])[0]
+        subs.setdefault((fmt, pid, eid), off + o)
+    pick = next((subs[k] for k in [(12, 3, 10), (12, 0, 4), (12, 0, 6),
+                                   (4, 3, 1), (4, 0, 3), (4, 0, 4), (4, 3, 0)]
+                 if k in subs), None)
+    if pick is None:
+        return []
+    cps = []
+    fmt = struct.unpack(">H", d[pick:pick + 2])[0]
+    if fmt == 12:
+        ng = struct.unpack(">I", d[pick + 12:pick + 16])[0]
+        for i in range(ng):
+            a, b, g = struct.unpack(">III", d[pick + 16 + 12 * i:pick + 28 + 12 * i])
+            cps.append((a + (g == 0), b))
+    else:
+        seg  = struct.unpack(">H", d[pick + 6:pick + 8])[0] // 2
+        ends = struct.unpack(f">{seg}H", d[pick + 14:pick + 14 + 2 * seg])
+        p    = pick + 16 + 2 * seg
+        sts  = struct.unpack(f">{seg}H", d[p:p + 2 * seg])
+        dlt  = struct.unpack(f">{seg}h", d[p + 2 * seg:p + 4 * seg])
+        rof  = p + 4 * seg
+        ros  = struct.unpack(f">{seg}H", d[rof:rof + 2 * seg])
+        for i in range(seg):
+            a, b = sts[i], min(ends[i], 0xFFFE)
+            if ros[i] == 0:
+                z = (-dlt[i]) & 0xFFFF            # codepoint yang jatuh ke glyph 0
+                if a <= z <= b:
+                    cps += [(a, z - 1), (z + 1, b)]
+                else:
+                    cps.append((a, b))
+                continue
+            run = None
+            for c in range(a, b + 1):
+                ga = rof + 2 * i + ros[i] + 2 * (c - a)
+                g  = struct.unpack(">H", d[ga:ga + 2])[0] if ga + 2 <= len(d) else 0
+                if g and run is not None and run[1] == c - 1:
+                    run[1] = c
+                elif g:
+                    run = [c, c]
+                    cps.append(run)
+    merged = []
+    for a, b in sorted((a, b) for a, b in cps if a <= b):
+        if merged and a <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    return merged
+
+
+def _font_entry(path: str, label: str = "") -> dict:
+    """
+    Entri katalog satu file font: label, ukuran file, family/style
+    (name ID 16/17 → 1/2), weight (OS/2) dan cakupan glyph (cmap). File yang
+    bukan sfnt tunggal tetap masuk dengan ranges None (cakupan tidak diketahui).
+    """
+    ent = {"path": path, "label": label or _font_label(path),
+           "size": os.path.getsize(path), "family": "", "style": "",
+           "weight": 400, "ranges": None}
+    try:
+        with open(path, "rb") as fh:
+            d = fh.read()
+        n    = struct.unpack(">H", d[4:6])[0]
+        tabs = {}
+        for i in range(n):
+            tag, _, off, _ = struct.unpack(">4sIII", d[12 + 16 * i:28 + 16 * i])
+            tabs[tag] = off
+        if b"OS/2" in tabs:
+            os2 = tabs[b"OS/2"]
+            ent["weight"] = struct.unpack(">H", d[os2 + 4:os2 + 6])[0]
+        names = _sfnt_names(d, tabs[b"name"])
+        ent.update({
+            "family": names.get(16) or names.get(1, ""),
+            "style" : names.get(17) or names.get(2, ""),
+            "ranges": _cmap_ranges(d, tabs[b"cmap"]),
+        })
+    except Exception:
+        pass
+    return ent
+
+
+def _load_font_index(path: str = FONT_INDEX_PATH) -> dict:
+    """path font → entri dari index JSON; {} jika tidak ada / versi lain."""
+    try:
+        with open(path, encoding="utf-8") as fh:
+            idx = json.load(fh)
+        if idx.get("version") != FONT_INDEX_VERSION:
+            return {}
+        return {e["path"]: e for e in idx.get("fonts", [])}
+    except Exception:
+        return {}
+
+
+def _save_font_index(entries: list, path: str = FONT_INDEX_PATH) -> bool:
+    """Tulis index secara atomik. False jika folder read-only."""
+    try:
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"version": FONT_INDEX_VERSION, "fonts": entries},
+                      fh, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, path)
+        return True
+    except Exception:
+        return False
+
+
+def _is_repo_font(path: str) -> bool:
+    """True untuk font di fonts/ atau assets/ (bukan font sistem mesin ini)."""
+    return path.split(os.sep, 1)[0] in _FONT_DIRS
+
+
+def build_font_index(path: str = FONT_INDEX_PATH) -> list[dict]:
+    """
+    Bangun ulang index font repo dari nol (saat deploy / setelah menambah font):
+        python tools/build_font_index.py
+    Font sistem sengaja tidak dimasukkan — isinya berbeda per mesin.
+    """
+    entries = [_font_entry(p, lbl) for p, lbl in _font_candidates()
+               if _is_repo_font(p)]
+    _save_font_index(entries, path)
+    return entries
+
+
+def _scan_fonts_disk() -> list[dict]:
+    """
+    Katalog font: entri diambil dari index JSON (tanpa membuka file font);
+    hanya file baru / berubah ukuran yang di-parse.
+    Index repo (FONT_INDEX_PATH) hanya dibaca; hasil parse runtime disimpan
+    ke FONT_INDEX_CACHE di TMP_DIR.
+    """
+    repo, cache = _load_font_index(), _load_font_index(FONT_INDEX_CACHE)
+    cat, dirty = [], False
+    for p, lbl in _font_candidates():
+        size = os.path.getsize(p)
+        ent = next((e for e in (repo.get(p), cache.get(p))
+                    if e is not None and e.get("size") == size), None)
+        if ent is None:
+            ent, dirty = _font_entry(p, lbl), True
+        ent["label"] = lbl
+        cat.append(ent)
+    if dirty:
+        _save_font_index(cat, FONT_INDEX_CACHE)
+    return cat
+
+
+@st.cache_resource(show_spinner=False)
+def _font_registry() -> dict:
+    """
+    Registry font SATU per proses server (bertahan antar rerun & antar sesi):
+    katalog (lihat _scan_fonts_disk) + LRU FreeTypeFont per (path, size).
+    Katalog di-scan ulang hanya jika mtime folder fonts/ atau assets/ berubah.
+    """
+    return {"stamp": None, "checked": 0.0, "catalog": [],
+            "lru": OrderedDict(), "lock": threading.Lock(),
+            "metrics": weakref.WeakKeyDictionary(),   # font → tabel glyph (lihat _text_metrics)
+            "fhash": {},                              # path → (ukuran, mtime, sha1 isi)
+            "entries": {},                            # path → entri font (lihat _font_meta)
+            "fallback": {}}                           # (codepoint, weight) → path fallback
+
+
+def _font_dirs_stamp() -> tuple:
+    stamp = []
+    for d in _FONT_DIRS:
+        try:
+            stamp.append(os.stat(d).st_mtime_ns)
+        except OSError:
+            stamp.append(0)
+    return tuple(stamp)
+
+
+def _font_registry_fresh() -> dict:
+    """Registry dengan katalog terkini (cek mtime maks. tiap FONT_RESCAN_INTERVAL)."""
+    reg = _font_registry()
+    now = time.monotonic()
+    if reg["stamp"] is not None and now - reg["checked"] < FONT_RESCAN_INTERVAL:
+        return reg
+    with reg["lock"]:
+        reg["checked"] = now
+        stamp = _font_dirs_stamp()
+        if stamp != reg["stamp"]:
+            reg["catalog"] = _scan_fonts_disk()
+            reg["entries"] = {c["path"]: c for c in reg["catalog"]}
+            reg["fallback"].clear()
+            reg["lru"].clear()          # file bisa diganti / dihapus
+            reg["stamp"]   = stamp
+    return reg
+
+
+def scan_fonts() -> list[dict]:
+    """Kembalikan list font yang tersedia (dari registry, tanpa scan disk ulang)."""
+    return list(_font_registry_fresh()["catalog"])
 
 
 def get_font(size: int, path: str = "") -> ImageFont.FreeTypeFont:
-    """Muat font dari path. Fallback ke sistem Linux, lalu PIL default."""
-    candidates = ([{"path": path}] if path and os.path.exists(path) else []) + scan_fonts()
+    """
+    Muat font dari path. Fallback ke font katalog pertama yang ter-parse
+    (index: tanpa coba-buka satu per satu), lalu PIL default.
+    Objek font diambil dari LRU registry (path, size) — cache hit = lookup dict.
+    """
+    size = max(8, size)
+    reg  = _font_registry_fresh()
+    key  = (path, size)
+    with reg["lock"]:
+        font = reg["lru"].get(key)
+        if font is not None:
+            reg["lru"].move_to_end(key)
+            return font
+
+    candidates = ([{"path": path}] if path and os.path.exists(path) else []) + sorted(
+        reg["catalog"], key=lambda c: c["ranges"] is None)
+    font = None
     for c in candidates:
         try:
-            return ImageFont.truetype(c["path"], max(8, size))
+            font = ImageFont.truetype(c["path"], size)
+            break
         except Exception:
             continue
-    return ImageFont.load_default()
+    if font is None:
+        font = ImageFont.load_default()
+
+    with reg["lock"]:
+        reg["lru"][key] = font
+        while len(reg["lru"]) > FONT_LRU_SIZE:
+            reg["lru"].popitem(last=False)
+    return font
+
+
+def _font_file(font_path: str = "") -> str:
+    """Path file font yang benar-benar dipakai get_font (setelah fallback)."""
+    f = get_font(12, font_path)
+    return getattr(f, "path", "") if isinstance(getattr(f, "path", ""), str) else ""
+
+
+def _font_meta(font_path: str) -> dict | None:
+    """Entri katalog untuk path font (di-parse sekali jika di luar katalog)."""
+    if not font_path:
+        return None
+    reg = _font_registry_fresh()
+    ent = reg["entries"].get(os.path.normpath(font_path))
+    if ent is None and os.path.exists(font_path):
+        ent = reg["entries"][os.path.normpath(font_path)] = _font_entry(font_path)
+    return ent
+
+
+def font_covers(font_path: str, cp: int) -> bool | None:
+    """Apakah font punya glyph untuk codepoint cp. None = tidak diketahui."""
+    ent = _font_meta(font_path)
+    if ent is None or ent["ranges"] is None:
+        return None
+    rg = ent["ranges"]
+    i  = bisect.bisect_right(rg, [cp, float("inf")]) - 1
+    return i >= 0 and rg[i][0] <= cp <= rg[i][1]
+
+
+def fallback_font_path(cp: int, weight: int = 400) -> str:
+    """
+    Font katalog yang mencakup cp dengan weight terdekat (seri → urutan
+    prioritas katalog); "" jika tidak ada.
+    """
+    reg = _font_registry_fresh()
+    hit = reg["fallback"].get((cp, weight))
+    if hit is None:
+        cov = [c for c in reg["catalog"] if font_covers(c["path"], cp)]
+        hit = min(cov, key=lambda c: abs(c["weight"] - weight))["path"] if cov else ""
+        reg["fallback"][(cp, weight)] = hit
+    return hit
+
+
+def _fallback_paths(text: str, font_path: str) -> list[str]:
+    """Font fallback yang dipakai untuk karakter text di luar cakupan font_path."""
+    ff  = _font_file(font_path)
+    ent = _font_meta(ff)
+    out = set()
+    for c in set(text):
+        if not c.isspace() and font_covers(ff, ord(c)) is False:
+            fb = fallback_font_path(ord(c), ent["weight"])
+            if fb:
+                out.add(fb)
+    return sorted(out)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -314,7 +639,6 @@ def split_captions(text: str, n: int) -> list[str]:
     Caption 1 = HOOK (huruf besar), sisanya = detail.
     Setiap caption dibatasi maksimal 8 kata.
     """
-    import re
     text = text.strip()
     if not text:
         return [f"CAPTION {i+1}" for i in range(n)]
@@ -381,7 +705,193 @@ def _compute_layout(out_w: int) -> tuple[int, int, int, int]:
     )
 
 
+TEXT_FIT_EPS = 2   # px — estimasi tabel sedekat ini ke batas diverifikasi textbbox
+
+
+def _text_metrics(font) -> dict | None:
+    """
+    Tabel metrik glyph milik satu objek font (hidup selama font ada di LRU):
+    advance per karakter, kerning per pasangan, tepi kanan bbox per karakter,
+    dan (advance, tepi kanan) per kata. Diisi malas saat pertama dipakai.
+    None untuk font bitmap default (tanpa path) → ukur langsung.
+    """
+    if not getattr(font, "path", None):
+        return None
+    reg = _font_registry()
+    with reg["lock"]:
+        tab = reg["metrics"].get(font)
+        if tab is None:
+            tab = reg["metrics"][font] = {"adv": {}, "kern": {}, "right": {},
+                                          "word": {}, "gfont": {}}
+    return tab
+
+
+def _glyph_font(tab: dict, font, c: str):
+    """
+    Font yang menggambar karakter c: font itu sendiri, atau — jika index
+    katalog menyatakan c di luar cakupannya — font fallback pertama yang
+    mencakup c, di ukuran yang sama. Tanpa coba-buka file font.
+    """
+    g = tab["gfont"].get(c)
+    if g is None:
+        g = font
+        if not c.isspace() and font_covers(font.path, ord(c)) is False:
+            fb = fallback_font_path(ord(c), _font_meta(font.path)["weight"])
+            if fb:
+                g = get_font(font.size, fb)
+        tab["gfont"][c] = g
+    return g
+
+
+def _single_font(tab: dict, font, text: str) -> bool:
+    """True jika semua karakter text digambar font itu sendiri (tanpa fallback)."""
+    return all(_glyph_font(tab, font, c) is font for c in text)
+
+
+def _adv(tab: dict, font, c: str) -> float:
+    v = tab["adv"].get(c)
+    if v is None:
+        v = tab["adv"][c] = _glyph_font(tab, font, c).getlength(c)
+    return v
+
+
+def _kern(tab: dict, font, a: str, b: str) -> float:
+    v = tab["kern"].get(a + b)
+    if v is None:
+        if _glyph_font(tab, font, a) is font and _glyph_font(tab, font, b) is font:
+            v = font.getlength(a + b) - _adv(tab, font, a) - _adv(tab, font, b)
+        else:
+            v = 0.0                               # pasangan lintas font: tanpa kerning
+        tab["kern"][a + b] = v
+    return v
+
+
+def _word_metrics(tab: dict, font, word: str) -> tuple[float, float]:
+    """(advance penuh, tepi kanan bbox) satu kata dari tabel glyph + kerning."""
+    v = tab["word"].get(word)
+    if v is None:
+        pen = 0.0
+        for i, c in enumerate(word[:-1]):
+            pen += _adv(tab, font, c) + _kern(tab, font, c, word[i + 1])
+        last = word[-1]
+        r    = tab["right"].get(last)
+        if r is None:
+            r = tab["right"][last] = _glyph_font(tab, font, last).getbbox(last)[2]
+        v = tab["word"][word] = (pen + _adv(tab, font, last), pen + r)
+    return v
+
+
 def _wrap_text(text: str, font, max_w: int, draw: ImageDraw.ImageDraw) -> list[str]:
+    """
+    Bungkus teks ke beberapa baris agar tidak melebihi max_w piksel.
+    Lebar baris dihitung bertahap dari metrik kata (O(kata)); hanya kandidat
+    yang jatuh dalam ±TEXT_FIT_EPS dari batas yang diukur ulang via textbbox,
+    sehingga hasil sama dengan pengukuran textbbox per prefix.
+    """
+    tab = _text_metrics(font)
+    if tab is None:
+        return _wrap_text_linear(text, font, max_w, draw)
+    words = text.split()
+    if not words:
+        return [""]
+    sp = _adv(tab, font, " ")
+    lines, cur, cur_pen = [], "", 0.0
+    for w in words:
+        w_adv, w_right = _word_metrics(tab, font, w)
+        if cur:
+            base = (cur_pen + _kern(tab, font, cur[-1], " ") + sp
+                    + _kern(tab, font, " ", w[0]))
+            test = cur + " " + w
+        else:
+            base, test = 0.0, w
+        est = base + w_right
+        if abs(est - max_w) <= TEXT_FIT_EPS and _single_font(tab, font, test):
+            fits = draw.textbbox((0, 0), test, font=font)[2] <= max_w
+        else:
+            fits = est <= max_w
+        if fits:
+            cur, cur_pen = test, base + w_adv
+        else:
+            if cur:
+                lines.append(cur)
+            cur, cur_pen = w, w_adv
+    if cur:
+        lines.append(cur)
+    return lines or [""]
+
+
+def _text_width(text: str, font, draw: ImageDraw.ImageDraw, limit: int) -> float:
+    """Lebar (tepi kanan bbox) satu baris; diukur pasti jika dekat limit."""
+    tab = _text_metrics(font)
+    if tab is None or not text or text != " ".join(text.split()):
+        return draw.textbbox((0, 0), text, font=font)[2]
+    words = text.split(" ")
+    pen   = 0.0
+    sp    = _adv(tab, font, " ")
+    for i, w in enumerate(words[:-1]):
+        pen += (_word_metrics(tab, font, w)[0] + _kern(tab, font, w[-1], " ")
+                + sp + _kern(tab, font, " ", words[i + 1][0]))
+    est = pen + _word_metrics(tab, font, words[-1])[1]
+    if abs(est - limit) <= TEXT_FIT_EPS and _single_font(tab, font, text):
+        return draw.textbbox((0, 0), text, font=font)[2]
+    return est
+
+
+def _line_width(text: str, font, draw: ImageDraw.ImageDraw) -> float:
+    """Tepi kanan bbox satu baris, termasuk glyph dari font fallback."""
+    tab = _text_metrics(font)
+    if tab is None or _single_font(tab, font, text):
+        return draw.textbbox((0, 0), text, font=font)[2]
+    return int(round(_text_width(text, font, draw, -1)))
+
+
+def _fit_wrap(text: str, max_w: int, font_path: str,
+              size: int, max_lines: int = 4) -> tuple:
+    """
+    Ukuran font terbesar (≤ size, ≥ 8) yang membuat teks muat dalam max_lines
+    baris — binary search, bukan turun 1 pt per langkah.
+    """
+    draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+    def _try(s):
+        f = get_font(s, font_path)
+        return f, _wrap_text(text, f, max_w, draw)
+
+    hi   = max(8, size)
+    best = _try(hi)
+    if len(best[1]) <= max_lines:
+        return best
+    lo, hi, best = 8, hi - 1, None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        f, lines = _try(mid)
+        if len(lines) <= max_lines:
+            best, lo = (f, lines), mid + 1
+        else:
+            hi = mid - 1
+    return best or _try(8)
+
+
+def _fit_single(text: str, max_w: int, font_path: str, size: int) -> tuple:
+    """
+    Ukuran font terbesar (size, size−2, … ≥ 8) yang membuat teks muat dalam
+    satu baris — binary search atas kandidat ukuran.
+    """
+    draw  = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    cands = list(range(max(8, size), 7, -2))
+    lo, hi, best = 0, len(cands) - 1, None
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        f   = get_font(cands[mid], font_path)
+        if _text_width(text, f, draw, max_w) <= max_w:
+            best, hi = (f, cands[mid]), mid - 1
+        else:
+            lo = mid + 1
+    return best or (get_font(8, font_path), 8)
+
+
+# ── Versi linear lama: referensi benchmark & jalur font bitmap default ───────
+def _wrap_text_linear(text: str, font, max_w: int, draw: ImageDraw.ImageDraw) -> list[str]:
     """Bungkus teks ke beberapa baris agar tidak melebihi max_w piksel."""
     words = text.split()
     if not words:
@@ -400,49 +910,200 @@ def _wrap_text(text: str, font, max_w: int, draw: ImageDraw.ImageDraw) -> list[s
     return lines or [""]
 
 
-def _fit_wrap(text: str, max_w: int, font_path: str,
-              size: int, max_lines: int = 4) -> tuple:
-    """Kurangi ukuran font sampai teks muat dalam max_lines baris."""
-    dummy = Image.new("RGBA", (1, 1))
-    draw  = ImageDraw.Draw(dummy)
-    s     = max(8, size)
-    while s >= 8:
-        f     = get_font(s, font_path)
-        lines = _wrap_text(text, f, max_w, draw)
-        if len(lines) <= max_lines:
-            return f, lines
-        s -= 1
-    f = get_font(8, font_path)
-    return f, _wrap_text(text, f, max_w, draw)
+def _solid_layer(mask: Image.Image, rgb: tuple, alpha: int = 255) -> Image.Image:
+    """Layer RGBA warna solid dengan alpha = mask (dikali alpha/255)."""
+    if alpha < 255:
+        mask = mask.point(lambda v: v * alpha // 255)
+    layer = Image.new("RGBA", mask.size, (*rgb, 0))
+    layer.putalpha(mask)
+    return layer
 
 
-def _fit_single(text: str, max_w: int, font_path: str, size: int) -> tuple:
-    """Kurangi ukuran font sampai teks muat dalam satu baris."""
-    dummy = Image.new("RGBA", (1, 1))
-    draw  = ImageDraw.Draw(dummy)
-    s, prev = max(8, size), None
-    while s >= 8:
-        f  = get_font(s, font_path)
-        tw = draw.textbbox((0, 0), text, font=f)[2]
-        if tw <= max_w:
-            return f, s
-        if prev is not None and tw >= prev:
-            break
-        prev = tw
-        s   -= 2
-    return get_font(8, font_path), 8
+def _box_union_q(q: np.ndarray, sw: int) -> np.ndarray:
+    """Π(1 − a) atas kotak offset ±sw (termasuk pusat), separable."""
+    r = q.copy()
+    for d in range(1, sw + 1):
+        r[:, d:]  *= q[:, :-d]
+        r[:, :-d] *= q[:, d:]
+    c = r.copy()
+    for d in range(1, sw + 1):
+        c[d:]  *= r[:-d]
+        c[:-d] *= r[d:]
+    return c
 
 
-def _stroke_text(draw: ImageDraw.ImageDraw, x: int, y: int,
-                 text: str, font, rgb: tuple) -> None:
-    """Gambar teks dengan outline hitam agar terbaca di atas video apapun."""
-    for dx in range(-STROKE_W, STROKE_W + 1):
-        for dy in range(-STROKE_W, STROKE_W + 1):
-            if dx == 0 and dy == 0:
-                continue
-            draw.text((x + dx, y + dy), text, font=font,
-                      fill=(*STROKE_COLOR, 255))
-    draw.text((x, y), text, font=font, fill=(*rgb, 255))
+def _outline_from_q(c: np.ndarray, q: np.ndarray) -> Image.Image:
+    """Mask outline dari Π(1 − a) kotak; offset (0, 0) dibuang (draw lama
+    tidak menggambar stroke di posisi asli)."""
+    c = np.divide(c, q, out=np.zeros_like(c), where=q > 0)
+    return Image.fromarray(np.rint((1.0 - c) * 255.0).clip(0, 255).astype(np.uint8))
+
+
+def _outline_mask(mask: Image.Image, sw: int) -> Image.Image:
+    """
+    Alpha outline dari mask glyph: gabungan semua offset (dx, dy) dalam
+    kotak ±sw, persis hasil menumpuk draw offset (1 − Π(1 − a)), tapi
+    dihitung separable di numpy (2·2sw perkalian, bukan (2sw+1)² draw).
+    """
+    q = 1.0 - np.asarray(mask, dtype=np.float32) / 255.0
+    return _outline_from_q(_box_union_q(q, sw), q)
+
+
+# ── Atlas glyph ──────────────────────────────────────────────────────────────
+def _glyph_atlas(font, sw: int) -> dict | None:
+    """
+    Atlas glyph untuk satu (font, ukuran, stroke): tiap karakter dirasterisasi
+    SEKALI dengan outline ikut di-bake (lihat _atlas_glyph). ATLAS_CHARSET
+    langsung diisi; karakter lain menyusul saat pertama dipakai. Disimpan di
+    tabel metrik font → ikut hilang saat font keluar dari LRU.
+    None untuk font bitmap default.
+    """
+    tab = _text_metrics(font)
+    if tab is None:
+        return None
+    atlases = tab.setdefault("atlas", {})
+    atlas   = atlases.get(sw)
+    if atlas is None:
+        atlas = {}
+        for c in ATLAS_CHARSET:
+            _atlas_glyph(atlas, font, c, sw)
+        atlas = atlases.setdefault(sw, atlas)
+    return atlas
+
+
+def _atlas_glyph(atlas: dict, font, c: str, sw: int) -> tuple:
+    """
+    Entri atlas satu karakter: (dx, dy, fill uint16, Π(1 − a) float32) —
+    bitmap glyph dengan padding sw, offset relatif titik gambar (anchor "la").
+    Tuple kosong untuk glyph tanpa tinta (spasi).
+    """
+    g = atlas.get(c)
+    if g is None:
+        gf = _glyph_font(_text_metrics(font), font, c)
+        l, t, r, b = gf.getbbox(c)
+        if r <= l or b <= t:
+            g = ()
+        else:
+            im = Image.new("L", (r - l + sw * 2, b - t + sw * 2), 0)
+            ImageDraw.Draw(im).text((sw - l, sw - t), c, font=gf, fill=255)
+            fill = np.asarray(im, dtype=np.uint16)
+            q    = 1.0 - fill.astype(np.float32) / 255.0
+            by   = font.getmetrics()[0] - gf.getmetrics()[0]   # samakan baseline
+            g    = (l - sw, t - sw + by, fill, _box_union_q(q, sw) if sw else None)
+        atlas[c] = g
+    return g
+
+
+def _atlas_line(text: str, font, sw: int, pad: int) -> tuple | None:
+    """
+    Susun satu baris dari atlas: glyph di-blit di posisi pen (advance +
+    kerning dari tabel metrik, dibulatkan seperti FreeType), fill digabung
+    "over" dan outline dikalikan — hasil sama dengan raster draw.text.
+
+    Return (mask, outline, l, t) dengan titik gambar di (pad − l, pad − t),
+    atau None jika font tanpa atlas / baris tanpa tinta.
+    """
+    atlas = _glyph_atlas(font, sw)
+    if atlas is None:
+        return None
+    tab    = _text_metrics(font)
+    placed = []
+    pen    = 0.0
+    for i, c in enumerate(text):
+        g = _atlas_glyph(atlas, font, c, sw)
+        if g:
+            placed.append((g, int(np.floor(pen + 0.5))))
+        pen += _adv(tab, font, c)
+        if i + 1 < len(text):
+            pen += _kern(tab, font, c, text[i + 1])
+    if not placed:
+        return None
+
+    x0 = min(px + g[0] for g, px in placed)
+    y0 = min(g[1] for g, _ in placed)
+    x1 = max(px + g[0] + g[2].shape[1] for g, px in placed)
+    y1 = max(g[1] + g[2].shape[0] for g, _ in placed)
+    l, t   = x0 + sw, y0 + sw
+    ox, oy = pad - l, pad - t
+    fill   = np.zeros((y1 - y0 + (pad - sw) * 2, x1 - x0 + (pad - sw) * 2), np.uint16)
+    qall   = np.ones(fill.shape, np.float32) if sw else None
+    for (gx, gy, gf, gq), px in placed:
+        h, w = gf.shape
+        ys   = slice(oy + gy, oy + gy + h)
+        xs   = slice(ox + px + gx, ox + px + gx + w)
+        cur  = fill[ys, xs]
+        cur += gf - (cur * gf + 127) // 255        # "over", seperti raster FreeType
+        if sw:
+            qall[ys, xs] *= gq
+    mask = Image.fromarray(fill.astype(np.uint8))
+    if not sw:
+        return mask, mask, l, t
+    q = 1.0 - fill.astype(np.float32) / 255.0
+    return mask, _outline_from_q(qall, q), l, t
+
+
+def _raster_line(text: str, font, sw: int, pad: int) -> tuple | None:
+    """Seperti _atlas_line tapi raster langsung (font bitmap default)."""
+    l, t, r, b = font.getbbox(text)
+    if r <= l or b <= t:
+        return None
+    mask = Image.new("L", (r - l + pad * 2, b - t + pad * 2), 0)
+    ImageDraw.Draw(mask).text((pad - l, pad - t), text, font=font, fill=255)
+    return mask, (_outline_mask(mask, sw) if sw else mask), l, t
+
+
+def _stroke_text(canvas: Image.Image, x: int, y: int,
+                 text: str, font, rgb: tuple, effect: dict | None = None) -> None:
+    """
+    Gambar teks dengan outline hitam agar terbaca di atas video apapun.
+
+    Mask fill & outline baris disusun dari atlas glyph (_atlas_line; bentuk
+    outline sama dengan 24 draw offset versi lama); shadow & glow = mask
+    outline yang digeser/di-blur. Tidak ada rasterisasi FreeType per draw.
+    """
+    eff    = effect or TEXT_EFFECTS["Outline"]
+    sw     = max(0, int(eff.get("stroke", STROKE_W)))
+    soft   = float(eff.get("soft", 0))
+    shadow = eff.get("shadow")
+    glow   = eff.get("glow")
+    fs     = getattr(font, "size", 10)
+
+    sdx = sdy = sbl = gr = 0
+    if shadow:
+        sdx, sdy, sbl = (int(round(v * fs)) for v in shadow[:3])
+    if glow:
+        gr = max(1, int(round(glow[0] * fs)))
+    pad = sw + int(soft * 2 + 1) + max(abs(sdx), abs(sdy)) + sbl * 2 + gr * 2
+
+    line = _atlas_line(text, font, sw, pad) or _raster_line(text, font, sw, pad)
+    if line is None:
+        return
+    mask, out, l, t = line
+    w, h = mask.size
+    if soft > 0:
+        out = Image.composite(out, out.filter(ImageFilter.GaussianBlur(soft)), mask)
+
+    dx, dy = x + l - pad, y + t - pad
+
+    # ── Glow & shadow: alpha-composite (klip di tepi canvas) ─────────────────
+    if glow or shadow:
+        layer = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+        if glow:
+            gm = out.filter(ImageFilter.MaxFilter(3)).filter(ImageFilter.GaussianBlur(gr))
+            layer.alpha_composite(_solid_layer(gm, rgb, int(glow[1])))
+        if shadow:
+            sm = out.filter(ImageFilter.GaussianBlur(sbl)) if sbl else out
+            sm = sm.transform(sm.size, Image.AFFINE, (1, 0, -sdx, 0, 1, -sdy))
+            layer.alpha_composite(_solid_layer(sm, STROKE_COLOR, int(shadow[3])))
+        sx, sy = max(0, -dx), max(0, -dy)
+        ex, ey = min(w, canvas.width - dx), min(h, canvas.height - dy)
+        if ex > sx and ey > sy:
+            canvas.alpha_composite(layer, (dx + sx, dy + sy), (sx, sy, ex, ey))
+
+    # ── Outline & fill: paste ber-mask, operasi yang sama dengan draw.text ───
+    if sw:
+        canvas.paste((*STROKE_COLOR, 255), (dx, dy, dx + w, dy + h), out)
+    canvas.paste((*rgb, 255), (dx, dy, dx + w, dy + h), mask)
 
 
 def _paste_logo(canvas: Image.Image, out_w: int, out_h: int,
@@ -461,6 +1122,118 @@ def _paste_logo(canvas: Image.Image, out_w: int, out_h: int,
         pass
 
 
+def _caption_layout(text: str, out_w: int, out_h: int,
+                    size: int, pad_x: int, pad_y: int,
+                    font_path: str = "", max_lines: int = 4,
+                    align: str = "Center") -> dict | None:
+    """
+    Layout caption (dipakai render_caption) → dict:
+      font  : FreeTypeFont hasil fitting
+      lines : [(teks, x, y, lebar)] — titik gambar anchor "la" per baris
+      bar   : (x0, y0, x1, y1) garis vertikal Gold (inklusif) atau None
+    None jika teks kosong.
+    """
+    if not text.strip():
+        return None
+    draw = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+
+    # Kurangi lebar usable jika ada garis vertikal
+    lm     = (VERT_LINE_W + VERT_LINE_GAP) if align != "Center" else 0
+    box_w  = max(1, out_w - pad_x * 2)
+    usable = max(1, box_w - lm - 8)
+
+    font, lines = _fit_wrap(text, usable, font_path, size, max_lines)
+    lh   = max(1, draw.textbbox((0, 0), "Ag", font=font)[3])
+    lgap = max(2, int(lh * 0.10))
+    th   = lh * len(lines) + lgap * (len(lines) - 1)
+
+    # Posisi vertikal: jaga agar tidak keluar safe zone
+    safe_px = int(out_h * SAFE_BOTTOM)
+    ty      = int(out_h * CAPTION_Y)
+    if ty + th > safe_px:
+        ty = max(0, safe_px - th - pad_y)
+
+    # Garis vertikal Gold (hanya untuk Left / Right)
+    bar = None
+    text_x_anchor = text_x_end = None
+    if align == "Left":
+        gx0 = pad_x
+        gx1 = pad_x + VERT_LINE_W
+        bar = (gx0, ty, gx1, ty + th)
+        text_x_anchor = gx1 + VERT_LINE_GAP
+
+    elif align == "Right":
+        gx1 = out_w - pad_x
+        gx0 = gx1 - VERT_LINE_W
+        bar = (gx0, ty, gx1, ty + th)
+        text_x_end = gx0 - VERT_LINE_GAP
+
+    # Posisi setiap baris teks
+    placed = []
+    cy = ty
+    for line in lines:
+        if not line.strip():
+            cy += lh + lgap
+            continue
+        lw = _line_width(line, font, draw)
+        if align == "Left":
+            tx = text_x_anchor
+        elif align == "Right":
+            tx = max(pad_x, text_x_end - lw)
+        else:
+            tx = max(pad_x, pad_x + (box_w - lw) // 2)
+        placed.append((line, tx, cy, lw))
+        cy += lh + lgap
+    return {"font": font, "lines": placed, "bar": bar}
+
+
+def _cta_layout(nama: str, wa: str, out_w: int, out_h: int,
+                size: int, pad_x: int, pad_y: int,
+                font_path: str = "", label: str = "HUBUNGI :") -> dict | None:
+    """
+    Layout CTA (dipakai render_cta) → dict:
+      rule  : (x0, y0, x1, y1) garis separator Gold (inklusif)
+      items : [(teks, warna, font, x, y, lebar)]
+    None jika label, nama & WA kosong.
+    """
+    items = []
+    if label: items.append((label.upper(), (255, 255, 255)))
+    if nama:  items.append((nama.upper(),  (255, 215, 0)))
+    if wa:    items.append((f"WA: {wa}",   (255, 255, 255)))
+    if not items:
+        return None
+    draw   = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    box_w  = max(1, out_w - pad_x * 2)
+    usable = max(1, box_w - pad_x)
+
+    rendered = []
+    for i, (txt, clr) in enumerate(items):
+        # Label lebih kecil, nama agen lebih besar
+        sz = max(8, int(size * (0.80 if i == 1 else 0.60)))
+        f, _ = _fit_single(txt, usable, font_path, sz)
+        bb   = draw.textbbox((0, 0), txt, font=f)
+        rendered.append((txt, clr, f,
+                         max(1, _line_width(txt, f, draw) - bb[0]),
+                         max(1, bb[3] - bb[1])))
+
+    lgap    = max(4, pad_y)
+    tot_h   = sum(r[4] for r in rendered) + lgap * (len(rendered) - 1)
+    gold_h  = max(2, int(out_h * 0.003))
+    block_h = tot_h + gold_h + pad_y * 3
+
+    safe_px = int(out_h * SAFE_BOTTOM)
+    y_top   = int(out_h * CTA_Y)
+    if y_top + block_h > safe_px:
+        y_top = max(0, safe_px - block_h)
+
+    placed = []
+    cy = y_top + gold_h + pad_y
+    for txt, clr, f, tw, th in rendered:
+        placed.append((txt, clr, f, pad_x + (box_w - tw) // 2, cy, tw))
+        cy += th + lgap
+    return {"rule": (pad_x, y_top, pad_x + box_w, y_top + gold_h), "items": placed}
+
+
 def render_caption(
     text: str, out_w: int, out_h: int,
     size: int, pad_x: int, pad_y: int,
@@ -469,69 +1242,30 @@ def render_caption(
     logo_pil=None,
     max_lines: int = 4,
     align: str = "Center",
-) -> np.ndarray:
+    effect: dict | None = None,
+) -> dict | None:
     """
-    Render caption sebagai RGBA overlay (numpy float32).
+    Render caption sebagai sprite overlay (lihat _to_sprite).
 
     align:
       "Center"  → teks di tengah, tanpa garis vertikal.
       "Left"    → teks rata kiri + garis vertikal Gold di sisi kiri.
       "Right"   → teks rata kanan + garis vertikal Gold di sisi kanan.
+    effect: salah satu nilai TEXT_EFFECTS (None → "Outline").
     """
     canvas = Image.new("RGBA", (out_w, out_h), (0, 0, 0, 0))
     draw   = ImageDraw.Draw(canvas)
 
-    if text.strip():
-        # Kurangi lebar usable jika ada garis vertikal
-        lm     = (VERT_LINE_W + VERT_LINE_GAP) if align != "Center" else 0
-        box_w  = max(1, out_w - pad_x * 2)
-        usable = max(1, box_w - lm - 8)
-
-        font, lines = _fit_wrap(text, usable, font_path, size, max_lines)
-        lh   = max(1, draw.textbbox((0, 0), "Ag", font=font)[3])
-        lgap = max(2, int(lh * 0.10))
-        th   = lh * len(lines) + lgap * (len(lines) - 1)
-
-        # Posisi vertikal: jaga agar tidak keluar safe zone
-        safe_px = int(out_h * SAFE_BOTTOM)
-        ty      = int(out_h * CAPTION_Y)
-        if ty + th > safe_px:
-            ty = max(0, safe_px - th - pad_y)
-
-        # Gambar garis vertikal Gold (hanya untuk Left / Right)
-        text_x_anchor = text_x_end = None
-        if align == "Left":
-            gx0 = pad_x
-            gx1 = pad_x + VERT_LINE_W
-            draw.rectangle([gx0, ty, gx1, ty + th],
-                           fill=(*VERT_LINE_COLOR, 255))
-            text_x_anchor = gx1 + VERT_LINE_GAP
-
-        elif align == "Right":
-            gx1 = out_w - pad_x
-            gx0 = gx1 - VERT_LINE_W
-            draw.rectangle([gx0, ty, gx1, ty + th],
-                           fill=(*VERT_LINE_COLOR, 255))
-            text_x_end = gx0 - VERT_LINE_GAP
-
-        # Gambar setiap baris teks
-        cy = ty
-        for line in lines:
-            if not line.strip():
-                cy += lh + lgap
-                continue
-            lw = draw.textbbox((0, 0), line, font=font)[2]
-            if align == "Left":
-                tx = text_x_anchor
-            elif align == "Right":
-                tx = max(pad_x, text_x_end - lw)
-            else:
-                tx = max(pad_x, pad_x + (box_w - lw) // 2)
-            _stroke_text(draw, tx, cy, line, font, color)
-            cy += lh + lgap
+    lay = _caption_layout(text, out_w, out_h, size, pad_x, pad_y,
+                          font_path, max_lines, align)
+    if lay is not None:
+        if lay["bar"] is not None:
+            draw.rectangle(list(lay["bar"]), fill=(*VERT_LINE_COLOR, 255))
+        for line, tx, cy, _ in lay["lines"]:
+            _stroke_text(canvas, tx, cy, line, lay["font"], color, effect)
 
     _paste_logo(canvas, out_w, out_h, logo_pil)
-    return np.array(canvas).astype(np.float32)
+    return _to_sprite(canvas)
 
 
 def render_cta(
@@ -541,66 +1275,115 @@ def render_cta(
     font_path: str = "",
     logo_pil=None,
     label: str = "HUBUNGI :",
-) -> np.ndarray:
+    effect: dict | None = None,
+) -> dict | None:
     """
-    Render CTA (nama agen + WA) sebagai RGBA overlay.
+    Render CTA (nama agen + WA) sebagai sprite overlay (lihat _to_sprite).
     Diletakkan di zona tengah-bawah dengan garis separator Gold di atasnya.
+    effect: salah satu nilai TEXT_EFFECTS (None → "Outline").
     """
     canvas = Image.new("RGBA", (out_w, out_h), (0, 0, 0, 0))
     draw   = ImageDraw.Draw(canvas)
 
-    items = []
-    if label: items.append((label.upper(), (255, 255, 255)))
-    if nama:  items.append((nama.upper(),  (255, 215, 0)))
-    if wa:    items.append((f"WA: {wa}",   (255, 255, 255)))
+    lay = _cta_layout(nama, wa, out_w, out_h, size, pad_x, pad_y, font_path, label)
+    if lay is not None:
+        # Garis separator Gold
+        draw.rectangle(list(lay["rule"]), fill=(255, 215, 0, 255))
+        for txt, clr, f, tx, cy, _ in lay["items"]:
+            _stroke_text(canvas, tx, cy, txt, f, clr, effect)
 
-    if items:
-        box_w  = max(1, out_w - pad_x * 2)
-        usable = max(1, box_w - pad_x)
-
-        rendered = []
-        for i, (txt, clr) in enumerate(items):
-            # Label lebih kecil, nama agen lebih besar
-            sz = max(8, int(size * (0.80 if i == 1 else 0.60)))
-            f, _ = _fit_single(txt, usable, font_path, sz)
-            bb   = draw.textbbox((0, 0), txt, font=f)
-            rendered.append((txt, clr, f,
-                             max(1, bb[2] - bb[0]),
-                             max(1, bb[3] - bb[1])))
-
-        lgap    = max(4, pad_y)
-        tot_h   = sum(r[4] for r in rendered) + lgap * (len(rendered) - 1)
-        gold_h  = max(2, int(out_h * 0.003))
-        block_h = tot_h + gold_h + pad_y * 3
-
-        safe_px = int(out_h * SAFE_BOTTOM)
-        y_top   = int(out_h * CTA_Y)
-        if y_top + block_h > safe_px:
-            y_top = max(0, safe_px - block_h)
+    _paste_logo(canvas, out_w, out_h, logo_pil)
+    return _to_sprite(canvas)
 
-        # Garis separator Gold
-        draw.rectangle([pad_x, y_top, pad_x + box_w, y_top + gold_h],
-                       fill=(255, 215, 0, 255))
-        cy = y_top + gold_h + pad_y
 
-        for txt, clr, f, tw, th in rendered:
-            tx = pad_x + (box_w - tw) // 2
-            _stroke_text(draw, tx, cy, txt, f, clr)
-            cy += th + lgap
+def _to_sprite(canvas: Image.Image) -> dict | None:
+    """
+    Potong canvas RGBA ke bounding box piksel non-transparan → sprite uint8.
 
-    _paste_logo(canvas, out_w, out_h, logo_pil)
-    return np.array(canvas).astype(np.float32)
+    Sprite = dict:
+      size : (out_w, out_h) frame tujuan
+      x, y : pojok kiri-atas sprite di frame
+      rgb  : (h, w, 3) uint8, sudah premultiplied dengan alpha
+      inv  : (h, w, 1) uint8, 255 − alpha
+
+    Caption hanya menutup ±15% frame, jadi sprite jauh lebih kecil dari
+    canvas penuh (1080×1920 float32 ≈ 33 MB). Return None jika canvas kosong.
+    """
+    bbox = canvas.getchannel("A").getbbox()
+    if bbox is None:
+        return None
+    rgba = np.asarray(canvas.crop(bbox), dtype=np.uint16)
+    a    = rgba[:, :, 3:]
+    return {
+        "size": canvas.size,
+        "x"   : bbox[0],
+        "y"   : bbox[1],
+        "rgb" : ((rgba[:, :, :3] * a + 127) // 255).astype(np.uint8),
+        "inv" : (255 - a).astype(np.uint8),
+    }
 
 
-def blend_overlay(frame: np.ndarray, overlay: np.ndarray) -> np.ndarray:
-    """Alpha-composite overlay RGBA (float32) ke atas frame RGB (uint8)."""
-    if frame.shape[:2] != overlay.shape[:2]:
+def _blend_sprite_inplace(dst: np.ndarray, sprite: dict | None) -> None:
+    """
+    Alpha-composite sprite ke dst (uint8, writeable) hanya di area sprite.
+    Matematika integer: dst = rgb + round(dst × inv / 255) — hasil selalu ≤ 255.
+    """
+    if sprite is None:
+        return
+    inv    = sprite["inv"]
+    h, w   = inv.shape[:2]
+    x, y   = sprite["x"], sprite["y"]
+    roi    = dst[y:y + h, x:x + w]
+    tmp    = roi.astype(np.uint16)
+    tmp   *= inv
+    tmp   += 128
+    tmp   += tmp >> 8          # pembagian 255 dengan pembulatan, tanpa float
+    tmp  >>= 8
+    tmp   += sprite["rgb"]
+    roi[...] = tmp
+
+
+def _blend_sprite_anim(dst: np.ndarray, sprite: dict, k: int,
+                       dx: int = 0, dy: int = 0) -> None:
+    """
+    Seperti _blend_sprite_inplace, dengan opasitas k/256 dan geser (dx, dy)
+    piksel. Bagian sprite di luar frame dipotong.
+    """
+    if k <= 0:
+        return
+    inv  = sprite["inv"]
+    h, w = inv.shape[:2]
+    x, y = sprite["x"] + dx, sprite["y"] + dy
+    fh, fw = dst.shape[:2]
+    sx0, sy0 = max(0, -x), max(0, -y)
+    sx1, sy1 = min(w, fw - x), min(h, fh - y)
+    if sx1 <= sx0 or sy1 <= sy0:
+        return
+    inv = inv[sy0:sy1, sx0:sx1]
+    rgb = sprite["rgb"][sy0:sy1, sx0:sx1]
+    if k < 256:
+        a    = 255 - inv.astype(np.uint16)
+        a   *= k
+        a  >>= 8
+        inv  = 255 - a
+        rgb  = rgb.astype(np.uint16) * k >> 8     # premultiplied: rgb ≤ alpha tetap
+    roi  = dst[y + sy0:y + sy1, x + sx0:x + sx1]
+    tmp  = roi.astype(np.uint16)
+    tmp *= inv
+    tmp += 128
+    tmp += tmp >> 8
+    tmp >>= 8
+    tmp += rgb
+    roi[...] = tmp
+
+
+def blend_overlay(frame: np.ndarray, sprite: dict | None) -> np.ndarray:
+    """Alpha-composite sprite (lihat _to_sprite) ke atas frame RGB (uint8)."""
+    if sprite is None or frame.shape[1::-1] != tuple(sprite["size"]):
         return frame
-    alpha = overlay[:, :, 3:] / 255.0
-    return np.clip(
-        frame.astype(np.float32) * (1.0 - alpha) + overlay[:, :, :3] * alpha,
-        0, 255,
-    ).astype(np.uint8)
+    result = frame.astype(np.uint8, copy=True)
+    _blend_sprite_inplace(result, sprite)
+    return result
 
 
 def grade_frame(frame: np.ndarray,
@@ -614,6 +1397,92 @@ def grade_frame(frame: np.ndarray,
     return np.array(img)
 
 
+def compile_grade(br: float, co: float, sa: float, sh: float):
+    """
+    Kompilasi color grading SEKALI per render → grade(frame, out) → out.
+
+    Hasil setara rantai ImageEnhance di grade_frame (toleransi: selisih maks
+    ±3 level per kanal, rata-rata < 0.6) dengan biaya jauh lebih kecil:
+      - Brightness + Contrast → tabel LUT 256×256 (baris = mean luma frame),
+        diambil langsung dari ImageEnhance/Image.blend pada ramp 0–255.
+      - Saturation → luma integer + skala fixed-point (int16).
+      - Sharpness  → box 3×3 separable (int16): SMOOTH = (box9 + 4·c) / 13,
+        sehingga out = c + (sh − 1)·(9·c − box9) / 13. Tepi 1 px tidak
+        disentuh (sama seperti filter 3×3 PIL).
+    Tahap yang faktornya 1.0 dilewati.
+    """
+    ramp   = Image.fromarray(np.arange(256, dtype=np.uint8)[None, :]).convert("RGB")
+    lut_b  = np.asarray(ImageEnhance.Brightness(ramp).enhance(br))[0, :, 0]
+    means  = Image.fromarray(np.repeat(np.arange(256, dtype=np.uint8)[:, None], 256, 1))
+    lut_bc = np.ascontiguousarray(np.asarray(Image.blend(
+        means, Image.fromarray(np.repeat(lut_b[None, :], 256, 0)), co,
+    )))
+    sa_q   = int(round(sa * 64))                     # 6 bit pecahan
+    sh_q   = int(round((sh - 1.0) / 13.0 * 8 * 128))  # ×8 (e dibagi 8) · 7 bit pecahan
+    tmp    = {}
+
+    def _scratch(shape) -> dict:
+        if tmp.get("shape") != shape:
+            h, w = shape[:2]
+            tmp.clear()
+            tmp.update(
+                shape=shape,
+                g=np.empty((h, w), np.uint16),
+                t=np.empty((h, w), np.uint16),
+                d=np.empty((h, w, 3), np.int16),
+                v=np.empty((max(0, h - 2), w, 3), np.int16),
+                e=np.empty((max(0, h - 2), max(0, w - 2), 3), np.int16),
+                c=np.empty((max(0, h - 2), max(0, w - 2), 3), np.int16),
+            )
+        return tmp
+
+    def grade(frame: np.ndarray, out: np.ndarray) -> np.ndarray:
+        s = _scratch(frame.shape)
+
+        # Mean luma setelah brightness (sampel 1/16 piksel) → pilih baris LUT
+        sub  = lut_b[frame[::4, ::4]].astype(np.uint32)
+        luma = (sub[..., 0] * 19595 + sub[..., 1] * 38470
+                + sub[..., 2] * 7471 + 0x8000) >> 16
+        np.take(lut_bc[int(luma.mean() + 0.5)], frame, out=out)
+
+        if sa_q != 64:
+            g, t, d = s["g"], s["t"], s["d"]
+            np.multiply(out[..., 0], 77,  out=g, dtype=np.uint16)
+            np.multiply(out[..., 1], 150, out=t, dtype=np.uint16)
+            g += t
+            np.multiply(out[..., 2], 29,  out=t, dtype=np.uint16)
+            g += t
+            g += 128
+            g >>= 8
+            gi = g.view(np.int16)[..., None]
+            np.subtract(out, gi, out=d, dtype=np.int16)
+            d *= sa_q
+            d >>= 6
+            d += gi
+            np.clip(d, 0, 255, out=d)
+            out[...] = d
+
+        if sh_q != 0 and out.shape[0] > 2 and out.shape[1] > 2:
+            v, e, c9 = s["v"], s["e"], s["c"]
+            c = out[1:-1, 1:-1]
+            np.add(out[:-2], out[1:-1], out=v, dtype=np.int16)
+            v += out[2:]
+            np.add(v[:, :-2], v[:, 1:-1], out=e)
+            e += v[:, 2:]                                # e = box9 (≤ 2295)
+            np.multiply(c, 9, out=c9, dtype=np.int16)
+            np.subtract(c9, e, out=e)
+            e >>= 3                                      # |e| ≤ 287 → e·sh_q muat int16
+            e *= sh_q
+            e += 64
+            e >>= 7
+            e += c
+            np.clip(e, 0, 255, out=e)
+            c[...] = e
+        return out
+
+    return grade
+
+
 def draw_progress_bar(frame: np.ndarray, t: float, total: float,
                       out_w: int, out_h: int, bar_h: int = 4) -> np.ndarray:
     """
@@ -631,103 +1500,623 @@ def draw_progress_bar(frame: np.ndarray, t: float, total: float,
     return result
 
 
-# ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 9 — VIDEO PROCESSING HELPERS
-# ═══════════════════════════════════════════════════════════════════════════════
-def _blur_clip(clip, radius: int = 25):
-    """Terapkan Gaussian blur ke setiap frame clip."""
-    def _blur(f):
-        return np.array(Image.fromarray(f).filter(ImageFilter.GaussianBlur(radius)))
-    return clip.image_transform(_blur)
+# ── Animasi caption: sprite dirender SEKALI, per frame hanya transform murah ─
+CAPTION_ANIMS = {
+    "none" : "Tanpa animasi",
+    "fade" : "Fade",
+    "slide": "Slide-in (naik)",
+    "pop"  : "Pop",
+}
+ANIM_IN_S      = 0.35                              # durasi animasi masuk (detik)
+ANIM_OUT_S     = 0.25                              # durasi fade keluar (detik)
+ANIM_SLIDE     = 0.04                              # jarak slide (fraksi tinggi frame)
+ANIM_POP_STEPS = (0.70, 0.82, 0.93, 1.04, 1.06, 1.03)   # skala pop; lalu 1.0
+
+
+def _sprite_scaled(sprite: dict, s: float) -> dict:
+    """Sprite diskalakan s× terhadap titik tengahnya (premultiplied, bilinear)."""
+    h, w   = sprite["inv"].shape[:2]
+    nw, nh = max(1, int(round(w * s))), max(1, int(round(h * s)))
+    a   = np.asarray(Image.fromarray(255 - sprite["inv"][:, :, 0])
+                     .resize((nw, nh), Image.BILINEAR))
+    rgb = np.asarray(Image.fromarray(sprite["rgb"]).resize((nw, nh), Image.BILINEAR))
+    return {
+        "size": sprite["size"],
+        "x"   : int(round(sprite["x"] + w / 2 - nw / 2)),
+        "y"   : int(round(sprite["y"] + h / 2 - nh / 2)),
+        "rgb" : np.minimum(rgb, a[:, :, None]),
+        "inv" : (255 - a)[:, :, None],
+    }
 
 
-def fit_to_916(clip, out_w: int, out_h: int):
+def _anim_frame(ent: dict, t: float, frame_h: int) -> tuple:
     """
-    Resize clip ke rasio 9:16 (Portrait).
-    Jika clip landscape/square: foreground di tengah, background di-blur.
+    State animasi entri schedule di detik t → (sprite, k, dx, dy):
+    opasitas k/256 dan geser piksel. Animasi selesai → (sprite asli, 256, 0, 0).
     """
-    try:
-        cw, ch = clip.size
-        sr, dr = cw / ch, out_w / out_h
+    kind  = ent["anim"]
+    u_in  = min(1.0, max(0.0, (t - ent["t0"]) / ANIM_IN_S))
+    u_out = min(1.0, max(0.0, (ent["t1"] - t) / ANIM_OUT_S))
+    ease  = 1.0 - (1.0 - u_in) ** 3
+    sp, k_in, dy = ent["sprite"], ease, 0
+    if kind == "slide":
+        dy = int(round((1.0 - ease) * ANIM_SLIDE * frame_h))
+    elif kind == "pop":
+        steps = ent["steps"]
+        sp    = steps[min(len(steps) - 1, int(u_in * len(steps)))]
+        k_in  = min(1.0, u_in * 3)
+    return sp, int(256 * k_in * u_out), 0, dy
+
+
+def build_pass2_schedule(overlays: list, cta, interval: float,
+                         cta_start: float, total: float,
+                         anim: str = "none") -> list[dict]:
+    """
+    Jadwal overlay Pass 2: list {sprite, t0, t1, anim}, aktif saat t0 ≤ t < t1.
+    Caption ke-i tampil di [i·interval, (i+1)·interval), caption terakhir
+    sampai akhir video; CTA (jika ada) menimpa mulai cta_start.
+    Sprite kosong (None) tidak masuk jadwal.
 
-        if abs(sr - dr) < 0.05:
-            return clip.resized((out_w, out_h))
+    anim: kunci CAPTION_ANIMS untuk caption (CTA selalu statis). "pop"
+    menyiapkan sprite per langkah skala (ANIM_POP_STEPS) di sini, sekali.
+    """
+    end   = float(cta_start) if cta is not None else float(total)
+    kind  = anim if anim in CAPTION_ANIMS and anim != "none" else None
+    sched = []
+    for i, sp in enumerate(overlays):
+        t0 = i * float(interval)
+        t1 = end if i == len(overlays) - 1 else min((i + 1) * float(interval), end)
+        if sp is not None and t1 > t0:
+            ent = {"sprite": sp, "t0": t0, "t1": t1, "anim": kind}
+            if kind == "pop":
+                ent["steps"] = [_sprite_scaled(sp, s) for s in ANIM_POP_STEPS] + [sp]
+            sched.append(ent)
+    if cta is not None and float(total) > float(cta_start):
+        sched.append({"sprite": cta, "t0": float(cta_start), "t1": float(total)})
+    return sched
+
+
+def make_pass2_kernel(
+    out_w: int, out_h: int,
+    schedule: list, total: float, bar_h: int,
+    grade: tuple | None = None,
+):
+    """
+    Bangun frame processor Pass 2 yang menggabungkan grading, caption/CTA
+    (lihat build_pass2_schedule), dan progress bar dalam satu lintasan ke
+    buffer output yang dialokasikan SEKALI per render.
 
-        # Latar belakang: blur clip yang diperlebar memenuhi tinggi
-        scale_h  = out_h / ch
-        bg_w_raw = max(out_w, int(cw * scale_h))
-        bg       = _blur_clip(clip.resized((bg_w_raw, out_h)), radius=25)
-        if bg_w_raw > out_w:
-            x1 = (bg_w_raw - out_w) // 2
-            bg = bg.with_effects([Crop(x1=x1, x2=x1 + out_w, y1=0, y2=out_h)])
+    grade: (brightness, contrast, saturation, sharpness) atau None.
+
+    Return kernel(frame, t, out=None) → np.ndarray. Tanpa out, buffer internal
+    dipakai ulang antar frame: konsumen (writer ffmpeg) harus sudah memakai
+    hasilnya sebelum kernel dipanggil lagi. Satu kernel = satu thread.
+    """
+    grade = compile_grade(*grade) if grade is not None else None
+    sched = list(schedule)
+    td    = float(total)
+    state = {"buf": np.empty((out_h, out_w, 3), dtype=np.uint8)}
+
+    def kernel(frame: np.ndarray, t: float, out: np.ndarray | None = None) -> np.ndarray:
+        buf = state["buf"] if out is None else out
+        if buf.shape != frame.shape:
+            buf = state["buf"] = np.empty(frame.shape, dtype=np.uint8)
+
+        # 1) Grading (atau salin apa adanya) → buffer
+        if grade is not None:
+            grade(frame, buf)
+        else:
+            np.copyto(buf, frame)
+
+        # 2) Caption / CTA aktif — hanya area sprite yang disentuh
+        for ent in sched:
+            if ent["t0"] <= t < ent["t1"]:
+                if tuple(ent["sprite"]["size"]) == buf.shape[1::-1]:
+                    if ent.get("anim"):
+                        sp, k, dx, dy = _anim_frame(ent, t, buf.shape[0])
+                        if k >= 256 and not (dx or dy) and sp is ent["sprite"]:
+                            _blend_sprite_inplace(buf, sp)
+                        else:
+                            _blend_sprite_anim(buf, sp, min(k, 256), dx, dy)
+                    else:
+                        _blend_sprite_inplace(buf, ent["sprite"])
+                break
 
-        # Foreground: clip asli, diletakkan di tengah vertikal
-        fg_h  = max(1, int(out_w / sr))
-        fg    = clip.resized((out_w, fg_h))
-        fg_y0 = (out_h - fg_h) // 2
-        fg_y1 = fg_y0 + fg_h
+        # 3) Progress bar — hanya bar_h baris terbawah
+        if td > 0:
+            fh, fw = buf.shape[:2]
+            y0     = max(0, fh - bar_h)
+            bar_w  = int(fw * min(max(t / td, 0.0), 1.0))
+            strip  = buf[y0:, bar_w:]
+            strip[...] = strip.astype(np.uint16) * 3 // 10   # redup 70%
+            buf[y0:, :bar_w] = 255
+        return buf
 
-        def _compose(t):
-            res              = bg.get_frame(t).copy()
-            res[fg_y0:fg_y1] = fg.get_frame(t)
-            return res
+    return kernel
 
-        out = VideoClip(_compose, duration=clip.duration).with_fps(clip.fps or 24)
-        if clip.audio is not None:
-            out = out.with_audio(clip.audio)
-        return out
 
-    except Exception as e:
-        st.warning(f"⚠️ fit_to_916 fallback: {e}")
-        return clip.resized((out_w, out_h))
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 9 — CACHE SPRITE OVERLAY (disk · content-addressed · LRU)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Lintas sesi: CTA agen yang sama dipakai ulang antar listing. Nama folder
+# sengaja bukan "tmp_*" agar tidak ikut auto_cleanup; ukurannya dibatasi LRU.
+SPRITE_CACHE_DIR       = os.path.join(TMP_DIR, "mansion_sprites")
+SPRITE_CACHE_MAX_BYTES = 256 * 1024 ** 2   # 0 → cache nonaktif
+SPRITE_CACHE_VERSION   = 2                 # naikkan jika cara render overlay berubah
 
 
-def crossfade_concat(clips: list, fade_d: float) -> VideoClip:
+def _font_file_hash(font_path: str) -> str:
+    """sha1 isi file font (di-cache per path selama ukuran & mtime sama)."""
+    if not font_path:
+        return "default"
+    try:
+        stt = os.stat(font_path)
+    except OSError:
+        return "missing"
+    reg = _font_registry()
+    hit = reg["fhash"].get(font_path)
+    if hit and hit[:2] == (stt.st_size, stt.st_mtime_ns):
+        return hit[2]
+    with open(font_path, "rb") as fh:
+        digest = hashlib.sha1(fh.read()).hexdigest()
+    reg["fhash"][font_path] = (stt.st_size, stt.st_mtime_ns, digest)
+    return digest
+
+
+def _sprite_key(kind: str, params: dict) -> str:
     """
-    Gabungkan clips[] dengan transisi crossfade halus.
-    Guard: raise ValueError jika clips kosong.
+    Kunci cache = hash isi: jenis overlay, parameter render (teks, ukuran,
+    warna, align, efek, resolusi), hash file font (+ font fallback yang
+    dipakai teks) & konstanta layout.
     """
-    if not clips:
-        raise ValueError("crossfade_concat: daftar klip tidak boleh kosong")
-    if len(clips) == 1:
-        return clips[0]
-
-    min_dur = min(c.duration for c in clips)
-    fd      = min(fade_d, min_dur * 0.4)
+    raw = {
+        "v"     : SPRITE_CACHE_VERSION,
+        "kind"  : kind,
+        "font"  : _font_file_hash(params.get("font_path", "")),
+        "fallback": [_font_file_hash(p) for p in _fallback_paths(
+            " ".join(v for k, v in params.items() if isinstance(v, str) and k != "font_path"),
+            params.get("font_path", ""))],
+        "params": {k: v for k, v in params.items() if k != "font_path"},
+        "layout": [STROKE_COLOR, STROKE_W, VERT_LINE_W, VERT_LINE_GAP,
+                   VERT_LINE_COLOR, CAPTION_Y, CTA_Y, SAFE_BOTTOM],
+    }
+    blob = json.dumps(raw, sort_keys=True, ensure_ascii=False, default=list)
+    return hashlib.sha1(blob.encode()).hexdigest()
 
-    # Hitung start time setiap clip (overlap sebesar fd detik)
-    starts = [0.0]
-    for c in clips[:-1]:
-        starts.append(starts[-1] + c.duration - fd)
-    total_dur = starts[-1] + clips[-1].duration
 
-    def _frame(t):
-        result = None
-        for i, clip in enumerate(clips):
-            cs, ce = starts[i], starts[i] + clip.duration
-            if t < cs or t >= ce:
-                continue
-            lt    = min(t - cs, clip.duration - 1e-4)
-            frame = clip.get_frame(lt)
-            if result is None:
-                result = frame.astype(np.float32)
+def sprite_cache_get(key: str) -> tuple[bool, dict | None]:
+    """(ketemu, sprite). Sprite None yang tersimpan = overlay kosong."""
+    fp = os.path.join(SPRITE_CACHE_DIR, key + ".npz")
+    try:
+        with np.load(fp) as z:
+            if int(z["empty"]):
+                sprite = None
             else:
-                alpha  = min(1.0, (t - cs) / max(fd, 1e-6))
-                result = result * (1.0 - alpha) + frame.astype(np.float32) * alpha
-        if result is None:
-            result = clips[-1].get_frame(clips[-1].duration - 1e-4).astype(np.float32)
-        return np.clip(result, 0, 255).astype(np.uint8)
+                sprite = {"size": tuple(int(v) for v in z["size"]),
+                          "x": int(z["x"]), "y": int(z["y"]),
+                          "rgb": z["rgb"], "inv": z["inv"]}
+        os.utime(fp)                      # mtime = waktu pakai terakhir (LRU)
+        return True, sprite
+    except Exception:
+        return False, None
 
-    out   = VideoClip(_frame, duration=total_dur)
-    audio = [c.audio.with_start(starts[i])
-             for i, c in enumerate(clips) if c.audio is not None]
-    if audio:
-        out = out.with_audio(CompositeAudioClip(audio))
-    return out.with_fps(clips[0].fps or 24)
+
+def sprite_cache_put(key: str, sprite: dict | None) -> None:
+    """Simpan sprite (npz terkompresi, tulis atomik) lalu pangkas cache (LRU)."""
+    try:
+        os.makedirs(SPRITE_CACHE_DIR, exist_ok=True)
+        fp  = os.path.join(SPRITE_CACHE_DIR, key + ".npz")
+        tmp = os.path.join(SPRITE_CACHE_DIR, f".{key}.{uuid.uuid4().hex[:8]}.npz")
+        if sprite is None:
+            np.savez_compressed(tmp, empty=1)
+        else:
+            np.savez_compressed(tmp, empty=0, size=np.array(sprite["size"]),
+                                x=sprite["x"], y=sprite["y"],
+                                rgb=sprite["rgb"], inv=sprite["inv"])
+        os.replace(tmp, fp)
+        _sprite_cache_evict()
+    except Exception:
+        pass
+
+
+def _sprite_cache_evict() -> None:
+    """Hapus sprite yang paling lama tidak dipakai sampai total ≤ batas."""
+    files = []
+    for fp in glob.glob(os.path.join(SPRITE_CACHE_DIR, "*.npz")):
+        try:
+            stt = os.stat(fp)
+            files.append((stt.st_mtime, stt.st_size, fp))
+        except OSError:
+            pass
+    total = sum(f[1] for f in files)
+    for _, sz, fp in sorted(files):
+        if total <= SPRITE_CACHE_MAX_BYTES:
+            break
+        if _safe_remove(fp):
+            total -= sz
+
+
+def cached_overlay(kind: str, render, **params) -> tuple[dict | None, bool]:
+    """
+    render(**params) lewat cache sprite. kind: "caption" / "cta".
+    Overlay dengan logo tidak di-cache. Return (sprite, dari_cache).
+    """
+    if SPRITE_CACHE_MAX_BYTES <= 0 or params.get("logo_pil") is not None:
+        return render(**params), False
+    key = _sprite_key(kind, {k: v for k, v in params.items() if k != "logo_pil"})
+    hit, sprite = sprite_cache_get(key)
+    if hit:
+        return sprite, True
+    sprite = render(**params)
+    sprite_cache_put(key, sprite)
+    return sprite, False
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 10 — SMART CLIP CUTTER
+# BAGIAN 10 — VIDEO PROCESSING HELPERS
+# ═══════════════════════════════════════════════════════════════════════════════
+# ── Engine background blur (fit 9:16) ────────────────────────────────────────
+# Background blur tidak punya detail halus: blur di resolusi kecil lalu
+# upscale bilinear hampir tak terbedakan dari blur full-res, dengan biaya
+# sebagian kecil. every > 1 → background dihitung ulang tiap N frame.
+BG_BLUR_RADIUS  = 25
+BG_BLUR_ENGINES = {
+    "full"   : {"label": "🎯 Full-res · GaussianBlur 25 (referensi)", "scale": 1.0},
+    "half"   : {"label": "⚖️ 1/2 resolusi + upscale",                "scale": 0.5},
+    "quarter": {"label": "⚡ 1/4 resolusi + upscale",                "scale": 0.25},
+    "eighth" : {"label": "🚀 1/8 resolusi + upscale",                "scale": 0.125},
+}
+BG_BLUR_DEFAULT = "quarter"
+
+
+def make_bg_blur(src_size: tuple, out_w: int, out_h: int,
+                 engine: str = "full", every: int = 1):
+    """
+    Bangun fungsi background fit 9:16: bg(frame, idx) → np.ndarray
+    (out_h, out_w, 3) — frame sumber diperlebar memenuhi tinggi, di-blur,
+    lalu di-crop tengah. None jika rasio sumber sudah 9:16.
+
+    engine: kunci BG_BLUR_ENGINES. "full" = resize LANCZOS + GaussianBlur 25
+    (tampilan referensi); lainnya = resize BOX ke skala kecil, blur radius × skala,
+    crop + upscale bilinear sekali ke ukuran output.
+    every : background dipakai ulang untuk frame idx // every yang sama.
+    Array hasil dipakai ulang — salin sebelum diubah.
+    """
+    geo = _fit_916_geometry(*src_size, out_w, out_h)
+    if geo is None:
+        return None
+    sc    = BG_BLUR_ENGINES.get(engine, BG_BLUR_ENGINES["full"])["scale"]
+    bg_w  = geo["bg_w"]
+    x1    = geo["x1"]
+    lw    = max(1, round(bg_w * sc))
+    lh    = max(1, round(out_h * sc))
+    box   = (x1 * lw / bg_w, 0, (x1 + out_w) * lw / bg_w, lh)
+    every = max(1, int(every))
+    state = {"key": None, "bg": None}
+
+    def bg(frame: np.ndarray, idx: int = 0) -> np.ndarray:
+        key = idx // every
+        if state["key"] == key:
+            return state["bg"]
+        im = Image.fromarray(frame)
+        if sc >= 1.0:
+            b   = im.resize((bg_w, out_h), Image.LANCZOS)
+            out = np.asarray(b.filter(ImageFilter.GaussianBlur(BG_BLUR_RADIUS)))[:, x1:x1 + out_w]
+        else:
+            sm  = im.resize((lw, lh), Image.BOX).filter(
+                ImageFilter.GaussianBlur(BG_BLUR_RADIUS * sc))
+            out = np.asarray(sm.resize((out_w, out_h), Image.BILINEAR, box=box))
+        state["key"], state["bg"] = key, out
+        return out
+
+    return bg
+
+
+def _fit_916_geometry(cw: int, ch: int, out_w: int, out_h: int) -> dict | None:
+    """
+    Geometri fit 9:16: lebar background blur, crop x, tinggi & posisi foreground.
+    None → rasio sudah cocok, cukup resize langsung.
+    """
+    sr, dr = cw / ch, out_w / out_h
+    if abs(sr - dr) < 0.05:
+        return None
+    bg_w  = max(out_w, int(cw * out_h / ch))
+    fg_h  = max(1, int(out_w / sr))
+    fg_y0 = (out_h - fg_h) // 2
+    return {"bg_w": bg_w, "x1": (bg_w - out_w) // 2,
+            "fg_h": fg_h, "fg_y0": fg_y0, "fg_y1": fg_y0 + fg_h}
+
+
+def fit_to_916(clip, out_w: int, out_h: int,
+               blur: str = "full", blur_every: int = 1):
+    """
+    Resize clip ke rasio 9:16 (Portrait).
+    Jika clip landscape/square: foreground di tengah, background di-blur.
+
+    Satu node komposisi: tiap frame sumber diambil SEKALI, background
+    (make_bg_blur; engine blur / blur_every) dan foreground (resize LANCZOS)
+    diturunkan dari frame yang sama dan ditulis langsung ke satu array baru
+    per frame — tanpa clip resize terpisah. Frame hasil milik pemanggil
+    (aman disimpan / diantrikan).
+    """
+    try:
+        geo = _fit_916_geometry(*clip.size, out_w, out_h)
+        if geo is None:
+            return clip.resized((out_w, out_h))
+
+        fps   = clip.fps or 24
+        bgf   = make_bg_blur(clip.size, out_w, out_h, blur, blur_every)
+        fg_sz = (out_w, geo["fg_h"])
+        fg_y0 = geo["fg_y0"]
+        fg_y1 = geo["fg_y1"]
+
+        def _compose(t):
+            frame            = clip.get_frame(t)
+            res              = np.empty((out_h, out_w, 3), dtype=np.uint8)
+            res[...]         = bgf(frame, int(round(t * fps)))
+            res[fg_y0:fg_y1] = np.asarray(Image.fromarray(frame).resize(fg_sz, Image.LANCZOS))
+            return res
+
+        out = VideoClip(_compose, duration=clip.duration).with_fps(fps)
+        if clip.audio is not None:
+            out = out.with_audio(clip.audio)
+        return out
+
+    except Exception as e:
+        st.warning(f"⚠️ fit_to_916 fallback: {e}")
+        return clip.resized((out_w, out_h))
+
+
+def fit_to_916_iter(frames, src_size: tuple, out_w: int, out_h: int,
+                    blur: str = "full", blur_every: int = 1):
+    """
+    Versi iterator fit_to_916: frame sumber berurutan → frame 9:16.
+    Hasil setara (resize LANCZOS + engine blur yang sama) tetapi ditulis ke
+    SATU canvas yang dipakai ulang — konsumen harus selesai memakai frame
+    sebelum mengambil frame berikutnya.
+    """
+    geo    = _fit_916_geometry(*src_size, out_w, out_h)
+    bgf    = make_bg_blur(src_size, out_w, out_h, blur, blur_every)
+    canvas = np.empty((out_h, out_w, 3), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        im = Image.fromarray(frame)
+        if geo is None:
+            canvas[...] = np.asarray(im.resize((out_w, out_h), Image.LANCZOS))
+        else:
+            canvas[...] = bgf(frame, i)
+            canvas[geo["fg_y0"]:geo["fg_y1"]] = np.asarray(
+                im.resize((out_w, geo["fg_h"]), Image.LANCZOS))
+        yield canvas
+
+
+def _crossfade_starts(durs: list, fade_d: float) -> tuple[list, float, float]:
+    """Start time tiap clip (overlap fd detik), fd efektif, dan total durasi."""
+    fd     = min(fade_d, min(durs) * 0.4)
+    starts = [0.0]
+    for d in durs[:-1]:
+        starts.append(starts[-1] + d - fd)
+    return starts, fd, starts[-1] + durs[-1]
+
+
+def _crossfade_index(durs: list, starts: list, fd: float) -> dict:
+    """
+    Indeks interval timeline crossfade: batas waktu terurut + per interval
+    [b_k, b_k+1) daftar (indeks klip, start) yang aktif, urut indeks klip.
+    Keanggotaan konstan di tiap interval, jadi lookup = bisect pada "bounds"
+    (tanpa scan semua klip). Satu entri = badan klip (passthrough), dua =
+    overlap transisi (blend).
+    """
+    bounds = sorted({float(b) for i, d in enumerate(durs)
+                     for b in (starts[i], starts[i] + d)})
+    spans  = []
+    for b in bounds[:-1]:
+        spans.append(tuple((i, starts[i]) for i, d in enumerate(durs)
+                           if starts[i] <= b < starts[i] + d))
+    return {"bounds": bounds, "spans": spans, "durs": list(durs), "fd": fd}
+
+
+def _crossfade_at(idx: dict, t) -> list:
+    """
+    Klip aktif pada waktu t dari _crossfade_index: [(indeks klip, waktu lokal,
+    alpha)] — rumus sama dengan scan per klip (cs ≤ t < cs + d). t di luar
+    timeline → frame terakhir klip terakhir.
+    """
+    durs, fd = idx["durs"], idx["fd"]
+    k = bisect.bisect_right(idx["bounds"], t) - 1
+    if not 0 <= k < len(idx["spans"]) or not idx["spans"][k]:
+        return [(len(durs) - 1, durs[-1] - 1e-4, 1.0)]
+    return [(i, min(t - cs, durs[i] - 1e-4), min(1.0, (t - cs) / max(fd, 1e-6)))
+            for i, cs in idx["spans"][k]]
+
+
+@st.cache_resource(show_spinner=False)
+def _xfade_local():
+    """threading.local untuk _xfade_scratch — satu objek per proses server."""
+    return threading.local()
+
+
+def _xfade_scratch(shape: tuple) -> tuple:
+    """Dua buffer uint16 (akumulator, suku kedua) per thread untuk _blend_u16."""
+    loc = _xfade_local()
+    sc  = getattr(loc, "xfade", None)
+    if sc is None or sc[0].shape != shape:
+        sc = loc.xfade = (np.empty(shape, np.uint16), np.empty(shape, np.uint16))
+    return sc
+
+
+def _blend_u16(a: np.ndarray, b: np.ndarray, alpha: float, out: np.ndarray) -> np.ndarray:
+    """
+    out = a·(1 − alpha) + b·alpha dalam fixed-point 8 bit: bobot w = round(alpha·256),
+    (a·(256 − w) + b·w + 128) >> 8 — maks 255·256 + 128 muat di uint16, tanpa
+    float32. out boleh sama dengan a.
+    """
+    acc, tmp = _xfade_scratch(a.shape)
+    w = min(256, max(0, int(alpha * 256 + 0.5)))
+    np.multiply(a, 256 - w, out=acc, dtype=np.uint16)
+    np.multiply(b, w, out=tmp, dtype=np.uint16)
+    acc += tmp
+    acc += 128
+    acc >>= 8
+    np.copyto(out, acc, casting="unsafe")
+    return out
+
+
+def _as_u8(frame: np.ndarray) -> np.ndarray:
+    """Frame klip sebagai uint8 h×w×3 (tanpa copy jika sudah uint8)."""
+    if frame.dtype == np.uint8:
+        return frame
+    return np.clip(frame, 0, 255).astype(np.uint8)
+
+
+def crossfade_concat(clips: list, fade_d: float) -> VideoClip:
+    """
+    Gabungkan clips[] dengan transisi crossfade halus.
+    Guard: raise ValueError jika clips kosong.
+
+    Per frame: lookup interval (_crossfade_index) → hanya klip yang terlihat
+    yang di-decode. Di luar overlap frame klip diteruskan apa adanya (tanpa
+    copy); di dalam overlap di-blend uint16 (_blend_u16) ke array baru.
+    """
+    if not clips:
+        raise ValueError("crossfade_concat: daftar klip tidak boleh kosong")
+    if len(clips) == 1:
+        return clips[0]
+
+    # Hitung start time setiap clip (overlap sebesar fd detik)
+    durs = [c.duration for c in clips]
+    starts, fd, total_dur = _crossfade_starts(durs, fade_d)
+    idx  = _crossfade_index(durs, starts, fd)
+
+    def _frame(t):
+        ent    = _crossfade_at(idx, t)
+        result = _as_u8(clips[ent[0][0]].get_frame(ent[0][1]))
+        for i, lt, alpha in ent[1:]:
+            frame  = _as_u8(clips[i].get_frame(lt))
+            h, w   = result.shape[:2]
+            result = _blend_u16(result, frame, alpha, np.empty((h, w, 3), dtype=np.uint8))
+        return result
+
+    out   = VideoClip(_frame, duration=total_dur)
+    audio = [c.audio.with_start(starts[i])
+             for i, c in enumerate(clips) if c.audio is not None]
+    if audio:
+        out = out.with_audio(CompositeAudioClip(audio))
+    return out.with_fps(clips[0].fps or 24)
+
+
+def crossfade_plan(durs: list, fade_d: float, fps: int = 24) -> list[list]:
+    """
+    Rencana frame crossfade_concat sebagai data: per frame output, daftar
+    (indeks klip, waktu lokal, alpha) klip yang aktif — indeks interval &
+    rumus sama persis dengan _frame di crossfade_concat. fade_d = 0 → sambung biasa.
+    """
+    if len(durs) > 1 and fade_d > 0:
+        starts, fd, total = _crossfade_starts(durs, fade_d)
+    else:
+        starts = [float(sum(durs[:i])) for i in range(len(durs))]
+        fd, total = 0.0, float(sum(durs))
+    idx = _crossfade_index(durs, starts, fd)
+    return [_crossfade_at(idx, np.float64(n) / fps) for n in range(int(total * fps))]
+
+
+def crossfade_iter(streams: list, plan: list):
+    """
+    Versi iterator crossfade_concat. streams[i] = iterator yang menghasilkan
+    SATU frame untuk setiap permintaan klip i di plan (lihat crossfade_plan &
+    iter_clip_frames), berurutan. Frame tunggal diteruskan tanpa copy; overlap
+    di-blend uint16 sama dengan crossfade_concat ke canvas yang dipakai ulang
+    antar frame. Stream ditutup di akhir.
+    """
+    if not streams:
+        raise ValueError("crossfade_iter: daftar stream tidak boleh kosong")
+    its    = [iter(it_) for it_ in streams]
+    canvas = None
+    try:
+        for ent in plan:
+            result = _as_u8(next(its[ent[0][0]]))
+            for i, _, alpha in ent[1:]:
+                frame = _as_u8(next(its[i]))
+                if canvas is None:
+                    canvas = np.empty(result.shape, dtype=np.uint8)
+                result = _blend_u16(result, frame, alpha, canvas)
+            yield result
+    finally:
+        for it_ in its:
+            if hasattr(it_, "close"):
+                it_.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 11 — REFRAME 9:16 BACKEND FFMPEG (split · scale · blur · overlay)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Tampilan fit_to_916 sebagai filtergraph: satu decode, split ke background
+# (scale kecil → gblur → crop → upscale, sama dengan engine make_bg_blur) dan
+# foreground (scale lanczos), lalu overlay — multi-thread di C, langsung ke
+# file segmen. Hasilnya dibuka lagi sebagai klip 9:16 biasa; gagal → MoviePy.
+REFRAME_BACKENDS = {
+    "moviepy": "🐍 MoviePy · node komposisi NumPy",
+    "ffmpeg" : "⚡ ffmpeg filtergraph → file segmen",
+}
+
+
+def build_reframe_filtergraph(src_size: tuple, out_w: int, out_h: int,
+                              blur: str = "full", fps: int = 24,
+                              src: str = "0:v", out: str = "v") -> str:
+    """
+    filter_complex reframe 9:16 dari label [src] → label [out] (yuv420p, fps
+    tetap). Label internal diberi akhiran out agar beberapa graph bisa
+    digabung dalam satu filter_complex (extract_segments_ffmpeg).
+    """
+    tail = f"setsar=1,fps={fps},format=yuv420p[{out}]"
+    geo  = _fit_916_geometry(*src_size, out_w, out_h)
+    if geo is None:
+        return f"[{src}]scale={out_w}:{out_h}:flags=lanczos,{tail}"
+    sc   = BG_BLUR_ENGINES.get(blur, BG_BLUR_ENGINES["full"])["scale"]
+    bg_w = geo["bg_w"]
+    lw   = max(1, round(bg_w * sc))
+    lh   = max(1, round(out_h * sc))
+    cw   = max(1, round(out_w * lw / bg_w))
+    cx   = round(geo["x1"] * lw / bg_w)
+    # gblur di RGB planar: di yuv420p plane chroma (½ resolusi) ikut sigma
+    # yang sama → warna latar ter-blur 2× lebih lebar dari versi Pillow
+    bg   = (f"scale={lw}:{lh}:flags={'lanczos' if sc >= 1.0 else 'area'},format=gbrp,"
+            f"gblur=sigma={BG_BLUR_RADIUS * sc:g},crop={cw}:{lh}:{cx}:0")
+    if sc < 1.0:
+        bg += f",scale={out_w}:{out_h}:flags=bilinear"
+    return (f"[{src}]split=2[{out}_bgs][{out}_fgs];"
+            f"[{out}_bgs]{bg}[{out}_bg];"
+            f"[{out}_fgs]scale={out_w}:{geo['fg_h']}:flags=lanczos[{out}_fg];"
+            f"[{out}_bg][{out}_fg]overlay=0:{geo['fg_y0']}:format=gbrp,{tail}")
+
+
+def render_segment_ffmpeg(src: str, start: float, end: float, out_path: str,
+                          src_size: tuple, out_w: int, out_h: int,
+                          blur: str = "full", fmt: str = "h264_sgop",
+                          threads: int = 0) -> None:
+    """
+    Render satu segmen [start, end) sumber ke out_path dalam 9:16 — decode,
+    reframe & encode seluruhnya di ffmpeg. fmt: kunci P1_FORMATS (codec,
+    audio & parameter file segmen). threads 0 = otomatis (semua core).
+    Raise RuntimeError jika ffmpeg gagal.
+    """
+    spec = P1_FORMATS.get(fmt, P1_FORMATS[P1_DEFAULT_FORMAT])
+    cmd  = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-ss", f"{start:.3f}", "-t", f"{max(0.0, end - start):.3f}", "-i", src,
+        "-filter_complex", build_reframe_filtergraph(src_size, out_w, out_h, blur),
+        "-filter_complex_threads", str(threads),
+        "-map", "[v]", "-map", "0:a?",
+        "-c:v", spec["codec"], *spec["params"], "-threads", str(threads),
+        "-c:a", spec["audio"],
+        out_path,
+    ]
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    if r.returncode != 0 or not os.path.exists(out_path):
+        raise RuntimeError(f"ffmpeg reframe gagal: {r.stderr.strip()[-400:]}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 12 — SMART CLIP CUTTER
 # ═══════════════════════════════════════════════════════════════════════════════
 def smart_cut_clips(video_clips: list, target_dur: int,
                     min_seg: float = 4.0, max_seg: float = 6.0) -> list:
@@ -791,99 +2180,1342 @@ def smart_cut_clips(video_clips: list, target_dur: int,
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 11 — KEN BURNS PHOTO SLIDESHOW
+# BAGIAN 13 — PRA-EKSTRAKSI SEGMEN (satu sapuan maju per sumber)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Segmen hasil smart_cut_clips / deteksi scene berurutan acak. subclipped pada
+# VideoFileClip yang sama membuat reader MoviePy seek mundur (restart ffmpeg /
+# decode ulang dari keyframe jauh) di setiap pergantian segmen. Di sini
+# pembacaan dijadwalkan per sumber, urut waktu: satu proses ffmpeg per sumber
+# men-decode maju sekali dan menulis tiap segmen ke file sendiri; urutan
+# timeline (yang disetujui user) disusun ulang dari file-file tersebut.
+def schedule_segment_reads(segs: list) -> dict:
+    """
+    Jadwal baca segs: {src_idx: [(start, end, k), ...]} — dikelompokkan per
+    sumber dan diurutkan menurut start; k = posisi segmen di timeline.
+    """
+    plan = {}
+    for k, s in enumerate(segs):
+        plan.setdefault(s["src_idx"], []).append((s["start"], s["end"], k))
+    for items in plan.values():
+        items.sort()
+    return plan
+
+
+def extract_segments_ffmpeg(src: str, items: list, src_size: tuple,
+                            has_audio: bool = True, out_size: tuple | None = None,
+                            blur: str = "full", fmt: str = "h264_sgop",
+                            fps: float = 24, threads: int = 0) -> None:
+    """
+    Ekstrak beberapa segmen [start, end) dari SATU sumber dalam satu sapuan
+    maju: satu proses ffmpeg, seek sekali ke start terkecil, decode berhenti
+    di end terbesar. Frame di luar segmen dibuang (select), celah antar
+    segmen dirapatkan (setpts), lalu SATU encoder menulis aliran gabungan
+    yang dipotong muxer segment di batas tiap segmen (keyframe dipaksa) →
+    memori tetap satu encoder berapa pun jumlah segmennya.
+    items = [(start, end, out_path)]; segmen yang tumpang tindih dipindah ke
+    sapuan berikutnya. out_size (w, h) → sekalian di-reframe 9:16
+    (build_reframe_filtergraph); None → ukuran sumber (file antara untuk
+    fit_to_916). fmt: kunci P1_FORMATS. fps: frame rate file segmen (CFR —
+    setelah select/setpts ffmpeg tidak lagi tahu frame rate sumber).
+    Raise RuntimeError jika ffmpeg gagal.
+    """
+    if not items:
+        return
+    sweep, rest = [], []
+    for it in sorted(items):
+        (sweep if not sweep or it[0] >= sweep[-1][1] else rest).append(it)
+
+    spec = P1_FORMATS.get(fmt, P1_FORMATS[P1_DEFAULT_FORMAT])
+    s0   = max(0.0, sweep[0][0])
+    rel  = [(a - s0, b - s0) for a, b, _ in sweep]
+    keep = "+".join(f"gte(t,{a:.6f})*lt(t,{b:.6f})" for a, b in rel)
+    # Geser tiap segmen sebesar total celah sebelumnya → timeline rapat
+    gaps = "+".join(f"gte(T,{a:.6f})*{a - rel[k - 1][1]:.6f}"
+                    for k, (a, _) in enumerate(rel) if k > 0) or "0"
+    cuts, acc = [], 0.0
+    for a, b in rel[:-1]:
+        acc += b - a
+        cuts.append(f"{acc:.6f}")
+
+    vchain = f"[0:v]select='{keep}',setpts='PTS-({gaps})/TB'"
+    if out_size is not None:
+        graph = [vchain + "[t]",
+                 build_reframe_filtergraph(src_size, *out_size, blur, fps,
+                                           src="t", out="v")]
+    else:
+        graph = [vchain + f",fps={fps:g}[v]"]
+    maps  = ["-map", "[v]"]
+    if has_audio:
+        graph.append(f"[0:a]aselect='{keep}',asetpts='PTS-({gaps})/TB'[a]")
+        maps += ["-map", "[a]", "-c:a", spec["audio"]]
+    if cuts:
+        # segment_time_delta ½ frame: tanpa itu muxer melewatkan keyframe paksa
+        # saat encoder memakai B-frame (format h264 long-GOP)
+        maps += ["-force_key_frames", ",".join(cuts), "-segment_times", ",".join(cuts),
+                 "-segment_time_delta", f"{0.5 / fps:.6f}"]
+    else:                                   # default muxer segment = potong tiap 2 dtk
+        maps += ["-segment_time", "86400"]
+    part = sweep[0][2] + ".part%03d" + spec["ext"]
+    cmd  = [
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-ss", f"{s0:.3f}", "-t", f"{rel[-1][1]:.3f}", "-i", src,
+        "-filter_complex", ";".join(graph),
+        "-filter_complex_threads", str(threads),
+        *maps,
+        "-c:v", spec["codec"], *spec["params"], "-threads", str(threads),
+        "-f", "segment", "-segment_format", spec["ext"].lstrip("."),
+        "-reset_timestamps", "1",
+        part,
+    ]
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    n_ok = 0
+    for k, (_, _, path) in enumerate(sweep):
+        piece = part % k
+        if os.path.exists(piece):
+            os.replace(piece, path)
+            n_ok += 1
+    _safe_remove(part % len(sweep))   # sisa potongan (tidak seharusnya ada)
+    if r.returncode != 0 or n_ok != len(sweep):
+        raise RuntimeError(f"ffmpeg ekstraksi segmen gagal: {r.stderr.strip()[-400:]}")
+    if rest:
+        extract_segments_ffmpeg(src, rest, src_size, has_audio, out_size, blur, fmt,
+                                fps, threads)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 14 — KEN BURNS PHOTO SLIDESHOW
+# ═══════════════════════════════════════════════════════════════════════════════
+def photo_to_clip(img_path: str, duration: float,
+                  out_w: int, out_h: int,
+                  zoom_end: float = 1.15) -> VideoClip:
+    """
+    Buat VideoClip dari satu foto dengan Ken Burns Effect (slow zoom-in).
+
+    Mekanisme:
+      1. Render base_frame pada ukuran yang lebih besar (out_w * zoom_end).
+         Foto landscape di-fit dengan foreground center + background blur.
+      2. Setiap frame(t): crop area yang makin mengecil seiring waktu.
+         t=0 → crop = base (ukuran terbesar, skala 1.0)
+         t=dur → crop = output (ukuran target, skala zoom_end)
+         Efek visual: objek terlihat perlahan membesar / zoom-in.
+    """
+    MAX_SCALE = zoom_end
+    base_w    = int(out_w * MAX_SCALE)
+    base_h    = int(out_h * MAX_SCALE)
+
+    # ── Render base frame pada ukuran diperbesar ──────────────────────────────
+    img      = Image.open(img_path).convert("RGB")
+    iw, ih   = img.size
+    sr, dr   = iw / ih, base_w / base_h
+
+    if abs(sr - dr) < 0.05:
+        base_frame = np.array(img.resize((base_w, base_h), Image.LANCZOS))
+    else:
+        # Buat latar belakang blur
+        scale_h  = base_h / ih
+        bg_w_raw = max(base_w, int(iw * scale_h))
+        bg       = img.resize((bg_w_raw, base_h), Image.LANCZOS)
+        bg       = bg.filter(ImageFilter.GaussianBlur(radius=25))
+        if bg_w_raw > base_w:
+            x1 = (bg_w_raw - base_w) // 2
+            bg = bg.crop((x1, 0, x1 + base_w, base_h))
+        # Tempel foreground di tengah vertikal
+        fg_h   = max(1, int(base_w / sr))
+        fg_img = img.resize((base_w, fg_h), Image.LANCZOS)
+        fg_y0  = (base_h - fg_h) // 2
+        canvas = bg.copy()
+        canvas.paste(fg_img, (0, fg_y0))
+        base_frame = np.array(canvas)
+
+    base_frame = base_frame.astype(np.uint8)
+    _bw, _bh   = base_w, base_h
+    _ow, _oh   = out_w, out_h
+
+    def make_frame(t: float) -> np.ndarray:
+        progress = min(t / max(duration, 1e-6), 1.0)
+        # t=0 → crop seluruh base; t=dur → crop hanya area output
+        crop_w = max(_ow, int(_bw - (_bw - _ow) * progress))
+        crop_h = max(_oh, int(_bh - (_bh - _oh) * progress))
+        x1 = max(0, (_bw - crop_w) // 2)
+        y1 = max(0, (_bh - crop_h) // 2)
+        cropped = base_frame[y1:y1 + crop_h, x1:x1 + crop_w]
+        return np.array(
+            Image.fromarray(cropped).resize((_ow, _oh), Image.BILINEAR)
+        ).astype(np.uint8)
+
+    return VideoClip(make_frame, duration=duration).with_fps(24)
+
+
+def build_photo_slideshow(photo_paths: list, target_dur: int,
+                           out_w: int, out_h: int,
+                           fade_dur: float = 0.5,
+                           zoom_end: float = 1.15) -> VideoClip:
+    """
+    Bangun slideshow dari foto dengan Ken Burns Effect + crossfade antar foto.
+    Guard: raise ValueError jika photo_paths kosong.
+    """
+    if not photo_paths:
+        raise ValueError("build_photo_slideshow: daftar foto tidak boleh kosong")
+
+    n      = len(photo_paths)
+    per_ph = max(5.0, min(8.0, target_dur / n))
+
+    clips = [photo_to_clip(p, per_ph, out_w, out_h, zoom_end=zoom_end)
+             for p in photo_paths]
+
+    faded = []
+    for i, c in enumerate(clips):
+        fx = []
+        if i > 0:     fx.append(FadeIn(fade_dur))
+        if i < n - 1: fx.append(FadeOut(fade_dur))
+        faded.append(c.with_effects(fx) if fx else c)
+
+    return concatenate_videoclips(faded, method="chain")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 15 — FORMAT INTERMEDIATE PASS 1 (mezzanine)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Pass 1 di-decode ulang setiap "Re-render Pass 2". Format short-GOP / all-intra
+# visually lossless membuat decode lebih murah & tidak menumpuk kehilangan
+# kualitas; audio disimpan PCM agar tidak di-encode AAC dua kali.
+P1_FORMATS = {
+    "h264": {
+        "label" : "H.264 long-GOP · file kecil, lossy",
+        "ext"   : ".mp4",
+        "codec" : "libx264",
+        "audio" : "aac",
+        "params": ["-pix_fmt", "yuv420p"],
+    },
+    "h264_sgop": {
+        "label" : "H.264 short-GOP · visually lossless",
+        "ext"   : ".mov",
+        "codec" : "libx264",
+        "audio" : "pcm_s16le",
+        "params": ["-pix_fmt", "yuv420p", "-preset", "veryfast",
+                   "-tune", "fastdecode", "-crf", "12", "-g", "12", "-bf", "0"],
+    },
+    "h264_intra": {
+        "label" : "H.264 all-intra · visually lossless, seek instan",
+        "ext"   : ".mov",
+        "codec" : "libx264",
+        "audio" : "pcm_s16le",
+        "params": ["-pix_fmt", "yuv420p", "-preset", "veryfast",
+                   "-tune", "fastdecode", "-crf", "12", "-g", "1"],
+    },
+    "mjpeg": {
+        "label" : "MJPEG all-intra · decode paling ringan, file besar",
+        "ext"   : ".mov",
+        "codec" : "mjpeg",
+        "audio" : "pcm_s16le",
+        "params": ["-q:v", "2", "-pix_fmt", "yuvj420p"],
+    },
+}
+P1_DEFAULT_FORMAT = "h264"
+_P1_META_KEY      = "mansion_p1"
+
+
+def p1_write_kwargs(fmt: str) -> dict:
+    """Argumen write_videofile untuk format Pass 1, termasuk tag metadata format."""
+    key  = fmt if fmt in P1_FORMATS else P1_DEFAULT_FORMAT
+    spec = P1_FORMATS[key]
+    return {
+        "codec"        : spec["codec"],
+        "audio_codec"  : spec["audio"],
+        "ffmpeg_params": spec["params"] + ["-metadata", f"comment={_P1_META_KEY}={key}"],
+    }
+
+
+def probe_p1_format(path: str) -> str:
+    """Baca tag format dari metadata file Pass 1. Return "" jika tidak ada."""
+    try:
+        r = subprocess.run(["ffmpeg", "-hide_banner", "-i", path],
+                           capture_output=True, text=True, timeout=10)
+        m = re.search(rf"{_P1_META_KEY}=(\w+)", r.stderr)
+        return m.group(1) if m else ""
+    except Exception:
+        return ""
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 16 — PASS 1 PARALEL (per segmen + jendela transisi)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Timeline Pass 1 dipecah menjadi potongan frame: badan tiap segmen (hanya satu
+# klip aktif) dan jendela transisi crossfade (dua klip aktif). Setiap potongan
+# dirender worker terpisah (run_worker_procs) lewat jalur pipe native dari
+# file segmen yang SAMA dengan render serial (iter_pass1_native), lalu digabung
+# via concat demuxer (-c copy) + audio sekali.
+def plan_pass1_pieces(durs: list, transition: str, fade_d: float,
+                      n_frames: int, fps: int = 24) -> list[dict]:
+    """
+    Bagi [0, n_frames) menjadi potongan {"kind", "frames": (g0, g1)}.
+    kind "segmen" = badan satu klip, "transisi" = overlap crossfade.
+    Frame global k (waktu k/fps) masuk potongan yang rentang waktunya memuat k/fps.
+    """
+
+    def _fi(t):
+        return min(max(int(math.ceil(t * fps - 1e-6)), 0), n_frames)
+
+    cuts = []                                  # (waktu mulai, kind)
+    if transition == "Crossfade" and len(durs) > 1:
+        starts, fd, _ = _crossfade_starts(durs, fade_d)
+        for i, s0 in enumerate(starts):
+            cuts.append((s0 + (fd if i > 0 else 0.0), "segmen"))
+            if i < len(durs) - 1:
+                cuts.append((starts[i + 1], "transisi"))
+    else:                                      # Fade to Black / tanpa transisi: chain
+        s0 = 0.0
+        for d in durs:
+            cuts.append((s0, "segmen"))
+            s0 += d
+
+    pieces = []
+    for j, (t0, kind) in enumerate(cuts):
+        g0 = _fi(t0)
+        g1 = _fi(cuts[j + 1][0]) if j + 1 < len(cuts) else n_frames
+        if g1 > g0:
+            pieces.append({"kind": kind, "frames": (g0, g1)})
+    return pieces
+
+
+def make_logo_overlay(logo_pil, out_w: int, out_h: int):
+    """
+    Overlay logo (PIL RGBA) lebar 20% frame, tengah atas → fungsi frame → frame.
+    Frame yang terlalu kecil dikembalikan apa adanya.
+    """
+    lw = max(20, int(out_w * 0.20))
+    lh = max(1,  int(logo_pil.height * lw / logo_pil.width))
+    lr = logo_pil.resize((lw, lh), Image.LANCZOS).convert("RGBA")
+    ln = np.array(lr).astype(np.float32)
+    lx = (out_w - lw) // 2
+    ly = min(max(4, int(out_h * 0.03)), out_h - lh - 4)
+
+    def _add_logo(frame,
+                  _ln=ln, _lx=lx, _ly=ly, _lw=lw, _lh=lh):
+        if frame.shape[0] < _ly + _lh or frame.shape[1] < _lx + _lw:
+            return frame
+        out   = frame.copy().astype(np.float32)
+        patch = out[_ly:_ly + _lh, _lx:_lx + _lw]
+        alpha = _ln[:, :, 3:] / 255.0
+        out[_ly:_ly + _lh, _lx:_lx + _lw] = (
+            patch * (1.0 - alpha) + _ln[:, :, :3] * alpha
+        )
+        return out.astype(np.uint8)
+
+    return _add_logo
+
+
+def iter_pass1_native(srcs: list, durs: list, fade_d: float, out_w: int, out_h: int,
+                      blur: str = "full", blur_every: int = 1, logo=None,
+                      frames: tuple | None = None):
+    """
+    Frame timeline Pass 1 lewat jalur pipe native (tanpa get_frame(t)):
+    reader ffmpeg per segmen → fit 9:16 → logo → crossfade/sambung.
+
+    srcs  : (path, start, fps, size) per klip sesuai urutan timeline.
+    fade_d: durasi crossfade; 0 → sambung biasa.
+    logo  : fungsi frame → frame (make_logo_overlay) atau None.
+    frames: (g0, g1) → hanya frame global [g0, g1) (potongan worker paralel).
+    """
+    plan = crossfade_plan(durs, fade_d)
+    if frames is not None:
+        plan = plan[frames[0]:frames[1]]
+    streams = []
+    for k, (path, s0, fps, size) in enumerate(srcs):
+        lts = [lt for ent in plan for i, lt, _ in ent if i == k]
+        fr  = fit_to_916_iter(iter_clip_frames(path, size, fps, s0, lts),
+                              size, out_w, out_h, blur=blur, blur_every=blur_every)
+        if logo is not None:
+            fr = (logo(f) for f in fr)
+        streams.append(fr)
+    return crossfade_iter(streams, plan)
+
+
+def _pass1_piece_worker(job: dict) -> None:
+    """Worker: render potongan-potongan timeline Pass 1 ke file masing-masing (tanpa audio)."""
+    w, h = job["out_size"]
+    kind = P1_FORMATS[job["fmt"]]
+    logo = make_logo_overlay(job["logo"], w, h) if job["logo"] is not None else None
+    for g0, g1, out in job["pieces"]:
+        n = write_frames_ffmpeg(
+            iter_pass1_native(job["srcs"], job["durs"], job["fade"], w, h,
+                              blur=job["blur"], blur_every=job["blur_every"],
+                              logo=logo, frames=(g0, g1)),
+            out, (w, h), codec=kind["codec"], params=kind["params"],
+            extra=["-threads", str(job["threads"])],
+        )
+        if n != g1 - g0:
+            raise RuntimeError(f"potongan frame {g0}–{g1}: hanya {n} frame")
+
+
+def render_pass1_parallel(srcs: list, durs: list, transition: str, fade_d: float,
+                          out_size: tuple, audio, pass1_path: str, fmt: str,
+                          workers: int, blur: str = "full", blur_every: int = 1,
+                          logo_pil=None) -> int:
+    """
+    Render timeline Pass 1 paralel per segmen / transisi, tulis ke pass1_path.
+
+    srcs      : (path, start, fps, size) per klip — file segmen / sumber yang
+                dibaca worker lewat iter_pass1_native (tanpa objek MoviePy).
+    durs      : durasi tiap klip 9:16 sesuai urutan timeline.
+    transition: "Crossfade" atau tanpa transisi (Fade to Black tidak didukung).
+    audio     : audio timeline (AudioClip) atau None.
+    Return jumlah potongan. Raise RuntimeError jika gagal.
+    File potongan, audio & daftar concat selalu dihapus.
+    """
+    if transition == "Fade to Black":
+        raise ValueError("Pass 1 paralel hanya untuk Crossfade / tanpa transisi")
+
+    kind   = P1_FORMATS[fmt]
+    fade   = fade_d if transition == "Crossfade" else 0.0
+    n_fr   = len(crossfade_plan(durs, fade))
+    pieces = plan_pass1_pieces(durs, transition, fade_d, n_fr)
+    for k, pc in enumerate(pieces):
+        pc["out"] = _tmp(f"tmp_{SID}_p1piece_{k}{kind['ext']}")
+
+    # Bagi rata beban: potongan terpanjang dulu ke worker paling ringan
+    n_proc = max(1, min(int(workers), len(pieces)))
+    loads  = [[0, []] for _ in range(n_proc)]
+    for pc in sorted(pieces, key=lambda p: p["frames"][0] - p["frames"][1]):
+        w = min(loads, key=lambda l: l[0])
+        w[0] += pc["frames"][1] - pc["frames"][0]
+        w[1].append((*pc["frames"], pc["out"]))
+    jobs = [{
+        "task"      : "pass1",
+        "srcs"      : list(srcs),
+        "durs"      : list(durs),
+        "fade"      : fade,
+        "out_size"  : tuple(out_size),
+        "blur"      : blur,
+        "blur_every": blur_every,
+        "logo"      : logo_pil,
+        "fmt"       : fmt,
+        "threads"   : max(1, FFMPEG_THREADS // n_proc),
+        "pieces"    : piece_list,
+    } for _, piece_list in loads]
+
+    concat_txt = _tmp(f"tmp_{SID}_p1concat.txt")
+    audio_tmp  = _tmp(f"tmp_{SID}_p1audio.wav")
+    try:
+        run_worker_procs(jobs, "Worker")
+
+        with open(concat_txt, "w") as fh:
+            for pc in pieces:
+                fh.write(f"file '{pc['out']}'\n")
+
+        cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+               "-f", "concat", "-safe", "0", "-i", concat_txt]
+        if audio is not None:
+            audio.write_audiofile(audio_tmp, fps=44100, logger=None)
+            cmd += ["-i", audio_tmp, "-map", "0:v", "-map", "1:a",
+                    "-c:a", kind["audio"], "-shortest"]
+        cmd += ["-c:v", "copy",
+                "-metadata", f"comment={_P1_META_KEY}={fmt}",
+                pass1_path]
+        r = subprocess.run(cmd, capture_output=True, text=True)
+        if r.returncode != 0 or not os.path.exists(pass1_path):
+            raise RuntimeError(f"ffmpeg concat Pass 1 gagal: {r.stderr.strip()[-400:]}")
+        return len(pieces)
+    finally:
+        for pc in pieces:
+            _safe_remove(pc["out"])
+        _safe_remove(concat_txt)
+        _safe_remove(audio_tmp)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 17 — CACHE FRAME MENTAH PASS 1 (np.memmap)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Re-render Pass 2 berkali-kali (mis. hanya ganti typo caption) tidak perlu
+# decode ulang Pass 1: render pertama menyalin setiap frame hasil decode ke file
+# RGB mentah, render berikutnya membaca frame langsung dari memmap (zero-copy).
+FRAME_CACHE_MAX_BYTES  = 6 * 1024 ** 3   # batas atas satu cache (± 6 GB)
+FRAME_CACHE_HEADROOM   = 1 * 1024 ** 3   # sisa ruang disk minimal setelah cache
+FRAME_CACHE_DISK_SHARE = 0.5             # porsi ruang bebas TMP_DIR untuk semua cache
+
+
+def _active_sessions() -> int:
+    """Jumlah sesi yang punya file Pass 1 di TMP_DIR (termasuk sesi ini)."""
+    sids = {os.path.basename(fp).split("_")[1]
+            for fp in glob.glob(_tmp("tmp_*_pass1.*"))}
+    sids.add(SID)
+    return len(sids)
+
+
+def frame_cache_budget() -> tuple[int, int, int]:
+    """
+    Jatah byte cache frame untuk sesi ini: FRAME_CACHE_DISK_SHARE dari ruang
+    bebas TMP_DIR (setelah FRAME_CACHE_HEADROOM) dibagi rata ke sesi aktif,
+    maks. FRAME_CACHE_MAX_BYTES. Return (jatah, ruang bebas, jumlah sesi).
+    """
+    try:
+        free = shutil.disk_usage(TMP_DIR).free
+    except Exception:
+        free = 0
+    n_ses = _active_sessions()
+    share = int(max(0, free - FRAME_CACHE_HEADROOM) * FRAME_CACHE_DISK_SHARE) // n_ses
+    return min(FRAME_CACHE_MAX_BYTES, share), free, n_ses
+
+
+def _frame_cache_base(pass1_path: str, fps: int) -> str:
+    """Prefix path cache — kunci = path + ukuran + mtime file Pass 1 + fps."""
+    stt = os.stat(pass1_path)
+    raw = f"{os.path.abspath(pass1_path)}|{stt.st_size}|{stt.st_mtime_ns}|{fps}"
+    return _tmp(f"tmp_{SID}_fcache_{hashlib.sha1(raw.encode()).hexdigest()[:16]}")
+
+
+def open_frame_cache(pass1_path: str, n: int, w: int, h: int,
+                     fps: int = 24) -> tuple[dict | None, str]:
+    """
+    Buka cache frame untuk pass1_path dengan n frame berukuran w×h.
+
+    Return: (cache, pesan)
+      cache["mode"] == "read"  → cache lengkap, baca via cache["mm"][i]
+      cache["mode"] == "write" → cache baru, isi via frame_cache_put()
+      cache None               → cache tidak dipakai (melebihi frame_cache_budget)
+
+    Cache milik Pass 1 lama (mtime berbeda) langsung dihapus.
+    """
+    base  = _frame_cache_base(pass1_path, fps)
+    data  = base + ".rgb"
+    meta  = base + ".json"
+    shape = (n, h, w, 3)
+    need  = n * h * w * 3
+
+    for fp in glob.glob(_tmp(f"tmp_{SID}_fcache_*")):
+        if not fp.startswith(base):
+            _safe_remove(fp)
+
+    try:
+        with open(meta) as fh:
+            info = json.load(fh)
+        if tuple(info["shape"]) == shape and os.path.getsize(data) == need:
+            os.utime(data)             # ← jaga agar tidak disapu auto_cleanup
+            os.utime(meta)
+            mm = np.memmap(data, dtype=np.uint8, mode="r", shape=shape)
+            return {"mode": "read", "mm": mm, "n": n, "data": data}, "💾 Frame Pass 1 dari cache (tanpa decode)"
+    except Exception:
+        _safe_remove(meta)
+
+    budget, free, n_ses = frame_cache_budget()
+    if need > budget:
+        return None, (f"Cache frame dilewati: {need / 1024 ** 3:.1f} GB melebihi jatah "
+                      f"{budget / 1024 ** 3:.1f} GB (disk bebas {free / 1024 ** 3:.1f} GB, "
+                      f"{n_ses} sesi aktif)")
+
+    try:
+        _safe_remove(data)
+        mm = np.memmap(data, dtype=np.uint8, mode="w+", shape=shape)
+    except Exception as e:
+        _safe_remove(data)
+        return None, f"Cache frame dilewati: {e}"
+    return ({"mode": "write", "mm": mm, "n": n, "seen": np.zeros(n, dtype=bool),
+             "data": data, "meta": meta, "shape": shape},
+            f"💾 Menyimpan frame Pass 1 ke cache ({need / 1_048_576:.0f} MB)")
+
+
+def frame_cache_put(cache: dict, t: float, frame: np.ndarray, fps: int = 24) -> None:
+    """Salin satu frame hasil decode ke cache mode "write"."""
+    i = int(round(t * fps))
+    if 0 <= i < cache["n"] and frame.shape == cache["mm"].shape[1:]:
+        cache["mm"][i] = frame
+        cache["seen"][i] = True
+
+
+def frame_cache_get(cache: dict, t: float, fps: int = 24) -> np.ndarray:
+    """Frame ke-i dari cache mode "read" — view memmap, tanpa salinan."""
+    return cache["mm"][min(max(int(round(t * fps)), 0), cache["n"] - 1)]
+
+
+def close_frame_cache(cache: dict | None, ok: bool) -> None:
+    """
+    Tutup memmap. Cache "write" hanya disahkan (file .json ditulis) jika render
+    sukses DAN semua frame terisi — selain itu file mentahnya dihapus.
+    """
+    if cache is None or cache.get("mm") is None:
+        return
+    mm, cache["mm"] = cache["mm"], None
+    if cache["mode"] != "write":
+        del mm
+        return
+    try:
+        mm.flush()
+    except Exception:
+        ok = False
+    del mm
+    if ok and cache["seen"].all():
+        try:
+            with open(cache["meta"], "w") as fh:
+                json.dump({"shape": list(cache["shape"])}, fh)
+            return
+        except Exception:
+            pass
+    _safe_remove(cache["meta"])
+    _safe_remove(cache["data"])
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 18 — PASS 2 BACKEND: FFMPEG FILTERGRAPH (tanpa loop frame Python)
+# ═══════════════════════════════════════════════════════════════════════════════
+PASS2_BACKENDS = {
+    "python": "🐍 Python · frame kernel",
+    "ffmpeg": "⚡ ffmpeg filtergraph (multi-thread)",
+    "softsub": "📝 Soft subtitle · track teks, tanpa re-encode",
+}
+FFMPEG_THREADS = os.cpu_count() or 1
+
+
+def _sprite_to_rgba(sprite: dict) -> Image.Image:
+    """Kembalikan sprite (premultiplied) menjadi Image RGBA biasa untuk PNG."""
+    a   = 255 - sprite["inv"].astype(np.uint16)
+    rgb = (sprite["rgb"].astype(np.uint16) * 255 + a // 2) // np.maximum(a, 1)
+    return Image.fromarray(
+        np.concatenate([np.minimum(rgb, 255), a], axis=-1).astype(np.uint8), "RGBA",
+    )
+
+
+def _grade_filters(grade: tuple) -> list[str]:
+    """
+    Padanan ffmpeg untuk compile_grade (mendekati, bukan identik):
+    brightness → colorchannelmixer (kali RGB), contrast/saturation → eq
+    (pivot contrast di tengah, bukan mean frame), sharpness → unsharp 3×3.
+    """
+    br, co, sa, sh = grade
+    chain = []
+    if br != 1.0:
+        chain.append(f"colorchannelmixer=rr={br:.4f}:gg={br:.4f}:bb={br:.4f}")
+    if co != 1.0 or sa != 1.0:
+        chain.append(f"eq=contrast={co:.4f}:saturation={sa:.4f}")
+    if sh != 1.0:
+        amt = (sh - 1.0) * 9 / 13   # (c − SMOOTH) = (9c − box9)/13 vs (c − box)/9
+        chain.append(f"unsharp=lx=3:ly=3:la={amt:.4f}:cx=3:cy=3:ca={amt:.4f}")
+    return chain
+
+
+def build_pass2_filtergraph(schedule: list, total: float,
+                            out_w: int, out_h: int, bar_h: int,
+                            grade: tuple | None = None, fps: int = 24) -> str:
+    """
+    Susun filter_complex Pass 2. Input 0 = Pass 1, input 1..n = PNG sprite
+    sesuai urutan schedule. Output label [vout].
+
+      grading → overlay tiap sprite
+              (enable = t0 ≤ t < t1) → drawbox redup di baris progress bar
+              → overlay bar putih yang bergeser sesuai t
+    """
+    if any(ent.get("anim") for ent in schedule):
+        raise ValueError("animasi caption belum didukung backend ffmpeg")
+    chain = _grade_filters(grade) if grade is not None else []
+    parts = [f"[0:v]{','.join(chain) or 'null'}[v0]"]
+    for i, ent in enumerate(schedule, start=1):
+        sp = ent["sprite"]
+        parts.append(
+            f"[v{i - 1}][{i}:v]overlay=x={sp['x']}:y={sp['y']}"
+            f":enable='gte(t,{ent['t0']:.4f})*lt(t,{ent['t1']:.4f})'[v{i}]"
+        )
+    last = f"v{len(schedule)}"
+    if total > 0:
+        y0 = max(0, out_h - bar_h)
+        parts += [
+            f"[{last}]drawbox=x=0:y={y0}:w=iw:h={bar_h}:color=black@0.7:t=fill[vd]",
+            f"color=c=white:s={out_w}x{bar_h}:r={fps}[bar]",
+            f"[vd][bar]overlay=x='W*min(t/{total:.4f},1)-w':y={y0}:shortest=1[vb]",
+        ]
+        last = "vb"
+    parts.append(f"[{last}]format=yuv420p[vout]")
+    return ";".join(parts)
+
+
+def render_pass2_ffmpeg(pass1_path: str, out_path: str,
+                        schedule: list, total: float,
+                        out_w: int, out_h: int, bar_h: int,
+                        grade: tuple | None = None,
+                        audio_path: str = "",
+                        threads: int = FFMPEG_THREADS) -> None:
+    """
+    Render Pass 2 sepenuhnya di dalam ffmpeg: sprite ditulis SEKALI sebagai
+    PNG, lalu grading + overlay + progress bar berjalan di filtergraph
+    multi-thread pada kecepatan encoder.
+
+    audio_path: file audio hasil mix BGM; kosong → audio Pass 1 dipakai.
+    Raise RuntimeError jika ffmpeg gagal. PNG sementara selalu dihapus.
+    """
+    pngs = []
+    try:
+        cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+               "-i", pass1_path]
+        for i, ent in enumerate(schedule):
+            png = _tmp(f"tmp_{SID}_p2ov_{i}.png")
+            _sprite_to_rgba(ent["sprite"]).save(png, compress_level=1)
+            pngs.append(png)
+            cmd += ["-i", png]
+        amap = "0:a?"
+        if audio_path:
+            cmd += ["-i", audio_path]
+            amap = f"{len(pngs) + 1}:a"
+
+        cmd += [
+            "-filter_complex", build_pass2_filtergraph(
+                schedule, total, out_w, out_h, bar_h, grade),
+            "-filter_complex_threads", str(threads),
+            "-map", "[vout]", "-map", amap,
+            "-c:v", "libx264", "-pix_fmt", "yuv420p", "-r", "24",
+            "-threads", str(threads),
+            "-c:a", "aac",
+            out_path,
+        ]
+        r = subprocess.run(cmd, capture_output=True, text=True)
+        if r.returncode != 0 or not os.path.exists(out_path):
+            raise RuntimeError(f"ffmpeg Pass 2 gagal: {r.stderr.strip()[-400:]}")
+    finally:
+        for png in pngs:
+            _safe_remove(png)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 19 — PASS 2 SOFT SUBTITLE (track mov_text · sidecar WebVTT · stream copy)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Untuk tujuan yang menerima track subtitle: video Pass 1 di-copy apa adanya,
+# caption + CTA dimux sebagai track teks. Edit caption = tulis ulang container
+# (tanpa decode/encode video), durasi video tidak berpengaruh. Grading &
+# progress bar butuh re-encode → tidak ada di mode ini (pakai backend burn-in).
+def caption_cues(captions: list, cta_nama: str, cta_wa: str, cta_label: str,
+                 total_dur: float, cta_dur: float) -> list[tuple[float, float, str]]:
+    """
+    Cue teks [(t0, t1, teks)] dengan jadwal yang sama seperti
+    build_pass2_schedule: caption ke-i di [i·interval, (i+1)·interval),
+    caption terakhir sampai CTA; CTA (label / nama / WA per baris) di akhir.
+    """
+    has_cta = bool(cta_nama.strip() or cta_wa.strip())
+    interval, cta_start = pass2_timing(total_dur, len(captions), cta_dur)
+    end  = cta_start if has_cta else total_dur
+    cues = []
+    for i, cap in enumerate(captions):
+        t0 = i * interval
+        t1 = end if i == len(captions) - 1 else min((i + 1) * interval, end)
+        if cap.strip() and t1 > t0:
+            cues.append((t0, t1, cap.strip()))
+    if has_cta and total_dur > cta_start:
+        rows = [cta_label.strip().upper(), cta_nama.strip().upper(),
+                f"WA: {cta_wa.strip()}" if cta_wa.strip() else ""]
+        cues.append((cta_start, total_dur, "\n".join(r for r in rows if r)))
+    return cues
+
+
+def _vtt_time(t: float) -> str:
+    ms = max(0, int(round(t * 1000)))
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d}.{ms % 1000:03d}"
+
+
+def build_webvtt(cues: list) -> str:
+    """Cue → teks WebVTT (sidecar & input track mov_text)."""
+    out = ["WEBVTT", ""]
+    for i, (t0, t1, txt) in enumerate(cues, start=1):
+        body = txt.replace("-->", "->").replace("\n\n", "\n")
+        out += [str(i), f"{_vtt_time(t0)} --> {_vtt_time(t1)}", body, ""]
+    return "\n".join(out)
+
+
+def render_pass2_softsub(pass1_path: str, out_path: str, cues: list,
+                         audio_path: str = "", lang: str = "ind") -> str:
+    """
+    Mux Pass 1 + track subtitle mov_text ke out_path tanpa re-encode video
+    (-c:v copy). Audio di-copy jika sudah AAC; PCM (Pass 1 .mov) / mix BGM
+    di-encode AAC (audio saja). Sidecar WebVTT ditulis di samping out_path.
+
+    Return path sidecar .vtt. Raise ValueError jika video Pass 1 bukan H.264
+    (MJPEG tidak layak diputar dalam MP4), RuntimeError jika ffmpeg gagal.
+    """
+    r = subprocess.run(["ffmpeg", "-hide_banner", "-i", pass1_path],
+                       capture_output=True, text=True, timeout=10)
+    vc = re.search(r"Video: (\w+)", r.stderr)
+    ac = re.search(r"Audio: (\w+)", r.stderr)
+    if not vc or vc.group(1) != "h264":
+        raise ValueError("video Pass 1 bukan H.264 — soft subtitle butuh format Pass 1 H.264")
+    vtt = os.path.splitext(out_path)[0] + ".vtt"
+    with open(vtt, "w", encoding="utf-8") as fh:
+        fh.write(build_webvtt(cues))
+
+    cmd  = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-i", pass1_path, "-i", vtt]
+    amap, acodec = "0:a?", ("copy" if ac and ac.group(1) == "aac" else "aac")
+    if audio_path:
+        cmd += ["-i", audio_path]
+        amap, acodec = "2:a", "aac"
+    cmd += [
+        "-map", "0:v", "-map", amap, "-map", "1:s",
+        "-c:v", "copy", "-c:a", acodec, "-c:s", "mov_text",
+        "-metadata:s:s:0", f"language={lang}",
+        "-movflags", "+faststart",
+        out_path,
+    ]
+    r = subprocess.run(cmd, capture_output=True, text=True)
+    if r.returncode != 0 or not os.path.exists(out_path):
+        _safe_remove(vtt)
+        raise RuntimeError(f"ffmpeg soft subtitle gagal: {r.stderr.strip()[-400:]}")
+    return vtt
+
+
+def _read_sidecar(out_path: str) -> bytes | None:
+    """Isi sidecar WebVTT milik out_path, atau None jika render bukan softsub."""
+    vtt = os.path.splitext(out_path)[0] + ".vtt"
+    if not os.path.exists(vtt):
+        return None
+    with open(vtt, "rb") as fh:
+        return fh.read()
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 20 — PASS 2 PARALEL (chunk waktu · proses worker)
 # ═══════════════════════════════════════════════════════════════════════════════
-def photo_to_clip(img_path: str, duration: float,
-                  out_w: int, out_h: int,
-                  zoom_end: float = 1.15) -> VideoClip:
+# Timeline Pass 1 dipecah menjadi N rentang frame; tiap worker (proses Python
+# terpisah, lihat run_worker_procs) merender rentangnya dengan kernel &
+# schedule yang sama ke file chunk tanpa audio. Chunk digabung lossless via
+# concat demuxer (-c copy), audio di-mux SEKALI di akhir.
+PASS2_WORKERS     = os.cpu_count() or 1
+PASS2_MIN_CHUNK_S = 2.0     # chunk lebih pendek → overhead proses > hasil
+
+
+def run_worker_procs(jobs: list, label: str) -> None:
     """
-    Buat VideoClip dari satu foto dengan Ken Burns Effect (slow zoom-in).
+    Jalankan tiap job (dict picklable, kunci "task" → _WORKER_TASKS) di proses
+    Python terpisah secara paralel:  python mansionvidgen.py --worker job.pkl
+    Tidak ada fork dari server Streamlit yang multi-thread — worker meng-import
+    ulang skrip ini dan berhenti sebelum bagian UI.
+    Raise RuntimeError berisi ekor stderr worker yang gagal.
+    File job & log selalu dihapus.
+    """
+    script = os.path.abspath(__file__)
+    runs   = []
+    try:
+        for k, job in enumerate(jobs):
+            jp = _tmp(f"tmp_{SID}_{job['task']}job_{k}.pkl")
+            lp = _tmp(f"tmp_{SID}_{job['task']}job_{k}.log")
+            with open(jp, "wb") as fh:
+                pickle.dump(job, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            with open(lp, "wb") as log:
+                pr = subprocess.Popen([sys.executable, script, "--worker", jp],
+                                      stdin=subprocess.DEVNULL,
+                                      stdout=subprocess.DEVNULL, stderr=log)
+            runs.append((pr, jp, lp))
+
+        errs = []
+        for k, (pr, _, lp) in enumerate(runs):
+            pr.wait()
+            st.write(f"  {'✅' if pr.returncode == 0 else '❌'} {label} {k + 1}/{len(runs)}")
+            if pr.returncode != 0:
+                with open(lp, encoding="utf-8", errors="replace") as fh:
+                    tail = (fh.read().strip().splitlines() or [""])[-1][-300:]
+                errs.append(f"{label.lower()} {k + 1} → {tail or f'exit {pr.returncode}'}")
+        if errs:
+            raise RuntimeError("; ".join(errs))
+    finally:
+        for pr, jp, lp in runs:
+            if pr.poll() is None:
+                pr.kill()
+                pr.wait()
+            _safe_remove(jp)
+            _safe_remove(lp)
 
-    Mekanisme:
-      1. Render base_frame pada ukuran yang lebih besar (out_w * zoom_end).
-         Foto landscape di-fit dengan foreground center + background blur.
-      2. Setiap frame(t): crop area yang makin mengecil seiring waktu.
-         t=0 → crop = base (ukuran terbesar, skala 1.0)
-         t=dur → crop = output (ukuran target, skala zoom_end)
-         Efek visual: objek terlihat perlahan membesar / zoom-in.
+
+def _run_worker(job_path: str) -> int:
+    """Entry point proses worker: jalankan satu job, error → stderr + exit 1."""
+    try:
+        with open(job_path, "rb") as fh:
+            job = pickle.load(fh)
+        _WORKER_TASKS[job["task"]](job)
+        return 0
+    except Exception as e:
+        print(f"{type(e).__name__}: {e}", file=sys.stderr)
+        return 1
+
+
+def _pass2_chunk_worker(job: dict) -> None:
     """
-    MAX_SCALE = zoom_end
-    base_w    = int(out_w * MAX_SCALE)
-    base_h    = int(out_h * MAX_SCALE)
+    Worker: render frame [n0, n1) Pass 1 ke job["out"] lewat pipe ffmpeg
+    (iter_frames_ffmpeg → kernel → write_frames_ffmpeg).
+    Sumber frame: cache memmap (mode "read") atau decode Pass 1 mulai frame n0 —
+    jika cache mode "write", frame hasil decode sekalian disalin ke memmap.
+    Raise RuntimeError jika jumlah frame tertulis ≠ n1 − n0.
+    """
+    n0, n1 = job["frames"]
+    fps    = job["fps"]
+    cache  = job["cache"]                 # (path data, shape, mode) atau None
+    mm     = None
+    try:
+        if cache is not None:
+            mm = np.memmap(cache[0], dtype=np.uint8,
+                           mode="r" if cache[2] == "read" else "r+", shape=cache[1])
+        if cache is not None and cache[2] == "read":
+            src = (mm[i] for i in range(n0, min(n1, mm.shape[0])))
+        else:
+            src = iter_frames_ffmpeg(job["src"], job["src_size"],
+                                     start=max(0.0, n0 / fps - 1e-5), n_frames=n1 - n0)
+        kernel = make_pass2_kernel(job["out_w"], job["out_h"], job["schedule"],
+                                   job["total"], job["bar_h"], grade=job["grade"])
+        fill   = mm is not None and cache[2] == "write"
+
+        def _frames():
+            for i, frame in enumerate(src, n0):
+                if fill and i < mm.shape[0]:
+                    mm[i] = frame
+                yield kernel(frame, i / fps)
+
+        n = write_frames_ffmpeg(_frames(), job["out"], job["src_size"], fps=fps,
+                                extra=["-threads", str(job["threads"])])
+        if n != n1 - n0:
+            raise RuntimeError(f"chunk frame {n0}–{n1}: hanya {n} frame")
+        if fill:
+            mm.flush()
+    finally:
+        del mm
+        gc.collect()
 
-    # ── Render base frame pada ukuran diperbesar ──────────────────────────────
-    img      = Image.open(img_path).convert("RGB")
-    iw, ih   = img.size
-    sr, dr   = iw / ih, base_w / base_h
 
-    if abs(sr - dr) < 0.05:
-        base_frame = np.array(img.resize((base_w, base_h), Image.LANCZOS))
-    else:
-        # Buat latar belakang blur
-        scale_h  = base_h / ih
-        bg_w_raw = max(base_w, int(iw * scale_h))
-        bg       = img.resize((bg_w_raw, base_h), Image.LANCZOS)
-        bg       = bg.filter(ImageFilter.GaussianBlur(radius=25))
-        if bg_w_raw > base_w:
-            x1 = (bg_w_raw - base_w) // 2
-            bg = bg.crop((x1, 0, x1 + base_w, base_h))
-        # Tempel foreground di tengah vertikal
-        fg_h   = max(1, int(base_w / sr))
-        fg_img = img.resize((base_w, fg_h), Image.LANCZOS)
-        fg_y0  = (base_h - fg_h) // 2
-        canvas = bg.copy()
-        canvas.paste(fg_img, (0, fg_y0))
-        base_frame = np.array(canvas)
+def render_pass2_parallel(pass1_path: str, out_path: str,
+                          schedule: list, total: float,
+                          out_w: int, out_h: int, bar_h: int,
+                          src_size: tuple,
+                          grade: tuple | None = None,
+                          audio_path: str = "",
+                          workers: int = PASS2_WORKERS,
+                          cache: dict | None = None,
+                          fps: int = 24) -> int:
+    """
+    Render Pass 2 paralel per chunk waktu lalu gabung + mux audio.
 
-    base_frame = base_frame.astype(np.uint8)
-    _bw, _bh   = base_w, base_h
-    _ow, _oh   = out_w, out_h
+    src_size  : (w, h) frame Pass 1.
+    audio_path: file audio hasil mix BGM; kosong → audio Pass 1 dipakai.
+    cache     : cache frame dari open_frame_cache (opsional).
+    Return jumlah chunk yang dipakai. Raise RuntimeError jika gagal.
+    File chunk & daftar concat selalu dihapus.
+    """
 
-    def make_frame(t: float) -> np.ndarray:
-        progress = min(t / max(duration, 1e-6), 1.0)
-        # t=0 → crop seluruh base; t=dur → crop hanya area output
-        crop_w = max(_ow, int(_bw - (_bw - _ow) * progress))
-        crop_h = max(_oh, int(_bh - (_bh - _oh) * progress))
-        x1 = max(0, (_bw - crop_w) // 2)
-        y1 = max(0, (_bh - crop_h) // 2)
-        cropped = base_frame[y1:y1 + crop_h, x1:x1 + crop_w]
-        return np.array(
-            Image.fromarray(cropped).resize((_ow, _oh), Image.BILINEAR)
-        ).astype(np.uint8)
+    n_frames = int(total * fps)
+    n_chunk  = max(1, min(int(workers), int(total // PASS2_MIN_CHUNK_S)))
+    bounds   = [round(k * n_frames / n_chunk) for k in range(n_chunk + 1)]
+    threads  = max(1, FFMPEG_THREADS // n_chunk)
+    cache_j  = (None if cache is None else
+                (cache["data"], cache["mm"].shape, cache["mode"]))
+    jobs = [{
+        "task"    : "pass2",
+        "src"     : pass1_path,
+        "out"     : _tmp(f"tmp_{SID}_p2chunk_{k}.mp4"),
+        "frames"  : (bounds[k], bounds[k + 1]),
+        "fps"     : fps,
+        "src_size": tuple(src_size),
+        "schedule": schedule,
+        "total"   : total,
+        "out_w"   : out_w,
+        "out_h"   : out_h,
+        "bar_h"   : bar_h,
+        "grade"   : grade,
+        "threads" : threads,
+        "cache"   : cache_j,
+    } for k in range(n_chunk)]
+    concat_txt = _tmp(f"tmp_{SID}_p2concat.txt")
 
-    return VideoClip(make_frame, duration=duration).with_fps(24)
+    try:
+        run_worker_procs(jobs, "Chunk")
+
+        with open(concat_txt, "w") as fh:
+            for job in jobs:
+                fh.write(f"file '{job['out']}'\n")
+
+        cmd = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+               "-f", "concat", "-safe", "0", "-i", concat_txt,
+               "-i", audio_path or pass1_path,
+               "-map", "0:v", "-map", "1:a?",
+               "-c:v", "copy", "-c:a", "aac", "-shortest",
+               out_path]
+        r = subprocess.run(cmd, capture_output=True, text=True)
+        if r.returncode != 0 or not os.path.exists(out_path):
+            raise RuntimeError(f"ffmpeg concat Pass 2 gagal: {r.stderr.strip()[-400:]}")
+
+        if cache is not None and cache["mode"] == "write":
+            cache["seen"][:] = True       # tiap worker lolos cek jumlah frame n1 − n0
+        return n_chunk
+    finally:
+        for job in jobs:
+            _safe_remove(job["out"])
+        _safe_remove(concat_txt)
 
 
-def build_photo_slideshow(photo_paths: list, target_dur: int,
-                           out_w: int, out_h: int,
-                           fade_dur: float = 0.5,
-                           zoom_end: float = 1.15) -> VideoClip:
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 21 — PIPE I/O FFMPEG (zero-copy, iterator frame)
+# ═══════════════════════════════════════════════════════════════════════════════
+# Pengganti reader/writer MoviePy di jalur panas: rawvideo dibaca dengan
+# readinto() ke ring buffer NumPy yang dipakai ulang (tanpa alokasi per frame)
+# dan frame ditulis ke stdin ffmpeg via memoryview (tanpa salinan).
+def iter_frames_ffmpeg(path: str, size: tuple, start: float = 0.0,
+                       duration: float | None = None, fps: int | None = None,
+                       n_frames: int | None = None, nbuf: int = 2):
     """
-    Bangun slideshow dari foto dengan Ken Burns Effect + crossfade antar foto.
-    Guard: raise ValueError jika photo_paths kosong.
+    Iterator frame rgb24 (h×w×3 uint8) dari file video via pipe ffmpeg.
+
+    size     : (w, h) frame hasil decode (mis. clip.size).
+    start / duration : rentang yang dibaca (detik). fps: resample (None = asli).
+    n_frames : berhenti setelah n frame.
+    nbuf     : jumlah buffer ring — frame yang di-yield ditimpa lagi setelah
+               nbuf frame berikutnya dibaca.
+    Konversi warna sama dengan reader MoviePy (scale + sws bicubic).
     """
-    if not photo_paths:
-        raise ValueError("build_photo_slideshow: daftar foto tidak boleh kosong")
+    w, h = size
+    cmd  = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    if start > 0:
+        cmd += ["-ss", f"{start:.6f}"]
+    cmd += ["-i", path]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.6f}"]
+    if fps:
+        cmd += ["-r", str(fps)]
+    cmd += ["-vf", f"scale={w}:{h}", "-sws_flags", "bicubic",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-"]
+
+    ring = [np.empty((h, w, 3), dtype=np.uint8) for _ in range(max(1, nbuf))]
+    views = [memoryview(b).cast("B") for b in ring]
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL)
+    try:
+        k = 0
+        while n_frames is None or k < n_frames:
+            mv, got = views[k % len(ring)], 0
+            while got < len(mv):
+                r = proc.stdout.readinto(mv[got:])
+                if not r:
+                    return                   # EOF (frame terakhir tidak lengkap dibuang)
+                got += r
+            yield ring[k % len(ring)]
+            k += 1
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+        proc.stdout.close()
+        proc.wait()
 
-    n      = len(photo_paths)
-    per_ph = max(5.0, min(8.0, target_dur / n))
 
-    clips = [photo_to_clip(p, per_ph, out_w, out_h, zoom_end=zoom_end)
-             for p in photo_paths]
+def iter_clip_frames(path: str, size: tuple, src_fps: float,
+                     start: float, lts: list):
+    """
+    Frame sumber untuk setiap waktu lokal di lts (naik, relatif ke start) —
+    pemilihan frame sama dengan subclipped(start).get_frame(lt) MoviePy:
+    frame ke-int(fps × (start + lt) + 1e-5). Sumber dibaca maju sekali saja
+    mulai frame pertama yang diminta (tanpa seek ulang); waktu berulang
+    menghasilkan frame yang sama.
+    """
+    if not lts:
+        return
+    p0     = int(src_fps * (start + lts[0]) + 1e-5)
+    reader = iter_frames_ffmpeg(path, size, start=max(0.0, p0 / src_fps - 1e-5))
+    pos, frame = -1, None
+    try:
+        for lt in lts:
+            want = int(src_fps * (start + lt) + 1e-5) - p0
+            while pos < want:
+                try:
+                    frame = next(reader)
+                except StopIteration:
+                    break            # sumber habis → ulang frame terakhir
+                pos += 1
+            if frame is None:
+                raise RuntimeError(f"tidak ada frame terbaca dari {path}")
+            yield frame
+    finally:
+        reader.close()
+
+
+def _ffmpeg_writer_cmd(out_path: str, size: tuple, fps: int, codec: str,
+                       params, audio_path: str, audio_codec: str, extra) -> list:
+    """Perintah ffmpeg: rawvideo rgb24 dari stdin (+ audio opsional) → out_path."""
+    w, h = size
+    cmd  = ["ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{w}x{h}",
+            "-r", str(fps), "-i", "-"]
+    if audio_path:
+        cmd += ["-i", audio_path, "-map", "0:v", "-map", "1:a?",
+                "-c:a", audio_codec, "-shortest"]
+    return cmd + ["-c:v", codec, *params, *extra, out_path]
+
+
+def write_frames_ffmpeg(frames, out_path: str, size: tuple, fps: int = 24,
+                        codec: str = "libx264",
+                        params: list | tuple = ("-pix_fmt", "yuv420p"),
+                        audio_path: str = "", audio_codec: str = "aac",
+                        extra: list | tuple = ()) -> int:
+    """
+    Tulis iterator frame ke out_path lewat stdin ffmpeg (memoryview, tanpa salinan).
+    Frame ditulis penuh sebelum frame berikutnya diambil → aman untuk iterator
+    yang memakai ulang buffer. Return jumlah frame. Raise RuntimeError jika gagal.
+    """
+    ff = subprocess.Popen(
+        _ffmpeg_writer_cmd(out_path, size, fps, codec, params,
+                           audio_path, audio_codec, extra),
+        stdin=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    n = 0
+    try:
+        for frame in frames:
+            ff.stdin.write(memoryview(np.ascontiguousarray(frame)).cast("B"))
+            n += 1
+    except Exception:
+        ff.kill()
+        raise
+    finally:
+        try:
+            ff.stdin.close()
+        except Exception:
+            pass
+        err = ff.stderr.read().decode(errors="replace")
+        ff.wait()
+    if ff.returncode != 0 or not os.path.exists(out_path):
+        raise RuntimeError(f"ffmpeg writer gagal: {err.strip()[-400:]}")
+    return n
 
-    faded = []
-    for i, c in enumerate(clips):
-        fx = []
-        if i > 0:     fx.append(FadeIn(fade_dur))
-        if i < n - 1: fx.append(FadeOut(fade_dur))
-        faded.append(c.with_effects(fx) if fx else c)
 
-    return concatenate_videoclips(faded, method="chain")
+def write_pass1_frames(frames, size: tuple, audio, pass1_path: str, fmt: str) -> int:
+    """Tulis iterator frame timeline Pass 1 dengan codec & tag format fmt + audio (opsional)."""
+    kind      = P1_FORMATS[fmt]
+    audio_tmp = _tmp(f"tmp_{SID}_p1audio.wav")
+    try:
+        if audio is not None:
+            audio.write_audiofile(audio_tmp, fps=44100, logger=None)
+        return write_frames_ffmpeg(
+            frames, pass1_path, size,
+            codec=kind["codec"], params=kind["params"],
+            audio_path=audio_tmp if audio is not None else "",
+            audio_codec=kind["audio"],
+            extra=["-metadata", f"comment={_P1_META_KEY}={fmt}"],
+        )
+    finally:
+        _safe_remove(audio_tmp)
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 22 — RENDER PIPELINE (decode → proses → encode · antrian terbatas)
+# ═══════════════════════════════════════════════════════════════════════════════
+# write_videofile MoviePy menarik frame secara sinkron: decode, transform, tulis
+# ke pipe ffmpeg, baru frame berikutnya. Di sini tiap tahap punya thread sendiri
+# (NumPy & I/O pipe melepas GIL) yang dihubungkan antrian berukuran tetap:
+#   decoder ──in_q──▶ N worker ──out_q──▶ encoder (urutkan ulang → stdin ffmpeg)
+# Buffer output diambil dari ring pool yang dialokasikan sekali; worker mengambil
+# buffer SEBELUM mengambil frame, jadi frame tertua selalu bisa selesai (tanpa
+# deadlock) dan memori tetap terbatas.
+PIPE_DEPTH   = 6                                        # frame per antrian
+PIPE_WORKERS = max(1, min(4, (os.cpu_count() or 1) - 1))
+PIPE_RING    = 2 * PIPE_DEPTH + PIPE_WORKERS + 3        # nbuf aman untuk iterator sumber
+
+
+def render_pipelined(source, n_frames: int, size: tuple, out_path: str,
+                     make_proc=None, fps: int = 24,
+                     codec: str = "libx264",
+                     params: list | tuple = ("-pix_fmt", "yuv420p"),
+                     audio_path: str = "", audio_codec: str = "aac",
+                     extra: list | tuple = (),
+                     workers: int = PIPE_WORKERS,
+                     depth: int = PIPE_DEPTH) -> float:
+    """
+    Render n_frames frame ke out_path lewat pipeline berthread.
+
+    source     : iterator frame (uint8 h×w×3) berurutan, dibaca SATU thread.
+                 Buffer sumber boleh dipakai ulang setelah PIPE_RING frame
+                 (mis. iter_frames_ffmpeg(..., nbuf=PIPE_RING)).
+    make_proc(): pabrik processor proc(frame, t, out) → out, dipanggil sekali
+                 per worker (state/scratch tidak dibagi antar thread).
+                 None → frame source langsung ke encoder.
+    audio_path : file audio / video yang stream audionya di-mux (opsional).
+    extra      : argumen output ffmpeg tambahan (mis. -metadata).
+    Return durasi render (detik). Raise RuntimeError jika gagal.
+    """
+
+    w, h    = size
+    n_work  = max(1, int(workers)) if make_proc is not None else 1
+    stop    = threading.Event()
+    errors  = []
+    in_q    = queue.Queue(depth)
+    out_q   = queue.Queue(depth)
+    pool    = queue.Queue()
+    if make_proc is not None:
+        for _ in range(depth + n_work):
+            pool.put(np.empty((h, w, 3), dtype=np.uint8))
+
+    def _fail(e):
+        errors.append(e)
+        stop.set()
+
+    def _put(q, item) -> bool:
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _get(q):
+        while not stop.is_set():
+            try:
+                return True, q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return False, None
+
+    def _decode():
+        try:
+            i = 0
+            for frame in source:
+                if i >= n_frames or not _put(in_q, (i, frame)):
+                    break
+                i += 1
+            if i < n_frames and not stop.is_set():
+                raise RuntimeError(f"sumber frame habis di frame {i}/{n_frames}")
+            for _ in range(n_work):
+                _put(in_q, None)
+        except Exception as e:
+            _fail(e)
+        finally:
+            if hasattr(source, "close"):
+                source.close()           # ← hentikan proses ffmpeg reader
+
+    def _work():
+        try:
+            proc = make_proc() if make_proc is not None else None
+            while True:
+                buf = None
+                if proc is not None:
+                    ok, buf = _get(pool)    # ← buffer dulu, baru frame
+                    if not ok:
+                        return
+                ok, item = _get(in_q)
+                if not ok or item is None:
+                    return
+                i, frame = item
+                res = proc(frame, i / fps, buf) if proc is not None else frame
+                if not _put(out_q, (i, res, buf)):
+                    return
+        except Exception as e:
+            _fail(e)
+
+    def _encode():
+        pending, nxt = {}, 0
+        try:
+            while nxt < n_frames:
+                ok, item = _get(out_q)
+                if not ok:
+                    return
+                pending[item[0]] = item
+                while nxt in pending:
+                    _, res, buf = pending.pop(nxt)
+                    ff.stdin.write(memoryview(np.ascontiguousarray(res)).cast("B"))
+                    if buf is not None:
+                        pool.put(buf)       # ← kembali ke ring
+                    nxt += 1
+        except Exception as e:
+            _fail(e)
+
+    cmd = _ffmpeg_writer_cmd(out_path, size, fps, codec, params,
+                             audio_path, audio_codec, extra)
+
+    t0 = time.perf_counter()
+    ff = subprocess.Popen(cmd, stdin=subprocess.PIPE, stderr=subprocess.PIPE)
+    threads = ([threading.Thread(target=_decode, daemon=True)]
+               + [threading.Thread(target=_work, daemon=True) for _ in range(n_work)]
+               + [threading.Thread(target=_encode, daemon=True)])
+    try:
+        for th in threads:
+            th.start()
+        threads[-1].join()                  # encoder selesai = semua frame tertulis
+        stop.set()                          # lepaskan thread yang masih menunggu
+        for th in threads[:-1]:
+            th.join()
+    finally:
+        try:
+            ff.stdin.close()
+        except Exception:
+            pass
+        if errors:
+            ff.kill()
+        err = ff.stderr.read().decode(errors="replace")
+        ff.wait()
+    if errors:
+        raise RuntimeError(f"Pipeline render gagal: {errors[0]}")
+    if ff.returncode != 0 or not os.path.exists(out_path):
+        raise RuntimeError(f"ffmpeg pipeline gagal: {err.strip()[-400:]}")
+    return time.perf_counter() - t0
+
+
+def render_pass1_pipelined(base, pass1_path: str, fmt: str) -> float:
+    """Tulis timeline Pass 1 via render_pipelined dengan codec & tag format fmt."""
+    kind      = P1_FORMATS[fmt]
+    audio_tmp = _tmp(f"tmp_{SID}_p1audio.wav")
+    try:
+        if base.audio is not None:
+            base.audio.write_audiofile(audio_tmp, fps=44100, logger=None)
+        n = int(base.duration * 24)
+        return render_pipelined(
+            # t np.float64 seperti iter_frames → frame identik dengan write_videofile
+            (base.get_frame(np.float64(i) / 24) for i in range(n)),
+            n, base.size, pass1_path,
+            codec=kind["codec"], params=kind["params"],
+            audio_path=audio_tmp if base.audio is not None else "",
+            audio_codec=kind["audio"],
+            extra=["-metadata", f"comment={_P1_META_KEY}={fmt}"],
+        )
+    finally:
+        _safe_remove(audio_tmp)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 12 — PASS 2: OVERLAY + AUDIO + GRADING (Bulletproof Pipeline)
+# BAGIAN 23 — PASS 2: OVERLAY + AUDIO + GRADING (Bulletproof Pipeline)
 # ═══════════════════════════════════════════════════════════════════════════════
+def build_pass2_overlays(
+    captions: list, detail_colors: list,
+    cta_nama: str, cta_wa: str, cta_label: str,
+    OUT_W: int, OUT_H: int, font_path: str,
+    caption_align: str = "Center", text_effect: str = "Outline",
+) -> tuple[list, dict | None, int, int]:
+    """
+    Sprite caption + CTA untuk Pass 2 (juga dipakai preview_pass2, sehingga
+    preview = layout render akhir). Lewat cache sprite disk: Re-render hanya
+    me-raster caption/CTA yang berubah. LOGO TIDAK di sini: sudah di-bake Pass 1.
+
+    Return: (overlays, cta_ov, n_dari_cache, n_overlay)
+    """
+    font_size, hook_size, pad_x, pad_y = _compute_layout(OUT_W)
+    all_clr = [HOOK_COLOR] + list(detail_colors)
+    effect  = TEXT_EFFECTS.get(text_effect)
+
+    overlays, n_hit, n_ov = [], 0, len(captions)
+    for idx, cap in enumerate(captions):
+        clr = all_clr[idx % len(all_clr)]
+        sz  = hook_size if idx == 0 else font_size
+        ov, hit = cached_overlay(
+            "caption", render_caption,
+            text=cap, out_w=OUT_W, out_h=OUT_H, size=sz,
+            pad_x=pad_x, pad_y=pad_y, color=clr, font_path=font_path,
+            align=caption_align, effect=effect,
+        )
+        overlays.append(ov)
+        n_hit += hit
+
+    cta_ov = None
+    if cta_nama.strip() or cta_wa.strip():
+        cta_ov, hit = cached_overlay(
+            "cta", render_cta,
+            nama=cta_nama.strip(), wa=cta_wa.strip(),
+            out_w=OUT_W, out_h=OUT_H, size=font_size,
+            pad_x=pad_x, pad_y=pad_y, font_path=font_path,
+            label=cta_label.strip(), effect=effect,
+        )
+        n_hit += hit
+        n_ov  += 1
+    return overlays, cta_ov, n_hit, n_ov
+
+
+def pass2_timing(total_dur: float, n_cap: int, cta_dur: float) -> tuple[float, float]:
+    """(interval caption, detik mulai CTA) — dipakai render & preview."""
+    return total_dur / max(n_cap, 1), max(0.0, total_dur - cta_dur)
+
+
 def run_pass2(
     pass1_path: str,
     out_path:   str,
@@ -907,10 +3539,32 @@ def run_pass2(
     logo_pil,
     font_path:  str,
     caption_align: str = "Center",
+    text_effect: str = "Outline",
+    caption_anim: str = "none",
+    backend:    str = "python",
+    frame_cache: bool = False,
+    workers:    int = 1,
+    pipeline:   bool = False,
 ) -> tuple[bool, list, str]:
     """
     Pass 2: baca Pass 1 → overlay caption + CTA + progress bar → tulis output.
 
+    backend: kunci PASS2_BACKENDS. "ffmpeg" merender di filtergraph ffmpeg;
+    "softsub" tidak me-render caption sama sekali:
+    Pass 1 di-copy + track mov_text & sidecar WebVTT (render_pass2_softsub;
+    tanpa grading & progress bar). Jika gagal, otomatis fallback ke frame
+    kernel Python.
+    frame_cache: backend Python menyimpan frame Pass 1 hasil decode ke memmap;
+    Re-render berikutnya membaca dari sana tanpa decode ulang.
+    workers: > 1 → backend Python dirender paralel per chunk waktu
+    (render_pass2_parallel); gagal → fallback render satu proses.
+    pipeline: render satu proses memakai render_pipelined (decode, kernel &
+    encode berjalan tumpang-tindih); gagal → fallback write_videofile.
+
+    text_effect: kunci TEXT_EFFECTS untuk caption & CTA.
+    caption_anim: kunci CAPTION_ANIMS; selain "none" dirender backend Python
+    (backend ffmpeg otomatis fallback).
+
     Return: (success: bool, captions: list, error_msg: str)
 
     BULLETPROOF:
@@ -921,6 +3575,11 @@ def run_pass2(
     open_clips  = []           # ← semua resource dicatat di sini
     bgm_tmp     = _tmp(f"tmp_{SID}_bgm.mp3")
     bgm_created = False
+    bgm_mixed   = False
+    mix_tmp     = _tmp(f"tmp_{SID}_mix.wav")
+    vtt_out     = os.path.splitext(out_path)[0] + ".vtt"
+    fcache      = None             # ← cache frame memmap (opsional)
+    _safe_remove(vtt_out)          # sidecar hanya ada jika render ini softsub
 
     try:
         # ── Info NLP ────────────────────────────────────────────────────────────
@@ -942,40 +3601,25 @@ def run_pass2(
                 st.success(f"📞 {cta_nama}  |  WA: {cta_wa}")
 
         # ── Layout & pre-render overlay ──────────────────────────────────────
-        font_size, hook_size, pad_x, pad_y = _compute_layout(OUT_W)
-        bar_h    = max(3, int(OUT_H * 0.006))
-        all_clr  = [HOOK_COLOR] + list(detail_colors)
-
-        overlays = []
-        for idx, cap in enumerate(captions):
-            clr = all_clr[idx % len(all_clr)]
-            sz  = hook_size if idx == 0 else font_size
-            overlays.append(render_caption(
-                cap, OUT_W, OUT_H, sz, pad_x, pad_y,
-                color=clr, font_path=font_path,
-                logo_pil=None,        # ← LOGO TIDAK di sini: sudah di-bake Pass 1
-                align=caption_align,
-            ))
-
-        cta_ov = None
-        if cta_nama.strip() or cta_wa.strip():
-            cta_ov = render_cta(
-                cta_nama.strip(), cta_wa.strip(),
-                OUT_W, OUT_H, font_size, pad_x, pad_y,
-                font_path=font_path,
-                logo_pil=None,        # ← LOGO TIDAK di sini: sudah di-bake Pass 1
-                label=cta_label.strip(),
+        bar_h = max(3, int(OUT_H * 0.006))
+        overlays = cta_ov = None
+        if backend != "softsub":
+            overlays, cta_ov, n_hit, n_ov = build_pass2_overlays(
+                captions, detail_colors, cta_nama, cta_wa, cta_label,
+                OUT_W, OUT_H, font_path, caption_align, text_effect,
             )
+            st.write(f"🗂️ Overlay: {n_hit} dari cache · {n_ov - n_hit} dirender")
 
         # ── Baca Pass 1 ──────────────────────────────────────────────────────
-        st.write("📂 Membaca Pass 1...")
+        p1_fmt = probe_p1_format(pass1_path)
+        st.write(f"📂 Membaca Pass 1 · "
+                 f"{P1_FORMATS.get(p1_fmt, {}).get('label', 'format tidak diketahui')}...")
         p1 = VideoFileClip(pass1_path)
         open_clips.append(p1)          # ← catat
 
         total_dur = p1.duration
         n_cap     = len(captions)
-        interval  = total_dur / max(n_cap, 1)
-        cta_start = max(0.0, total_dur - cta_dur)
+        interval, cta_start = pass2_timing(total_dur, n_cap, cta_dur)
         audio_src = p1.audio
 
         sched = " | ".join(
@@ -1008,41 +3652,137 @@ def run_pass2(
                 mixed = [a for a in [audio_src, bgm_audio] if a is not None]
                 if mixed:
                     audio_src = CompositeAudioClip(mixed)
+                    bgm_mixed = True
                 st.write(f"  ✅ BGM {bgm_raw.duration:.1f}s · fade-in {fi_dur:.1f}s · fade-out {fo_dur:.1f}s")
 
             except Exception as e:
                 st.warning(f"⚠️ BGM gagal dimuat: {e}")
 
-        # ── Freeze closure variables untuk frame processor ───────────────────
-        _do  = bool(do_grade)
-        _br  = float(brightness) if _do else 1.0
-        _co  = float(contrast)   if _do else 1.0
-        _sa  = float(saturation) if _do else 1.0
-        _sh  = float(sharpness)  if _do else 1.0
-        _ovs = list(overlays)
-        _cta = cta_ov
-        _cs  = float(cta_start)
-        _iv  = float(interval)
-        _nc  = int(n_cap)
-        _td  = float(total_dur)
-        _bh  = int(bar_h)
-        _ow  = int(OUT_W)
-        _oh  = int(OUT_H)
+        # ── Soft subtitle: stream copy + track teks (tanpa re-encode video) ──
+        if backend == "softsub":
+            st.write("📝 Mux caption sebagai track subtitle (video di-copy)...")
+            if do_grade:
+                st.write("ℹ️ Color grading & progress bar butuh re-encode → dilewati.")
+            try:
+                if bgm_mixed:
+                    audio_src.write_audiofile(mix_tmp, fps=44100, logger=None)
+                vtt = render_pass2_softsub(
+                    pass1_path, out_path,
+                    caption_cues(captions, cta_nama, cta_wa, cta_label,
+                                 total_dur, cta_dur),
+                    audio_path=mix_tmp if bgm_mixed else "",
+                )
+                st.write(f"  ✅ Track mov_text + sidecar `{os.path.basename(vtt)}`")
+                return True, captions, ""
+            except Exception as e:
+                st.warning(f"⚠️ Soft subtitle gagal → fallback burn-in Python: {e}")
+                backend = "python"
+                overlays, cta_ov, _, _ = build_pass2_overlays(
+                    captions, detail_colors, cta_nama, cta_wa, cta_label,
+                    OUT_W, OUT_H, font_path, caption_align, text_effect,
+                )
+
+        schedule = build_pass2_schedule(overlays, cta_ov, interval,
+                                        cta_start, total_dur, anim=caption_anim)
+        grade    = ((float(brightness), float(contrast),
+                     float(saturation), float(sharpness)) if do_grade else None)
+
+        # ── Backend ffmpeg: seluruh Pass 2 di filtergraph ────────────────────
+        if backend == "ffmpeg" and any(ent.get("anim") for ent in schedule):
+            st.write("ℹ️ Animasi caption → render via frame kernel Python.")
+            backend = "python"
+        if backend == "ffmpeg":
+            st.write(f"⚡ Render Pass 2 via ffmpeg filtergraph ({FFMPEG_THREADS} thread)...")
+            try:
+                if bgm_mixed:
+                    audio_src.write_audiofile(mix_tmp, fps=44100, logger=None)
+                render_pass2_ffmpeg(
+                    pass1_path, out_path, schedule, total_dur,
+                    int(OUT_W), int(OUT_H), bar_h, grade=grade,
+                    audio_path=mix_tmp if bgm_mixed else "",
+                )
+                return True, captions, ""
+            except Exception as e:
+                st.warning(f"⚠️ Backend ffmpeg gagal → fallback Python: {e}")
+
+        # ── Frame processor: grading + overlay + progress bar (fused) ───────
+        kernel = make_pass2_kernel(int(OUT_W), int(OUT_H), schedule,
+                                   total_dur, bar_h, grade=grade)
+
+        # ── Sumber frame: cache memmap atau decode Pass 1 ────────────────────
+        src = p1
+        if frame_cache:
+            fcache, note = open_frame_cache(pass1_path, int(total_dur * 24),
+                                            p1.w, p1.h)
+            st.write(note)
+        if fcache is not None and fcache["mode"] == "read":
+            src = VideoClip(lambda t: frame_cache_get(fcache, t), duration=total_dur)
+        fc_write = fcache is not None and fcache["mode"] == "write"
+
+        # ── Paralel per chunk waktu (multi-core) ─────────────────────────────
+        if workers > 1:
+            st.write(f"🧩 Render Pass 2 paralel · {workers} worker...")
+            try:
+                if bgm_mixed:
+                    audio_src.write_audiofile(mix_tmp, fps=44100, logger=None)
+                n_chunk = render_pass2_parallel(
+                    pass1_path, out_path, schedule, total_dur,
+                    int(OUT_W), int(OUT_H), bar_h, (p1.w, p1.h), grade=grade,
+                    audio_path=mix_tmp if bgm_mixed else "",
+                    workers=workers, cache=fcache,
+                )
+                st.write(f"  🔗 {n_chunk} chunk digabung (concat, tanpa re-encode)")
+                close_frame_cache(fcache, ok=True)
+                return True, captions, ""
+            except Exception as e:
+                st.warning(f"⚠️ Render paralel gagal → fallback 1 proses: {e}")
+                if fc_write:
+                    fcache["seen"][:] = False
+
+        # ── Pipeline decode → kernel → encode (satu proses, multi-thread) ───
+        if pipeline:
+            st.write(f"🚰 Render Pass 2 · pipeline ({PIPE_WORKERS} worker kernel)...")
+            try:
+                if bgm_mixed:
+                    audio_src.write_audiofile(mix_tmp, fps=44100, logger=None)
+
+                n_frames = int(total_dur * 24)
+
+                def _frames():
+                    if fcache is not None and fcache["mode"] == "read":
+                        for i in range(n_frames):
+                            yield frame_cache_get(fcache, i / 24)
+                        return
+                    reader = iter_frames_ffmpeg(pass1_path, p1.size,
+                                                n_frames=n_frames, nbuf=PIPE_RING)
+                    for i, frame in enumerate(reader):
+                        if fc_write:
+                            frame_cache_put(fcache, i / 24, frame)
+                        yield frame
+
+                secs = render_pipelined(
+                    _frames(), n_frames, p1.size, out_path,
+                    make_proc=lambda: make_pass2_kernel(
+                        int(OUT_W), int(OUT_H), schedule, total_dur, bar_h, grade=grade),
+                    audio_path=mix_tmp if bgm_mixed else pass1_path,
+                )
+                st.write(f"  ⏱️ {int(total_dur * 24) / max(secs, 1e-9):.1f} fps")
+                close_frame_cache(fcache, ok=True)
+                return True, captions, ""
+            except Exception as e:
+                st.warning(f"⚠️ Pipeline gagal → fallback write_videofile: {e}")
+                if fc_write:
+                    fcache["seen"][:] = False
 
         def pass2_proc(get_frame, t):
             frame = get_frame(t)
-            if _do:
-                frame = grade_frame(frame, _br, _co, _sa, _sh)
-            if _cta is not None and t >= _cs:
-                frame = blend_overlay(frame, _cta)
-            else:
-                idx   = min(int(t / _iv), _nc - 1)
-                frame = blend_overlay(frame, _ovs[idx])
-            return draw_progress_bar(frame, t, _td, _ow, _oh, _bh)
+            if fc_write:
+                frame_cache_put(fcache, t, frame)
+            return kernel(frame, t)
 
         # ── Render & tulis video final ───────────────────────────────────────
         st.write("🎬 Render Pass 2...")
-        final = p1.transform(pass2_proc)
+        final = src.transform(pass2_proc)
         if audio_src is not None:
             final = final.with_audio(audio_src)
 
@@ -1054,6 +3794,7 @@ def run_pass2(
             ffmpeg_params=["-pix_fmt", "yuv420p"],
             logger=None,
         )
+        close_frame_cache(fcache, ok=True)
         try:
             final.close()              # tutup segera setelah tulis selesai
         except Exception:
@@ -1071,13 +3812,135 @@ def run_pass2(
                 oc.close()
             except Exception:
                 pass
+        close_frame_cache(fcache, ok=False)   # no-op jika sudah disahkan
         if bgm_created:
             _safe_remove(bgm_tmp)
+        _safe_remove(mix_tmp)
         gc.collect()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 13 — HEADER, SESSION, TOAST
+# BAGIAN 24 — PREVIEW CAPTION (still frame Pass 1 · resolusi rendah)
+# ═══════════════════════════════════════════════════════════════════════════════
+PREVIEW_W = 360   # lebar frame preview (tinggi mengikuti rasio output)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def _preview_duration(path: str, mtime_ns: int) -> float:
+    """Durasi file (detik) dari header ffmpeg; mtime_ns = kunci invalidasi."""
+    r = subprocess.run(["ffmpeg", "-hide_banner", "-i", path],
+                       capture_output=True, text=True, timeout=10)
+    m = re.search(r"Duration:\s*(\d+):(\d+):([\d.]+)", r.stderr)
+    if not m:
+        raise RuntimeError("durasi Pass 1 tidak terbaca")
+    return int(m.group(1)) * 3600 + int(m.group(2)) * 60 + float(m.group(3))
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _preview_frame(path: str, mtime_ns: int, t: float, w: int, h: int) -> np.ndarray:
+    """Satu frame w×h di detik t (seek input ffmpeg; Pass 1 short-GOP → cepat)."""
+    for f in iter_frames_ffmpeg(path, (w, h), start=t, n_frames=1, nbuf=1):
+        return f.copy()
+    return np.zeros((h, w, 3), dtype=np.uint8)
+
+
+def _scale_sprite(sprite: dict | None, size: tuple) -> dict | None:
+    """Skalakan sprite (premultiplied) ke frame berukuran size = (w, h)."""
+    if sprite is None:
+        return None
+    fx = size[0] / sprite["size"][0]
+    fy = size[1] / sprite["size"][1]
+    h, w = sprite["rgb"].shape[:2]
+    x0, y0 = int(sprite["x"] * fx), int(sprite["y"] * fy)
+    x1 = min(size[0], max(x0 + 1, round((sprite["x"] + w) * fx)))
+    y1 = min(size[1], max(y0 + 1, round((sprite["y"] + h) * fy)))
+    rs = (x1 - x0, y1 - y0)
+    return {
+        "size": tuple(size),
+        "x"   : x0,
+        "y"   : y0,
+        "rgb" : np.asarray(Image.fromarray(sprite["rgb"]).resize(rs, Image.BOX)),
+        "inv" : np.asarray(Image.fromarray(sprite["inv"][:, :, 0])
+                           .resize(rs, Image.BOX))[:, :, None],
+    }
+
+
+def preview_pass2(
+    pass1_path: str,
+    deskripsi:  str,
+    n_caption:  int,
+    detail_colors: list,
+    cta_nama:   str,
+    cta_wa:     str,
+    cta_dur:    float,
+    cta_label:  str,
+    do_grade:   bool,
+    brightness: float,
+    contrast:   float,
+    saturation: float,
+    sharpness:  float,
+    OUT_W:      int,
+    OUT_H:      int,
+    font_path:  str,
+    caption_align: str = "Center",
+    text_effect: str = "Outline",
+    width:      int = PREVIEW_W,
+) -> tuple[list, float]:
+    """
+    Preview Pass 2 tanpa render: satu frame Pass 1 di tengah tiap caption
+    (dan satu di tengah CTA), di-composite dengan kernel Pass 2 yang sama
+    (grading + overlay + progress bar) pada resolusi rendah.
+
+    Overlay dirender di resolusi output lewat build_pass2_overlays (layout &
+    cache sprite sama dengan render akhir), lalu diperkecil. Frame Pass 1
+    di-cache per (file, mtime, detik) → edit caption berikutnya hanya
+    membayar render overlay + composite.
+
+    Return: ([(label, frame rgb uint8), ...], milidetik)
+    """
+    t_start  = time.perf_counter()
+    mtime    = os.stat(pass1_path).st_mtime_ns
+    total    = _preview_duration(pass1_path, mtime)
+    pw       = int(width) // 2 * 2
+    ph       = int(round(pw * OUT_H / OUT_W)) // 2 * 2
+    captions = split_captions(deskripsi, n_caption)
+    overlays, cta_ov, _, _ = build_pass2_overlays(
+        captions, detail_colors, cta_nama, cta_wa, cta_label,
+        OUT_W, OUT_H, font_path, caption_align, text_effect,
+    )
+    interval, cta_start = pass2_timing(total, len(captions), cta_dur)
+    schedule = build_pass2_schedule(
+        [_scale_sprite(o, (pw, ph)) for o in overlays],
+        _scale_sprite(cta_ov, (pw, ph)), interval, cta_start, total)
+    grade    = ((float(brightness), float(contrast),
+                 float(saturation), float(sharpness)) if do_grade else None)
+    kernel   = make_pass2_kernel(pw, ph, schedule, total,
+                                 max(1, int(ph * 0.006)), grade=grade)
+
+    shots = []
+    for i in range(len(captions)):
+        t0 = i * interval
+        t1 = min((i + 1) * interval, cta_start if cta_ov is not None else total)
+        if t1 > t0:
+            shots.append(("🪝 HOOK" if i == 0 else f"📌 Caption {i + 1}", (t0 + t1) / 2))
+    if cta_ov is not None and total > cta_start:
+        shots.append(("📞 CTA", (cta_start + total) / 2))
+
+    out = []
+    for label, t in shots:
+        frame = _preview_frame(pass1_path, mtime, round(t, 3), pw, ph)
+        out.append((f"{label} · {t:.1f}s", kernel(frame, t).copy()))
+    return out, (time.perf_counter() - t_start) * 1000
+
+
+# ── Proses worker render (run_worker_procs): berhenti sebelum UI ─────────────
+_WORKER_TASKS = {"pass1": _pass1_piece_worker, "pass2": _pass2_chunk_worker}
+if _WORKER:
+    sys.exit(_run_worker(sys.argv[2]))
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 25 — HEADER, SESSION, TOAST
 # ═══════════════════════════════════════════════════════════════════════════════
 st.title("🎬 Mansion Video Generator")
 st.caption("Aplikasi membuat video Konten Sosial Media dalam Format Portrait · 9:16")
@@ -1098,7 +3961,7 @@ st.caption(f"🔑 Session: `{SID}`")
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 14 — SIDEBAR
+# BAGIAN 26 — SIDEBAR
 # ═══════════════════════════════════════════════════════════════════════════════
 with st.sidebar:
 
@@ -1170,6 +4033,19 @@ with st.sidebar:
             "Right  : teks rata kanan + garis Gold di kanan."
         ),
     )
+    text_effect = st.selectbox(
+        "Efek Teks",
+        options=list(TEXT_EFFECTS),
+        index=0,
+        help="Outline, outline tebal, drop shadow, atau glow di sekitar teks.",
+    )
+    caption_anim = st.selectbox(
+        "Animasi Caption",
+        options=list(CAPTION_ANIMS),
+        format_func=CAPTION_ANIMS.get,
+        index=0,
+        help="Animasi masuk caption (CTA tetap statis). Memakai backend Python.",
+    )
     st.caption("💡 Upload `.ttf` ke folder `fonts/` di GitHub untuk font custom.")
 
     # ── Logo & BGM ───────────────────────────────────────────────────────────
@@ -1198,6 +4074,103 @@ with st.sidebar:
         ["Crossfade", "Fade to Black", "Tanpa Transisi"], index=0)
     fade_dur = st.slider("Durasi Transisi (detik)", 0.2, 1.5, 0.4, 0.1)
 
+    # ── Mesin Render ──────────────────────────────────────────────────────────
+    st.header("⚙️ Mesin Render")
+    p1_format = st.selectbox(
+        "Format Pass 1 (intermediate)",
+        options=list(P1_FORMATS),
+        format_func=lambda k: P1_FORMATS[k]["label"],
+        index=list(P1_FORMATS).index(P1_DEFAULT_FORMAT),
+        help=(
+            "Format file sementara Pass 1 yang di-decode ulang setiap Re-render Pass 2.\n"
+            "Terukur (720×1280, footage sintetis ber-noise · tools/bench_render.py p1):\n"
+            "H.264 long-GOP ≈ 20 MB/menit · decode 216 fps · 40 dB\n"
+            "H.264 short-GOP ≈ 430 MB/menit · decode 75 fps · 47 dB\n"
+            "H.264 all-intra ≈ 480 MB/menit · decode 60 fps · 47 dB\n"
+            "MJPEG ≈ 186 MB/menit · decode 159 fps · 42 dB\n"
+            "Format visually lossless memakan /tmp jauh lebih banyak."
+        ),
+    )
+    pass2_backend = st.selectbox(
+        "Backend Pass 2",
+        options=list(PASS2_BACKENDS),
+        format_func=PASS2_BACKENDS.get,
+        index=0,
+        help=(
+            "Python : frame kernel NumPy (grading paling akurat).\n"
+            "ffmpeg : caption, CTA & progress bar dirender di filtergraph "
+            "ffmpeg multi-thread (lebih cepat, grading mendekati).\n"
+            "Soft subtitle : video Pass 1 di-copy + track teks (mov_text) & "
+            "file .vtt — edit caption < 1 detik, tanpa grading/progress bar. "
+            "Untuk TikTok/Reels tetap pakai backend burn-in."
+        ),
+    )
+    reframe_backend = st.selectbox(
+        "Reframe 9:16 (Pass 1, video)",
+        options=list(REFRAME_BACKENDS),
+        format_func=REFRAME_BACKENDS.get,
+        index=0,
+        help=(
+            "MoviePy : tiap frame di-compose di Python.\n"
+            "ffmpeg : tiap segmen di-reframe (split → scale → blur → overlay) "
+            "dan di-encode langsung oleh ffmpeg multi-thread; gagal → MoviePy."
+        ),
+    )
+    bg_blur = st.selectbox(
+        "Background blur (video landscape)",
+        options=list(BG_BLUR_ENGINES),
+        format_func=lambda k: BG_BLUR_ENGINES[k]["label"],
+        index=list(BG_BLUR_ENGINES).index(BG_BLUR_DEFAULT),
+        help=(
+            "Latar blur untuk klip landscape/square di Pass 1. Blur di resolusi "
+            "kecil lalu upscale: tampilan hampir sama, jauh lebih cepat. "
+            "Perbandingan: python tools/bench_render.py bg_blur."
+        ),
+    )
+    bg_blur_every = int(st.number_input(
+        "Hitung ulang background tiap N frame", min_value=1, max_value=6,
+        value=1, step=1,
+        help="> 1: background blur dipakai ulang N frame (gerakan latar jadi patah-patah).",
+    ))
+    render_workers = int(st.number_input(
+        "Worker render (proses paralel)", min_value=1,
+        max_value=max(PASS2_WORKERS, 1), value=1, step=1,
+        help=(
+            "Pass 1: tiap segmen & jendela transisi dirender di proses terpisah.\n"
+            "Pass 2 (backend Python): timeline dipecah per chunk waktu.\n"
+            "Hasil digabung tanpa re-encode. Tiap worker memuat ulang mesin "
+            "render (± 2 detik) — hanya menguntungkan di server multi-core."
+        ),
+    ))
+    use_pipeline = st.checkbox(
+        "🚰 Pipeline decode → proses → encode", value=False,
+        help=(
+            "Render satu proses: decode, compositing NumPy & encode x264 berjalan "
+            "bersamaan di thread terpisah (antrian terbatas, urutan frame dijaga). "
+            "Gagal → otomatis kembali ke render biasa."
+        ),
+    )
+    pre_extract = st.checkbox(
+        "📼 Pra-ekstraksi segmen (1 sapuan per sumber)", value=False,
+        help=(
+            "Segmen dari video yang sama dibaca berurutan waktu oleh satu proses "
+            "ffmpeg lalu disusun sesuai urutan timeline — tanpa seek mundur "
+            "berulang pada reader MoviePy. Hanya untuk sumber dengan ≥ 2 segmen "
+            "yang urutannya diacak (atau reframe ffmpeg); file antara memakai "
+            "format Pass 1 — satu generasi encode tambahan (pilih format "
+            "visually lossless agar tidak terlihat). Gagal → baca per segmen."
+        ),
+    )
+    use_frame_cache = st.checkbox(
+        "💾 Cache frame Pass 1 (Re-render cepat)", value=False,
+        help=(
+            "Backend Python: frame Pass 1 disimpan mentah di disk server sehingga "
+            "Re-render Pass 2 tidak decode ulang. Jatah: "
+            f"{FRAME_CACHE_DISK_SHARE:.0%} ruang bebas /tmp dibagi jumlah sesi aktif "
+            f"(maks {FRAME_CACHE_MAX_BYTES // 1024 ** 3} GB); melebihi jatah → dilewati."
+        ),
+    )
+
     # ── Storage Widget ────────────────────────────────────────────────────────
     st.divider()
     st.caption("🗄️ **Storage Server**")
@@ -1221,7 +4194,7 @@ with st.sidebar:
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 15 — TAB INPUT: VIDEO / PHOTO SLIDE
+# BAGIAN 27 — TAB INPUT: VIDEO / PHOTO SLIDE
 # ═══════════════════════════════════════════════════════════════════════════════
 tab_video, tab_photo = st.tabs(["🎬  A · Buat Video", "🖼️  B · Photo Slide"])
 
@@ -1255,7 +4228,7 @@ input_mode  = "photo" if (photo_files and not video_files) else "video"
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 16 — SESSION STATE
+# BAGIAN 28 — SESSION STATE
 # ═══════════════════════════════════════════════════════════════════════════════
 _SS_DEFAULTS = {
     "pass1_ready"  : False,
@@ -1263,10 +4236,12 @@ _SS_DEFAULTS = {
     "pass2_done"   : False,
     "out_path"     : "",
     "video_bytes"  : None,
+    "sub_bytes"    : None,   # sidecar WebVTT (backend softsub)
     "p1_out_w"     : 720,
     "p1_out_h"     : 1280,
     "p1_logo_pil"  : None,
     "p1_font_path" : "",
+    "p1_format"    : "",
     "trim_segs"    : [],
     "trim_approved": False,
     "trim_vcs"     : [],   # open VideoFileClip handles
@@ -1279,7 +4254,7 @@ for _k, _v in _SS_DEFAULTS.items():
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 17 — TOMBOL KONTROL UTAMA
+# BAGIAN 29 — TOMBOL KONTROL UTAMA
 # ═══════════════════════════════════════════════════════════════════════════════
 st.divider()
 
@@ -1290,7 +4265,8 @@ if st.session_state.pass1_ready:
         sz = os.path.getsize(p1_path) / 1_048_576
         st.success(
             f"✅ **Pass 1 tersimpan** — `{p1_path}` ({sz:.1f} MB) · "
-            f"{st.session_state.p1_out_w}×{st.session_state.p1_out_h}"
+            f"{st.session_state.p1_out_w}×{st.session_state.p1_out_h} · "
+            f"{P1_FORMATS.get(st.session_state.p1_format, {}).get('label', 'format ?')}"
         )
     else:
         st.warning("⚠️ File Pass 1 tidak ditemukan. Jalankan ulang Pass 1.")
@@ -1326,7 +4302,7 @@ if btn_reset:
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 18 — STEP 1: ANALISIS & PREVIEW TRIM / FOTO
+# BAGIAN 30 — STEP 1: ANALISIS & PREVIEW TRIM / FOTO
 # ═══════════════════════════════════════════════════════════════════════════════
 if btn_full and has_input:
     # Tutup handle video lama
@@ -1343,6 +4319,7 @@ if btn_full and has_input:
     st.session_state.pass1_ready   = False
     st.session_state.pass2_done    = False
     st.session_state.video_bytes   = None
+    st.session_state.sub_bytes     = None
     st.session_state.input_mode    = input_mode
 
     # ── MODE A: Video ─────────────────────────────────────────────────────────
@@ -1505,7 +4482,7 @@ if btn_full and has_input:
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 19 — STEP 2: PREVIEW GRID SEGMEN / FOTO
+# BAGIAN 31 — STEP 2: PREVIEW GRID SEGMEN / FOTO
 # ═══════════════════════════════════════════════════════════════════════════════
 def _extract_thumb(src: str, t: float, out_path: str) -> bool:
     """Ekstrak 1 frame thumbnail dari video via ffmpeg."""
@@ -1593,7 +4570,6 @@ def _detect_scenes(src: str, threshold: float = 0.35, max_scenes: int = 20) -> l
             "-f", "null", "-",
         ], capture_output=True, text=True, timeout=20)
         # Parse "pts_time:" dari stderr
-        import re
         times = [float(m) for m in re.findall(r"pts_time:([\d.]+)", r.stderr)]
         return sorted(set(times))
     except Exception:
@@ -1659,13 +4635,13 @@ if st.session_state.trim_segs and not st.session_state.pass1_ready:
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 20 — STEP 3: RENDER PASS 1 (BULLETPROOF PIPELINE)
+# BAGIAN 32 — STEP 3: RENDER PASS 1 (BULLETPROOF PIPELINE)
 # ═══════════════════════════════════════════════════════════════════════════════
 if st.session_state.trim_approved and not st.session_state.pass1_ready:
 
     segs       = st.session_state.trim_segs
     mode       = st.session_state.input_mode
-    pass1_path = _tmp(f"tmp_{SID}_pass1.mp4")
+    pass1_path = _tmp(f"tmp_{SID}_pass1{P1_FORMATS[p1_format]['ext']}")
     out_path   = f"output/out_{SID}.mp4"
 
     # Tentukan resolusi output
@@ -1691,6 +4667,7 @@ if st.session_state.trim_approved and not st.session_state.pass1_ready:
 
     with st.status("⏳ Pass 1: Render...", expanded=True) as status:
         open_clips = []   # ← SEMUA resource dicatat di sini
+        seg_files  = []   # ← file segmen pra-ekstraksi / reframe ffmpeg (dihapus di finally)
         try:
             # ── Proses logo (WAJIB seek(0)) ────────────────────────────────────
             logo_pil = None
@@ -1707,14 +4684,64 @@ if st.session_state.trim_approved and not st.session_state.pass1_ready:
 
             # ── Bangun clips_916 ────────────────────────────────────────────────
             clips_916 = []
+            seg_srcs  = []   # (path, start, fps, size) → jalur pipe native & worker paralel
 
             if mode == "video":
-                fin_vcs = st.session_state.get("trim_vcs", [])
-                for s in segs:
+                fin_vcs  = st.session_state.get("trim_vcs", [])
+                reframed = reframe_backend == "ffmpeg"
+                # ── Pra-ekstraksi: satu sapuan maju per sumber (urut waktu) ────
+                seg_pre = {}   # k → file segmen (9:16 jika reframe ffmpeg, ukuran asli jika tidak)
+                if pre_extract:
+                    for si, items in schedule_segment_reads(segs).items():
+                        # File antara = satu generasi lossy ekstra: hanya untuk
+                        # sumber ≥ 2 segmen yang urutan timeline-nya ≠ urutan
+                        # waktu (seek mundur). Reframe ffmpeg meng-encode segmen
+                        # juga, jadi sapuan tunggal tidak menambah generasi.
+                        ks = [k for _, _, k in items]
+                        if len(items) < 2 or (not reframed and ks == sorted(ks)):
+                            continue
+                        vc    = fin_vcs[si]
+                        paths = {k: _tmp(f"tmp_{SID}_seg{k}{P1_FORMATS[p1_format]['ext']}")
+                                 for _, _, k in items}
+                        seg_files.extend(paths.values())
+                        try:
+                            extract_segments_ffmpeg(
+                                vc.filename, [(a, b, paths[k]) for a, b, k in items],
+                                vc.size, has_audio=vc.audio is not None,
+                                out_size=(OUT_W, OUT_H) if reframed else None,
+                                blur=bg_blur, fmt=p1_format,
+                                fps=24 if reframed else vc.fps)
+                            seg_pre.update(paths)
+                            st.write(f"  📼 Sumber #{si + 1}: {len(items)} segmen · 1 sapuan maju")
+                        except Exception as e:
+                            st.warning(f"  ⚠️ Pra-ekstraksi sumber #{si + 1} gagal → per segmen: {e}")
+
+                for k, s in enumerate(segs):
                     try:
-                        vc  = fin_vcs[s["src_idx"]]
-                        sub = vc.subclipped(s["start"], s["end"])
-                        f16 = fit_to_916(sub, OUT_W, OUT_H)
+                        vc       = fin_vcs[s["src_idx"]]
+                        f16      = None
+                        seg_path = seg_pre.get(k)
+                        if seg_path is None and reframed:
+                            seg_path = _tmp(f"tmp_{SID}_seg{k}{P1_FORMATS[p1_format]['ext']}")
+                            seg_files.append(seg_path)
+                            try:
+                                render_segment_ffmpeg(
+                                    vc.filename, s["start"], s["end"], seg_path,
+                                    vc.size, OUT_W, OUT_H, blur=bg_blur, fmt=p1_format)
+                            except Exception as e:
+                                st.warning(f"  ⚠️ Reframe ffmpeg gagal → MoviePy: {e}")
+                                seg_path = None
+                        if seg_path is not None:
+                            sv = VideoFileClip(seg_path)
+                            open_clips.append(sv)
+                            seg_srcs.append((seg_path, 0.0, sv.fps, sv.size))
+                            f16 = sv if reframed else fit_to_916(
+                                sv, OUT_W, OUT_H, blur=bg_blur, blur_every=bg_blur_every)
+                        if f16 is None:
+                            sub = vc.subclipped(s["start"], s["end"])
+                            f16 = fit_to_916(sub, OUT_W, OUT_H,
+                                             blur=bg_blur, blur_every=bg_blur_every)
+                            seg_srcs.append((vc.filename, s["start"], vc.fps, vc.size))
                         open_clips.append(f16)
                         clips_916.append(f16)
                         st.write(
@@ -1742,27 +4769,11 @@ if st.session_state.trim_approved and not st.session_state.pass1_ready:
 
             # ── Overlay logo pada setiap clip (jika ada) ───────────────────────
             if logo_pil is not None:
-                lw = max(20, int(OUT_W * 0.20))
-                lh = max(1,  int(logo_pil.height * lw / logo_pil.width))
-                lr = logo_pil.resize((lw, lh), Image.LANCZOS).convert("RGBA")
-                ln = np.array(lr).astype(np.float32)
-                lx = (OUT_W - lw) // 2
-                ly = min(max(4, int(OUT_H * 0.03)), OUT_H - lh - 4)
-
-                def _add_logo(frame,
-                              _ln=ln, _lx=lx, _ly=ly, _lw=lw, _lh=lh):
-                    if frame.shape[0] < _ly + _lh or frame.shape[1] < _lx + _lw:
-                        return frame
-                    out   = frame.copy().astype(np.float32)
-                    patch = out[_ly:_ly + _lh, _lx:_lx + _lw]
-                    alpha = _ln[:, :, 3:] / 255.0
-                    out[_ly:_ly + _lh, _lx:_lx + _lw] = (
-                        patch * (1.0 - alpha) + _ln[:, :, :3] * alpha
-                    )
-                    return out.astype(np.uint8)
-
+                _add_logo = make_logo_overlay(logo_pil, OUT_W, OUT_H)
                 clips_916 = [c.image_transform(_add_logo) for c in clips_916]
                 st.write("✅ Logo diterapkan ke semua klip.")
+            else:
+                _add_logo = None
 
             # ── Gabungkan dengan transisi ───────────────────────────────────────
             st.write("🔗 Menggabungkan klip...")
@@ -1782,14 +4793,54 @@ if st.session_state.trim_approved and not st.session_state.pass1_ready:
             # ── Render Pass 1 ke /tmp ───────────────────────────────────────────
             status.update(label="⏳ Rendering Pass 1...")
             st.write(f"💾 Render → `{pass1_path}`...")
-            base.write_videofile(
-                pass1_path,
-                codec="libx264",
-                audio_codec="aac",
-                fps=24,
-                ffmpeg_params=["-pix_fmt", "yuv420p"],
-                logger=None,
-            )
+            p1_written = False
+            native_ok  = (mode == "video" and jenis_transisi != "Fade to Black"
+                          and len(seg_srcs) == len(clips_916))
+            if render_workers > 1 and len(clips_916) > 1:
+                if native_ok:
+                    try:
+                        n_pc = render_pass1_parallel(
+                            seg_srcs, [c.duration for c in clips_916],
+                            jenis_transisi, fade_dur, (OUT_W, OUT_H), base.audio,
+                            pass1_path, p1_format, render_workers,
+                            blur=bg_blur, blur_every=bg_blur_every, logo_pil=logo_pil,
+                        )
+                        st.write(f"  🔗 {n_pc} potongan segmen/transisi digabung (tanpa re-encode)")
+                        p1_written = True
+                    except Exception as e:
+                        st.warning(f"⚠️ Pass 1 paralel gagal → fallback 1 proses: {e}")
+                else:
+                    st.write("  ℹ️ Pass 1 paralel hanya untuk video dengan Crossfade / "
+                             "tanpa transisi → 1 proses.")
+            if not p1_written and use_pipeline and native_ok:
+                # Jalur pipe native: reader ffmpeg per segmen → fit 9:16 →
+                # logo → crossfade/sambung → writer ffmpeg (tanpa get_frame(t))
+                try:
+                    n_fr = write_pass1_frames(
+                        iter_pass1_native(
+                            seg_srcs, [c.duration for c in clips_916],
+                            fade_dur if jenis_transisi == "Crossfade" else 0.0,
+                            OUT_W, OUT_H, blur=bg_blur, blur_every=bg_blur_every,
+                            logo=_add_logo),
+                        (OUT_W, OUT_H), base.audio, pass1_path, p1_format)
+                    st.write(f"  🚰 Pipe native · {n_fr} frame")
+                    p1_written = True
+                except Exception as e:
+                    st.warning(f"⚠️ Pipe native gagal → pipeline MoviePy: {e}")
+            if not p1_written and use_pipeline:
+                try:
+                    secs = render_pass1_pipelined(base, pass1_path, p1_format)
+                    st.write(f"  🚰 Pipeline · {base.duration * 24 / max(secs, 1e-9):.1f} fps")
+                    p1_written = True
+                except Exception as e:
+                    st.warning(f"⚠️ Pipeline Pass 1 gagal → fallback write_videofile: {e}")
+            if not p1_written:
+                base.write_videofile(
+                    pass1_path,
+                    fps=24,
+                    logger=None,
+                    **p1_write_kwargs(p1_format),
+                )
             try:
                 base.close()
             except Exception:
@@ -1811,6 +4862,7 @@ if st.session_state.trim_approved and not st.session_state.pass1_ready:
             st.session_state.p1_out_h     = OUT_H
             st.session_state.p1_logo_pil  = logo_pil
             st.session_state.p1_font_path = selected_font_path
+            st.session_state.p1_format    = probe_p1_format(pass1_path)
             st.write("✅ **Pass 1 selesai.**")
 
             # ── Lanjut Pass 2 segera ─────────────────────────────────────────
@@ -1840,6 +4892,12 @@ if st.session_state.trim_approved and not st.session_state.pass1_ready:
                 logo_pil      = logo_pil,
                 font_path     = selected_font_path,
                 caption_align = caption_align,
+                text_effect   = text_effect,
+                caption_anim  = caption_anim,
+                backend       = pass2_backend,
+                frame_cache   = use_frame_cache,
+                workers       = render_workers,
+                pipeline      = use_pipeline,
             )
 
             if not ok:
@@ -1848,6 +4906,7 @@ if st.session_state.trim_approved and not st.session_state.pass1_ready:
             else:
                 with open(out_path, "rb") as fh:
                     st.session_state.video_bytes = fh.read()
+                st.session_state.sub_bytes = _read_sidecar(out_path)
                 gc.collect()   # bebaskan RAM setelah video besar dimuat
                 st.session_state.pass2_done = True
                 st.session_state.out_path   = out_path
@@ -1864,11 +4923,49 @@ if st.session_state.trim_approved and not st.session_state.pass1_ready:
                     oc.close()
                 except Exception:
                     pass
+            for sf in seg_files:
+                _safe_remove(sf)
             gc.collect()
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 21 — RE-RENDER PASS 2 SAJA (edit caption tanpa ulang Pass 1)
+# BAGIAN 33 — PREVIEW CAPTION DI SIDEBAR (tanpa render Pass 2)
+# ═══════════════════════════════════════════════════════════════════════════════
+if st.session_state.pass1_ready and os.path.exists(st.session_state.pass1_path):
+    with st.sidebar:
+        st.header("👁️ Preview Caption")
+        if st.toggle("Tampilkan preview", value=False,
+                     help="Frame Pass 1 di tengah tiap caption + CTA, layout sama "
+                          "dengan render akhir. Ikut berubah saat teks/warna/font diedit."):
+            try:
+                shots, ms = preview_pass2(
+                    pass1_path    = st.session_state.pass1_path,
+                    deskripsi     = deskripsi,
+                    n_caption     = n_caption,
+                    detail_colors = detail_colors,
+                    cta_nama      = cta_nama,
+                    cta_wa        = cta_wa,
+                    cta_dur       = cta_dur,
+                    cta_label     = cta_label,
+                    do_grade      = do_grade,
+                    brightness    = brightness,
+                    contrast      = contrast,
+                    saturation    = saturation,
+                    sharpness     = sharpness,
+                    OUT_W         = st.session_state.p1_out_w,
+                    OUT_H         = st.session_state.p1_out_h,
+                    font_path     = st.session_state.p1_font_path,
+                    caption_align = caption_align,
+                    text_effect   = text_effect,
+                )
+                st.image([f for _, f in shots], caption=[c for c, _ in shots], width=130)
+                st.caption(f"⚡ {ms:.0f} ms")
+            except Exception as e:
+                st.warning(f"⚠️ Preview gagal: {e}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# BAGIAN 34 — RE-RENDER PASS 2 SAJA (edit caption tanpa ulang Pass 1)
 # ═══════════════════════════════════════════════════════════════════════════════
 if btn_pass2 and st.session_state.pass1_ready:
     p1   = st.session_state.pass1_path
@@ -1883,6 +4980,7 @@ if btn_pass2 and st.session_state.pass1_ready:
     else:
         st.session_state.pass2_done  = False
         st.session_state.video_bytes = None
+        st.session_state.sub_bytes   = None
 
         with st.status("⏳ Re-render Pass 2...", expanded=True) as status:
             ok, captions, err = run_pass2(
@@ -1908,6 +5006,12 @@ if btn_pass2 and st.session_state.pass1_ready:
                 logo_pil      = lpil,
                 font_path     = fpth,
                 caption_align = caption_align,
+                text_effect   = text_effect,
+                caption_anim  = caption_anim,
+                backend       = pass2_backend,
+                frame_cache   = use_frame_cache,
+                workers       = render_workers,
+                pipeline      = use_pipeline,
             )
 
             if not ok:
@@ -1916,6 +5020,7 @@ if btn_pass2 and st.session_state.pass1_ready:
             else:
                 with open(op, "rb") as fh:
                     st.session_state.video_bytes = fh.read()
+                st.session_state.sub_bytes = _read_sidecar(op)
                 gc.collect()
                 st.session_state.pass2_done = True
                 st.session_state.out_path   = op
@@ -1923,14 +5028,19 @@ if btn_pass2 and st.session_state.pass1_ready:
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# BAGIAN 22 — PREVIEW & DOWNLOAD
+# BAGIAN 35 — PREVIEW & DOWNLOAD
 # ═══════════════════════════════════════════════════════════════════════════════
 if st.session_state.pass2_done and st.session_state.video_bytes:
     st.divider()
     st.subheader("🎬 Preview & Download")
 
     # ← FIX: gunakan bytes agar reliable di Streamlit Cloud (path /tmp tidak di-serve)
-    st.video(st.session_state.video_bytes, format="video/mp4")
+    sub = st.session_state.sub_bytes
+    try:
+        st.video(st.session_state.video_bytes, format="video/mp4",
+                 **({"subtitles": sub.decode("utf-8")} if sub else {}))
+    except TypeError:          # Streamlit lama: tanpa parameter subtitles
+        st.video(st.session_state.video_bytes, format="video/mp4")
 
     ca, cb = st.columns([3, 1])
     with ca:
@@ -1944,6 +5054,17 @@ if st.session_state.pass2_done and st.session_state.video_bytes:
             mime="video/mp4",
             use_container_width=True,
         )
+        if sub:
+            st.download_button(
+                label="⬇️ Download Subtitle (.vtt)",
+                data=sub,
+                file_name=(
+                    f"mansion_{SID}_"
+                    f"{st.session_state.p1_out_w}x{st.session_state.p1_out_h}.vtt"
+                ),
+                mime="text/vtt",
+                use_container_width=True,
+            )
     with cb:
         if st.button("🔄 Perbaiki Caption", use_container_width=True):
             st.info("💡 Edit deskripsi di sidebar → klik **✍️ Re-render Pass 2**")
@@ -0,0 +1,447 @@
+"""
+Benchmark mesin render Mansion Video Generator (developer · frame sintetis).
+
+Dijalankan terpisah dari app Streamlit — kernel di-import dari
+mansionvidgen.py, hasil dicetak sebagai tabel teks:
+
+    python tools/bench_render.py                 # semua benchmark
+    python tools/bench_render.py grade reframe   # sebagian
+    python tools/bench_render.py --shots DIR bg_blur
+
+--shots DIR: potongan background bench_bg_blur disimpan sebagai PNG.
+"""
+import os, re, sys, time, logging, resource, argparse, tempfile, subprocess
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)                                   # fonts/ & assets/ relatif ke root
+sys.path.insert(0, ROOT)
+
+logging.disable(logging.WARNING)                 # import tanpa server: bisukan log bare mode
+import mansionvidgen as mvg                      # noqa: E402
+logging.disable(logging.NOTSET)
+from moviepy import VideoFileClip                # noqa: E402
+
+TMP = tempfile.mkdtemp(prefix="mvg_bench_")
+
+
+_BENCH_SIZES = ((720, 1280), (1080, 1920))
+
+
+def _bench_ms(fn, n: int) -> float:
+    """Rata-rata waktu fn() dalam milidetik (1× pemanasan + n iterasi)."""
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) * 1000 / max(1, n)
+
+
+def bench_pass2_kernel(sizes=_BENCH_SIZES, n_frames: int = 24,
+                       grade: tuple | None = None) -> list[dict]:
+    """
+    Bandingkan rantai lama mvg.grade_frame → mvg.blend_overlay → mvg.draw_progress_bar
+    dengan mvg.make_pass2_kernel pada frame sintetis. Return baris tabel.
+    """
+    rng  = np.random.default_rng(0)
+    rows = []
+    for ow, oh in sizes:
+        _, hook_size, pad_x, pad_y = mvg._compute_layout(ow)
+        sprite = mvg.render_caption("RUMAH MEWAH CITRALAND SURABAYA SIAP HUNI",
+                                ow, oh, hook_size, pad_x, pad_y, color=mvg.HOOK_COLOR)
+        frame  = rng.integers(0, 256, (oh, ow, 3), dtype=np.uint8)
+        frame.flags.writeable = False        # seperti frame dari reader MoviePy
+        bar_h  = max(3, int(oh * 0.006))
+        t, td  = 5.0, 30.0
+
+        def _chain():
+            f = mvg.grade_frame(frame, *grade) if grade is not None else frame
+            f = mvg.blend_overlay(f, sprite)
+            return mvg.draw_progress_bar(f, t, td, ow, oh, bar_h)
+
+        kernel = mvg.make_pass2_kernel(ow, oh, mvg.build_pass2_schedule([sprite], None, td, td, td),
+                                   td, bar_h, grade=grade)
+        before = _bench_ms(_chain, n_frames)
+        after  = _bench_ms(lambda: kernel(frame, t), n_frames)
+        rows.append({
+            "resolusi"          : f"{ow}×{oh}",
+            "grading"           : "on" if grade is not None else "off",
+            "sebelum (ms/frame)": round(before, 2),
+            "sesudah (ms/frame)": round(after, 2),
+            "speed-up"          : f"{before / max(after, 1e-9):.1f}×",
+        })
+    return rows
+
+
+def _fit_wrap_linear(text: str, max_w: int, font_path: str,
+                     size: int, max_lines: int = 4) -> tuple:
+    """Versi lama mvg._fit_wrap (referensi benchmark): turun 1 pt per percobaan."""
+    dummy = Image.new("RGBA", (1, 1))
+    draw  = ImageDraw.Draw(dummy)
+    s     = max(8, size)
+    while s >= 8:
+        f     = mvg.get_font(s, font_path)
+        lines = mvg._wrap_text_linear(text, f, max_w, draw)
+        if len(lines) <= max_lines:
+            return f, lines
+        s -= 1
+    f = mvg.get_font(8, font_path)
+    return f, mvg._wrap_text_linear(text, f, max_w, draw)
+
+
+def _fit_single_linear(text: str, max_w: int, font_path: str, size: int) -> tuple:
+    """Versi lama mvg._fit_single (referensi benchmark): textbbox tiap 2 pt."""
+    dummy = Image.new("RGBA", (1, 1))
+    draw  = ImageDraw.Draw(dummy)
+    s, prev = max(8, size), None
+    while s >= 8:
+        f  = mvg.get_font(s, font_path)
+        tw = draw.textbbox((0, 0), text, font=f)[2]
+        if tw <= max_w:
+            return f, s
+        if prev is not None and tw >= prev:
+            break
+        prev = tw
+        s   -= 2
+    return mvg.get_font(8, font_path), 8
+
+
+def bench_text_layout(sizes=_BENCH_SIZES, n: int = 5) -> list[dict]:
+    """
+    Layout semua caption + CTA satu video: fitting linear lama (textbbox per
+    prefix, turun 1–2 pt) vs binary search + tabel glyph. Return baris tabel.
+    """
+    caps  = ["RUMAH MEWAH 2 LANTAI DI CITRALAND SURABAYA BARAT SIAP HUNI",
+             "LT 150M2 · LB 180M2 · 4 KAMAR TIDUR · 3 KAMAR MANDI · CARPORT 2 MOBIL",
+             "DEKAT TOL, SEKOLAH INTERNASIONAL, MALL & RUMAH SAKIT",
+             "HARGA 5,2M NEGO SAMPAI JADI · SHM · IMB LENGKAP"]
+    cta   = ["HUBUNGI :", "BUDI SANTOSO PROPERTI", "WA: 0812-3456-7890"]
+    fonts = mvg.scan_fonts()
+    fp    = fonts[0]["path"] if fonts else ""
+    rows  = []
+    for ow, _ in sizes:
+        font_size, hook_size, pad_x, _ = mvg._compute_layout(ow)
+        box_w = max(1, ow - pad_x * 2)
+
+        def _layout(fit_wrap, fit_single):
+            out = []
+            for i, c in enumerate(caps):
+                f, lines = fit_wrap(c, max(1, box_w - 8), fp,
+                                    hook_size if i == 0 else font_size, 4)
+                out.append((f.size if hasattr(f, "size") else 0, tuple(lines)))
+            for i, c in enumerate(cta):
+                sz = max(8, int(font_size * (0.80 if i == 1 else 0.60)))
+                out.append(fit_single(c, max(1, box_w - pad_x), fp, sz)[1])
+            return out
+
+        same   = _layout(_fit_wrap_linear, _fit_single_linear) == _layout(mvg._fit_wrap, mvg._fit_single)
+        before = _bench_ms(lambda: _layout(_fit_wrap_linear, _fit_single_linear), n)
+        after  = _bench_ms(lambda: _layout(mvg._fit_wrap, mvg._fit_single), n)
+        rows.append({
+            "lebar"             : ow,
+            "sebelum (ms/video)": round(before, 2),
+            "sesudah (ms/video)": round(after, 2),
+            "speed-up"          : f"{before / max(after, 1e-9):.1f}×",
+            "hasil sama"        : "✅" if same else "❌",
+        })
+    return rows
+
+
+def _stroke_text_offsets(draw: ImageDraw.ImageDraw, x: int, y: int,
+                         text: str, font, rgb: tuple) -> None:
+    """Versi lama mvg._stroke_text (referensi benchmark): 24 draw offset + 1 fill per baris."""
+    for dx in range(-mvg.STROKE_W, mvg.STROKE_W + 1):
+        for dy in range(-mvg.STROKE_W, mvg.STROKE_W + 1):
+            if dx == 0 and dy == 0:
+                continue
+            draw.text((x + dx, y + dy), text, font=font,
+                      fill=(*mvg.STROKE_COLOR, 255))
+    draw.text((x, y), text, font=font, fill=(*rgb, 255))
+
+
+def bench_stroke(sizes=_BENCH_SIZES, n: int = 10) -> list[dict]:
+    """
+    Outline teks: 24 draw offset + fill (versi lama) vs baris dari atlas
+    glyph + outline turunan. Return baris tabel (per baris teks hook).
+    """
+    fonts = mvg.scan_fonts()
+    fp    = fonts[0]["path"] if fonts else ""
+    txt   = "RUMAH MEWAH CITRALAND"
+    rows  = []
+    for ow, _ in sizes:
+        _, hook_size, _, _ = mvg._compute_layout(ow)
+        f    = mvg.get_font(hook_size, fp)
+        lh   = hook_size * 2
+        a, b = Image.new("RGBA", (ow, lh)), Image.new("RGBA", (ow, lh))
+        _stroke_text_offsets(ImageDraw.Draw(a), 8, 8, txt, f, mvg.HOOK_COLOR)
+        mvg._stroke_text(b, 8, 8, txt, f, mvg.HOOK_COLOR)
+        diff   = int(np.abs(np.asarray(a, np.int16) - np.asarray(b, np.int16)).max())
+        before = _bench_ms(lambda: _stroke_text_offsets(
+            ImageDraw.Draw(Image.new("RGBA", (ow, lh))), 8, 8, txt, f, mvg.HOOK_COLOR), n)
+        after  = _bench_ms(lambda: mvg._stroke_text(
+            Image.new("RGBA", (ow, lh)), 8, 8, txt, f, mvg.HOOK_COLOR), n)
+        row = {
+            "lebar"            : ow,
+            "sebelum (ms/baris)": round(before, 2),
+            "sesudah (ms/baris)": round(after, 2),
+            "speed-up"         : f"{before / max(after, 1e-9):.1f}×",
+            "selisih maks"     : diff,
+        }
+        for name in ("Outline Tebal", "Outline + Shadow", "Glow"):
+            row[f"{name} (ms)"] = round(_bench_ms(lambda: mvg._stroke_text(
+                Image.new("RGBA", (ow, lh)), 8, 8, txt, f, mvg.HOOK_COLOR,
+                mvg.TEXT_EFFECTS[name]), n), 2)
+        rows.append(row)
+    return rows
+
+
+def bench_caption_anim(sizes=_BENCH_SIZES, n_frames: int = 24) -> list[dict]:
+    """
+    Biaya kernel Pass 2 per frame selama animasi masuk caption (detik
+    pertama, animasi aktif) untuk tiap mvg.CAPTION_ANIMS. Return baris tabel.
+    """
+    rng  = np.random.default_rng(0)
+    rows = []
+    for ow, oh in sizes:
+        _, hook_size, pad_x, pad_y = mvg._compute_layout(ow)
+        sprite = mvg.render_caption("RUMAH MEWAH CITRALAND SURABAYA SIAP HUNI",
+                                ow, oh, hook_size, pad_x, pad_y, color=mvg.HOOK_COLOR)
+        frame  = rng.integers(0, 256, (oh, ow, 3), dtype=np.uint8)
+        bar_h  = max(3, int(oh * 0.006))
+        ts     = [i / n_frames * mvg.ANIM_IN_S * 2 for i in range(n_frames)]
+        row    = {"resolusi": f"{ow}×{oh}"}
+        for key, label in mvg.CAPTION_ANIMS.items():
+            kernel = mvg.make_pass2_kernel(ow, oh, mvg.build_pass2_schedule(
+                [sprite], None, 10.0, 10.0, 10.0, anim=key), 10.0, bar_h)
+            ms = _bench_ms(lambda: [kernel(frame, t) for t in ts], 3) / n_frames
+            row[f"{label} (ms/frame)"] = round(ms, 2)
+        rows.append(row)
+    return rows
+
+
+def bench_grade(sizes=_BENCH_SIZES, n_frames: int = 6,
+                params: tuple = (1.05, 1.10, 1.05, 1.10)) -> list[dict]:
+    """Bandingkan mvg.grade_frame (ImageEnhance) dengan mvg.compile_grade (LUT)."""
+    rng  = np.random.default_rng(0)
+    rows = []
+    for ow, oh in sizes:
+        # Gradien halus + noise: lebih mirip footage daripada noise murni
+        yy, xx = np.mgrid[0:oh, 0:ow]
+        base   = np.stack([xx * 255 // ow, yy * 255 // oh,
+                           (xx + yy) * 255 // (ow + oh)], axis=-1)
+        frame  = np.clip(base + rng.integers(-24, 25, base.shape),
+                         0, 255).astype(np.uint8)
+        grade  = mvg.compile_grade(*params)
+        out    = np.empty_like(frame)
+        diff   = np.abs(mvg.grade_frame(frame, *params).astype(np.int16)
+                        - grade(frame, out).astype(np.int16))
+        before = _bench_ms(lambda: mvg.grade_frame(frame, *params), n_frames)
+        after  = _bench_ms(lambda: grade(frame, out), n_frames)
+        rows.append({
+            "resolusi"          : f"{ow}×{oh}",
+            "ImageEnhance (ms)" : round(before, 1),
+            "LUT (ms)"          : round(after, 1),
+            "speed-up"          : f"{before / max(after, 1e-9):.1f}×",
+            "selisih maks"      : int(diff.max()),
+            "selisih rata-rata" : round(float(diff.mean()), 3),
+        })
+    return rows
+
+
+def bench_bg_blur(src: tuple = (1920, 1080), size: tuple = (720, 1280),
+                  n_frames: int = 12, every: int = 3) -> tuple[list, list]:
+    """
+    Engine background blur fit 9:16 pada klip landscape sintetis (testsrc2):
+    ms/frame tiap mvg.BG_BLUR_ENGINES, tanpa & dengan reuse tiap `every` frame,
+    PSNR background terhadap full-res per frame. Return (rows, shots) —
+    shots = [(label, potongan background)] untuk perbandingan berdampingan.
+    """
+    sw, sh = src
+    ow, oh = size
+    raw = subprocess.run([
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"testsrc2=s={sw}x{sh}:r=24",
+        "-frames:v", str(n_frames), "-f", "rawvideo", "-pix_fmt", "rgb24", "-",
+    ], capture_output=True, check=True).stdout
+    frames = np.frombuffer(raw, np.uint8).reshape(-1, sh, sw, 3)
+    ref    = mvg.make_bg_blur(src, ow, oh, "full")
+    refs   = [ref(f, i).astype(np.float32) for i, f in enumerate(frames)]
+    band   = mvg._fit_916_geometry(sw, sh, ow, oh)["fg_y0"]
+    rows, shots, base_ms = [], [], None
+    for key, spec in mvg.BG_BLUR_ENGINES.items():
+        for ev in sorted({1, int(every)}):
+            bgf = mvg.make_bg_blur(src, ow, oh, key, ev)
+            t0  = time.perf_counter()
+            out = [bgf(f, i).copy() for i, f in enumerate(frames)]
+            ms  = (time.perf_counter() - t0) * 1000 / len(frames)
+            mse = np.mean([np.mean((o - r) ** 2) for o, r in zip(out, refs)])
+            base_ms = base_ms or ms
+            rows.append({
+                "engine"      : spec["label"],
+                "reuse"       : f"tiap {ev} frame",
+                "ms / frame"  : round(ms, 1),
+                "speedup"     : f"{base_ms / max(ms, 1e-9):.1f}×",
+                "PSNR (dB)"   : round(float(10 * np.log10(255 ** 2 / mse)), 1) if mse > 0 else "∞",
+            })
+            if ev == 1:
+                shots.append((spec["label"], out[0][:band]))
+    return rows, shots
+
+
+def bench_reframe(seconds: int = 3, src: tuple = (1920, 1080),
+                  size: tuple = (720, 1280), blur: str = mvg.BG_BLUR_DEFAULT) -> list[dict]:
+    """
+    Throughput reframe 9:16 tiap mvg.REFRAME_BACKENDS: satu segmen landscape
+    sintetis (testsrc2 + noise) → file segmen Pass 1 (h264_sgop).
+    CPU = waktu proses sendiri + child (ffmpeg) → core terpakai & fps / core.
+    """
+    sw, sh = src
+    ow, oh = size
+    fps    = 24
+    srcf   = os.path.join(TMP, "bench_reframe_src.mkv")
+    dst    = os.path.join(TMP, "bench_reframe.mov")
+    rows   = []
+
+    def _cpu() -> float:
+        ch = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return time.process_time() + ch.ru_utime + ch.ru_stime
+
+    try:
+        subprocess.run([
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"testsrc2=s={sw}x{sh}:r={fps}:d={seconds}",
+            "-vf", "noise=alls=4:allf=t", "-pix_fmt", "yuv420p", "-c:v", "ffv1", srcf,
+        ], capture_output=True, check=True)
+        for key, label in mvg.REFRAME_BACKENDS.items():
+            c0, t0 = _cpu(), time.perf_counter()
+            if key == "ffmpeg":
+                mvg.render_segment_ffmpeg(srcf, 0.0, float(seconds), dst, src, ow, oh, blur)
+            else:
+                vc = VideoFileClip(srcf)
+                try:
+                    mvg.fit_to_916(vc, ow, oh, blur=blur).write_videofile(
+                        dst, fps=fps, logger=None, **mvg.p1_write_kwargs("h264_sgop"))
+                finally:
+                    vc.close()
+            wall, cpu = time.perf_counter() - t0, _cpu() - c0
+            n = seconds * fps
+            rows.append({
+                "backend"       : label,
+                "wall (s)"      : round(wall, 2),
+                "fps"           : round(n / max(wall, 1e-9), 1),
+                "CPU (s)"       : round(cpu, 2),
+                "core terpakai" : f"{cpu / max(wall, 1e-9):.1f} / {os.cpu_count() or 1}",
+                "fps / core"    : round(n / max(cpu, 1e-9), 1),
+            })
+            mvg._safe_remove(dst)
+    finally:
+        mvg._safe_remove(srcf)
+        mvg._safe_remove(dst)
+    return rows
+
+
+def bench_p1_formats(seconds: int = 4, size: tuple = (720, 1280)) -> list[dict]:
+    """
+    Tradeoff disk vs kecepatan tiap format Pass 1: encode, ukuran (MB/menit),
+    decode ke rgb24 (seperti reader MoviePy), dan PSNR terhadap sumber.
+    Sumber: testsrc2 + noise sensor sintetis.
+    """
+    ow, oh = size
+    src    = os.path.join(TMP, "bench_src.mkv")
+    rows   = []
+    try:
+        subprocess.run([
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"testsrc2=s={ow}x{oh}:r=24:d={seconds}",
+            "-vf", "noise=alls=4:allf=t", "-pix_fmt", "yuv420p", "-c:v", "ffv1", src,
+        ], capture_output=True, check=True)
+        for key, spec in mvg.P1_FORMATS.items():
+            dst = os.path.join(TMP, f"bench_p1{spec['ext']}")
+            t0  = time.perf_counter()
+            subprocess.run(["ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+                            "-i", src, "-c:v", spec["codec"], *spec["params"], dst],
+                           capture_output=True, check=True)
+            t1  = time.perf_counter()
+            subprocess.run(["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", dst,
+                            "-pix_fmt", "rgb24", "-f", "null", "-"],
+                           capture_output=True, check=True)
+            t2  = time.perf_counter()
+            r   = subprocess.run(["ffmpeg", "-hide_banner", "-i", dst, "-i", src,
+                                  "-lavfi", "[0:v]settb=1/24,setpts=N[a];"
+                                            "[1:v]settb=1/24,setpts=N[b];[a][b]psnr",
+                                  "-f", "null", "-"],
+                                 capture_output=True, text=True)
+            m   = re.search(r"average:([\d.]+|inf)", r.stderr)
+            rows.append({
+                "format"        : key,
+                "encode (s)"    : round(t1 - t0, 2),
+                "MB / menit"    : round(os.path.getsize(dst) / 1_048_576 * 60 / seconds, 1),
+                "decode (fps)"  : round(seconds * 24 / max(t2 - t1, 1e-9), 1),
+                "PSNR (dB)"     : round(float(m.group(1)), 1) if m else "?",
+            })
+            mvg._safe_remove(dst)
+    finally:
+        mvg._safe_remove(src)
+    return rows
+
+
+# ═══════════════════════════════════════════════════════════════════════════════
+
+
+BENCHES = {
+    "kernel"  : lambda: (bench_pass2_kernel()
+                         + bench_pass2_kernel(grade=(1.05, 1.10, 1.05, 1.10))),
+    "layout"  : bench_text_layout,
+    "stroke"  : bench_stroke,
+    "anim"    : bench_caption_anim,
+    "grade"   : bench_grade,
+    "p1"      : bench_p1_formats,
+    "bg_blur" : lambda: bench_bg_blur()[0],
+    "reframe" : bench_reframe,
+}
+
+
+def print_table(rows: list[dict]) -> None:
+    """Cetak baris dict sebagai tabel teks rata kiri."""
+    if not rows:
+        return
+    cols  = list(dict.fromkeys(k for r in rows for k in r))
+    width = {c: max(len(str(c)), *(len(str(r.get(c, ""))) for r in rows)) for c in cols}
+    print("  ".join(str(c).ljust(width[c]) for c in cols))
+    print("  ".join("─" * width[c] for c in cols))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(width[c]) for c in cols))
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark mesin render (frame sintetis).")
+    ap.add_argument("names", nargs="*", metavar="NAMA",
+                    help=f"benchmark: {', '.join(BENCHES)} (default semua)")
+    ap.add_argument("--shots", metavar="DIR", help="simpan potongan bench_bg_blur (PNG)")
+    args = ap.parse_args(argv)
+    bad  = [n for n in args.names if n not in BENCHES]
+    if bad:
+        ap.error(f"benchmark tidak dikenal: {', '.join(bad)}")
+    try:
+        for name in args.names or list(BENCHES):
+            print(f"\n▶ {name}")
+            if name == "bg_blur" and args.shots:
+                rows, shots = bench_bg_blur()
+                os.makedirs(args.shots, exist_ok=True)
+                for label, im in shots:
+                    fn = re.sub(r"[^\w]+", "_", label).strip("_") + ".png"
+                    Image.fromarray(im).save(os.path.join(args.shots, fn))
+            else:
+                rows = BENCHES[name]()
+            print_table(rows)
+    finally:
+        for fn in os.listdir(TMP):
+            mvg._safe_remove(os.path.join(TMP, fn))
+        os.rmdir(TMP)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""
+Bangun ulang fonts/font_index.json dari font repo (fonts/ & assets/).
+
+Jalankan saat deploy atau setelah menambah / mengganti file font:
+
+    python tools/build_font_index.py
+
+Hanya skrip ini yang menulis index yang di-commit; app Streamlit
+menyimpan hasil parse runtime (font sistem, font baru) di TMP_DIR.
+"""
+import os, sys, logging
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.chdir(ROOT)                                   # fonts/ & assets/ relatif ke root
+sys.path.insert(0, ROOT)
+
+logging.disable(logging.WARNING)                 # import tanpa server: bisukan log bare mode
+import mansionvidgen as mvg                      # noqa: E402
+logging.disable(logging.NOTSET)
+
+
+def main() -> int:
+    idx = mvg.build_font_index()
+    print(f"{mvg.FONT_INDEX_PATH}: {len(idx)} font · "
+          f"{sum(e['ranges'] is not None for e in idx)} dengan cakupan glyph")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())